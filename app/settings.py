@@ -24,6 +24,14 @@ env = environ.Env(
     DEBUG_TOOLBAR_SHOW=(bool, False),
     ROBOCJK_EXPORT_CANCEL_TIMEOUT=(int, 120),
     ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT=(int, 500),
+    ROBOCJK_EXPORT_FORMAT_IN_WORKERS=(bool, True),
+    ROBOCJK_EXPORT_WORKERS_CHUNKSIZE=(int, 20),
+    ROBOCJK_EXPORT_RECONCILE=(bool, True),
+    ROBOCJK_EXPORT_GIT_BATCHED=(bool, True),
+    ROBOCJK_EXPORT_WORKERS=(int, 1),
+    ROBOCJK_GLIF_LIST_CACHE=(str, "default"),
+    ROBOCJK_GLIF_LIST_CACHE_TIMEOUT=(int, 300),
+    ROBOCJK_GLIF_GET_MANY_MAX=(int, 500),
 )
 env_root = environ.Path(__file__) - 3  # get root of the project
 env_path = env_root() + "/conf/env_settings"
@@ -64,6 +72,15 @@ JWT_ALGORITHM = "HS256"
 
 ROBOCJK_EXPORT_CANCEL_TIMEOUT = env("ROBOCJK_EXPORT_CANCEL_TIMEOUT")
 ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT = env("ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT")
+ROBOCJK_EXPORT_FORMAT_IN_WORKERS = env("ROBOCJK_EXPORT_FORMAT_IN_WORKERS")
+ROBOCJK_EXPORT_WORKERS_CHUNKSIZE = env("ROBOCJK_EXPORT_WORKERS_CHUNKSIZE")
+ROBOCJK_EXPORT_RECONCILE = env("ROBOCJK_EXPORT_RECONCILE")
+ROBOCJK_EXPORT_GIT_BATCHED = env("ROBOCJK_EXPORT_GIT_BATCHED")
+ROBOCJK_EXPORT_WORKERS = env("ROBOCJK_EXPORT_WORKERS")
+
+ROBOCJK_GLIF_LIST_CACHE = env("ROBOCJK_GLIF_LIST_CACHE")
+ROBOCJK_GLIF_LIST_CACHE_TIMEOUT = env("ROBOCJK_GLIF_LIST_CACHE_TIMEOUT")
+ROBOCJK_GLIF_GET_MANY_MAX = env("ROBOCJK_GLIF_GET_MANY_MAX")
 
 TEST_API_HOST = env("TEST_API_HOST")
 TEST_API_USERNAME = env("TEST_API_USERNAME")
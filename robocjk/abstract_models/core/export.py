@@ -1,10 +1,10 @@
 import datetime as dt
 
-from django.conf import settings
 from django.db import close_old_connections, models
 from django.utils.translation import gettext_lazy as _
 
 from robocjk.debug import logger
+from robocjk.locks import get_lock_name, lock
 
 
 class ExportModel(models.Model):
@@ -54,49 +54,28 @@ class ExportModel(models.Model):
         # print(last_full_export_older_than_24h, last_full_export_day_before)
         return last_full_export_older_than_24h or last_full_export_day_before
 
-    @property
-    def export_cancelable(self):
-        if self.export_running:
-            now = dt.datetime.now()
-            if (now - self.export_started_at) > dt.timedelta(
-                minutes=settings.ROBOCJK_EXPORT_CANCEL_TIMEOUT
-            ):
-                return True
-        return False
-
-    @property
-    def exportable(self):
-        return not self.export_running or self.export_cancelable
-
     def export(self, full=None):
         close_old_connections()
 
-        cls = self.__class__
-
-        exporting_objects = list(cls.objects.all())
-        exportable_objects = [obj.exportable for obj in exporting_objects]
-        if not all(exportable_objects):
-            logger.warning(
-                "Skipped export to avoid overlapping with other exports that are still running."
-            )
-            return False
-
         if not self.export_enabled:
             logger.info(f"Skipped export for '{self}' because it is disabled.")
             return False
 
-        if self.export_running:
-            if self.export_cancelable:
-                logger.warning(
-                    f"Canceled unfinished export for '{self}' to allow a new export to start."
-                )
-                self.export_running = False
-                self.save()
-            else:
+        # the lock is released as soon as the export ends (or its process dies),
+        # other objects can be exported concurrently
+        with lock(get_lock_name(self)) as lock_acquired:
+            if not lock_acquired:
                 logger.info(
                     f"Skipped export for '{self}' because there is an export process that is still running."
                 )
                 return False
+            return self._export(full)
+
+    def _export(self, full):
+        if self.export_running:
+            logger.warning(
+                f"Canceled unfinished export for '{self}' to allow a new export to start."
+            )
 
         # save export started status in the database
         logger.info(f'Started export for "{self}".')
@@ -108,6 +87,7 @@ class ExportModel(models.Model):
         full_export = full or self.full_export_needed
 
         # save model to the file system
+        self.export_started(full_export)
         try:
             self.save_to_file_system(full_export)
         except Exception as export_error:
@@ -118,6 +98,7 @@ class ExportModel(models.Model):
             close_old_connections()
             self.export_running = False
             self.save()
+            self.export_completed(error=f"{error_type_name}: {export_error}")
             return False
 
         # save export completed status in the database
@@ -128,8 +109,21 @@ class ExportModel(models.Model):
             self.last_full_export_at = dt.datetime.now()
 
         self.save()
+        self.export_completed()
         logger.info(f"Completed export for '{self}'.")
         return True
 
+    def export_started(self, full_export):
+        """
+        Called just before saving the model to the file system.
+        """
+        pass
+
+    def export_completed(self, error=None):
+        """
+        Called when the export is completed, error is passed if the export failed.
+        """
+        pass
+
     def save_to_file_system(self, full_export):
         raise NotImplementedError()
@@ -55,9 +55,9 @@ class TimestampModel(models.Model):
                 pass
             self.editors_history = editors_separator.join(editors_list)
 
-    def save_by(self, user):
+    def save_by(self, user, **kwargs):
         # if user and user.id != self.updated_by_id:
         self.update_editors_history(user)
         self.updated_by = user
-        self.save()
+        self.save(**kwargs)
         self.editors.add(user)
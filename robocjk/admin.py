@@ -15,11 +15,15 @@ from robocjk.models import (  # Proof,
     AtomicElementLayer,
     CharacterGlyph,
     CharacterGlyphLayer,
+    ComponentInstance,
     DeepComponent,
     DeletedGlif,
+    ExportRun,
     Font,
     FontImport,
+    GlifChange,
     GlyphsComposition,
+    Lock,
     Project,
     StatusModel,
 )
@@ -469,6 +473,7 @@ class FontAdmin(admin.ModelAdmin):
                     "export_started_at",
                     "export_completed_at",
                     "last_full_export_at",
+                    "export_changes_cursor",
                 ),
             },
         ),
@@ -675,6 +680,7 @@ class GlifAdmin(admin.ModelAdmin):
         "has_outlines",
         "has_components",
         "components",
+        "status_with_variations",
     )
     # raw_id_fields = ('font', )
 
@@ -715,6 +721,7 @@ class GlifAdmin(admin.ModelAdmin):
                         "status_downgraded_at",
                         "status_changed_at",
                         "previous_status",
+                        "status_with_variations",
                     ),
                 },
             ),
@@ -739,7 +746,7 @@ class GlifAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        qs = qs.defer("data")
+        qs = qs.defer("data", "formatted_data")
         return qs
 
     save_on_top = True
@@ -833,7 +840,7 @@ class GlifLayerAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        qs = qs.defer("data")
+        qs = qs.defer("data", "formatted_data")
         return qs
 
 
@@ -1010,3 +1017,284 @@ class DeletedGlifAdmin(admin.ModelAdmin):
 #         }),
 #     )
 #     save_on_top = True
+
+
+@admin.register(GlifChange)
+class GlifChangeAdmin(admin.ModelAdmin):
+    search_fields = (
+        "group_name",
+        "name",
+        "filename",
+        "filepath",
+    )
+    list_select_related = ("font",)
+    list_display = (
+        "id",
+        "created_at",
+        "font",
+        "action",
+        "glif_type",
+        "glif_id",
+        "group_name",
+        "name",
+        "filename",
+    )
+    list_filter = (
+        "font",
+        "action",
+        "glif_type",
+    )
+    readonly_fields = (
+        "id",
+        "created_at",
+        "font",
+        "action",
+        "glif_type",
+        "glif_id",
+        "parent_glif_id",
+        "group_name",
+        "name",
+        "filename",
+        "filepath",
+    )
+    fieldsets = (
+        (
+            "Metadata",
+            {
+                "fields": (
+                    "id",
+                    "created_at",
+                    "font",
+                    "action",
+                ),
+            },
+        ),
+        (
+            "Glif info",
+            {
+                "fields": (
+                    "glif_type",
+                    "glif_id",
+                    "parent_glif_id",
+                    "group_name",
+                    "name",
+                ),
+            },
+        ),
+        (
+            "Glif file",
+            {
+                "fields": (
+                    "filename",
+                    "filepath",
+                ),
+            },
+        ),
+    )
+
+
+@admin.register(ComponentInstance)
+class ComponentInstanceAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+    list_select_related = (
+        "font",
+        "character_glyph",
+        "deep_component",
+    )
+    list_display = (
+        "id",
+        "font",
+        "character_glyph",
+        "deep_component",
+        "index",
+        "name",
+    )
+    list_filter = ("font",)
+    raw_id_fields = (
+        "character_glyph",
+        "deep_component",
+    )
+    readonly_fields = (
+        "id",
+        "font",
+        "character_glyph",
+        "deep_component",
+        "index",
+        "name",
+        "coord",
+        "x",
+        "y",
+        "scale_x",
+        "scale_y",
+        "rotation",
+        "rcenter_x",
+        "rcenter_y",
+        "tcenter_x",
+        "tcenter_y",
+    )
+    fieldsets = (
+        (
+            "Glif",
+            {
+                "fields": (
+                    "id",
+                    "font",
+                    "character_glyph",
+                    "deep_component",
+                    "index",
+                ),
+            },
+        ),
+        (
+            "Component",
+            {
+                "fields": (
+                    "name",
+                    "coord",
+                ),
+            },
+        ),
+        (
+            "Transform",
+            {
+                "fields": (
+                    "x",
+                    "y",
+                    "scale_x",
+                    "scale_y",
+                    "rotation",
+                    "rcenter_x",
+                    "rcenter_y",
+                    "tcenter_x",
+                    "tcenter_y",
+                ),
+            },
+        ),
+    )
+
+
+@admin.register(ExportRun)
+class ExportRunAdmin(admin.ModelAdmin):
+    list_select_related = (
+        "project",
+        "font",
+    )
+    list_display = (
+        "id",
+        "started_at",
+        "project",
+        "font",
+        "full_export",
+        "outcome",
+        "duration",
+        "db_read_duration",
+        "format_duration",
+        "write_duration",
+        "verify_duration",
+        "cleanup_duration",
+        "git_duration",
+        "glifs_written_count",
+        "glifs_skipped_count",
+        "bytes_written",
+    )
+    list_filter = (
+        (
+            "started_at",
+            DateTimeRangeFilter,
+        ),
+        "outcome",
+        "full_export",
+        "project",
+        "font",
+    )
+    readonly_fields = (
+        "id",
+        "project",
+        "font",
+        "full_export",
+        "started_at",
+        "completed_at",
+        "duration",
+        "outcome",
+        "error",
+        "db_read_duration",
+        "format_duration",
+        "write_duration",
+        "verify_duration",
+        "cleanup_duration",
+        "git_duration",
+        "character_glyphs_count",
+        "character_glyphs_layers_count",
+        "deep_components_count",
+        "atomic_elements_count",
+        "atomic_elements_layers_count",
+        "glifs_written_count",
+        "glifs_skipped_count",
+        "bytes_written",
+    )
+    fieldsets = (
+        (
+            "Metadata",
+            {
+                "fields": (
+                    "id",
+                    "project",
+                    "font",
+                    "full_export",
+                    "started_at",
+                    "completed_at",
+                    "duration",
+                    "outcome",
+                    "error",
+                ),
+            },
+        ),
+        (
+            "Durations (seconds)",
+            {
+                "fields": (
+                    "db_read_duration",
+                    "format_duration",
+                    "write_duration",
+                    "verify_duration",
+                    "cleanup_duration",
+                    "git_duration",
+                ),
+            },
+        ),
+        (
+            "Glifs",
+            {
+                "fields": (
+                    "character_glyphs_count",
+                    "character_glyphs_layers_count",
+                    "deep_components_count",
+                    "atomic_elements_count",
+                    "atomic_elements_layers_count",
+                    "glifs_written_count",
+                    "glifs_skipped_count",
+                    "bytes_written",
+                ),
+            },
+        ),
+    )
+
+
+@admin.register(Lock)
+class LockAdmin(admin.ModelAdmin):
+    search_fields = (
+        "name",
+        "owner",
+    )
+    list_display = (
+        "name",
+        "owner",
+        "acquired_at",
+        "heartbeat_at",
+    )
+    readonly_fields = (
+        "name",
+        "owner",
+        "acquired_at",
+        "heartbeat_at",
+    )
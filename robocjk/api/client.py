@@ -83,11 +83,15 @@ class Client:
         # obtain the auth token to prevent 401 error on first call
         self.auth_token()
 
-    def _api_call(self, view_name, params=None):
+    def _api_call(self, view_name, params=None, etag=None):
         """
         Call an API method by its 'view-name' passing the given params.
+        If etag is passed and the requested resource has not been modified,
+        the response has no data and 'not_modified' is True.
         """
         url, data, headers = self._prepare_request(view_name, params)
+        if etag:
+            headers["If-None-Match"] = etag
         # request options
         options = {
             "data": data,
@@ -106,12 +110,22 @@ class Client:
             self.auth_token()
             if self._auth_token:
                 # re-send previously unauthorized request
-                return self._api_call(view_name, params)
+                return self._api_call(view_name, params, etag)
+        if response.status_code == 304:
+            # not modified - the client cached data is still valid
+            return {
+                "data": None,
+                "error": None,
+                "status": 304,
+                "etag": response.headers.get("ETag", etag),
+                "not_modified": True,
+            }
         # read response json data and return dict
         response_data = response.json()
         if response.status_code != 200:
             raise HTTPError(f"{response.status_code} {response_data['error']}")
-
+        if "ETag" in response.headers:
+            response_data["etag"] = response.headers["ETag"]
         return response_data
 
     def _prepare_request(self, view_name, params):
@@ -156,10 +170,13 @@ class Client:
             # Glyphs Composition
             "glyphs_composition_get": "/api/glyphs-composition/get/",
             "glyphs_composition_update": "/api/glyphs-composition/update/",
+            # Export Run
+            "export_run_list": "/api/export-run/list/",
             # All glif (Atomic Element + Deep Component + Character Glyph)
             "glif_list": "/api/glif/list/",
             "glif_lock": "/api/glif/lock/",
             "glif_unlock": "/api/glif/unlock/",
+            "glif_get_many": "/api/glif/get-many/",
             # Atomic Element
             "atomic_element_list": "/api/atomic-element/list/",
             "atomic_element_get": "/api/atomic-element/get/",
@@ -322,6 +339,18 @@ class Client:
         }
         return self._api_call("glyphs_composition_update", params)
 
+    def export_run_list(self, project_uid, font_uid=None, limit=None):
+        """
+        Get the list of the latest export runs of a specific Project,
+        optionally filtered by font_uid.
+        """
+        params = {
+            "project_uid": project_uid,
+            "font_uid": font_uid,
+            "limit": limit,
+        }
+        return self._api_call("export_run_list", params)
+
     def glif_list(
         self,
         font_uid,
@@ -329,6 +358,7 @@ class Client:
         updated_by_current_user=None,
         updated_by=None,
         updated_since=None,
+        changes_since=None,
         is_locked_by_current_user=None,
         is_locked_by=None,
         is_locked=None,
@@ -337,6 +367,9 @@ class Client:
         has_outlines=None,
         has_components=None,
         has_unicode=None,
+        source_name=None,
+        source_status=None,
+        source_status_done=None,
     ):
         """
         Get the lists of Atomic Elements / Deep Components / Character Glyphs
@@ -348,6 +381,7 @@ class Client:
             "updated_by_current_user": updated_by_current_user,
             "updated_by": updated_by,
             "updated_since": updated_since,
+            "changes_since": changes_since,
             "is_locked_by_current_user": is_locked_by_current_user,
             "is_locked_by": is_locked_by,
             "is_locked": is_locked,
@@ -356,6 +390,9 @@ class Client:
             "has_outlines": has_outlines,
             "has_components": has_components,
             "has_unicode": has_unicode,
+            "source_name": source_name,
+            "source_status": source_status,
+            "source_status_done": source_status_done,
         }
         return self._api_call("glif_list", params)
 
@@ -423,6 +460,38 @@ class Client:
         }
         return self._api_call("glif_unlock", params)
 
+    def glif_get_many(
+        self,
+        font_uid,
+        atomic_elements=None,
+        deep_components=None,
+        character_glyphs=None,
+        return_data=True,
+        return_layers=True,
+        return_related=False,
+        return_made_of=False,
+        return_used_by=False,
+    ):
+        """
+        Get the data of lists of Atomic Elements / Deep Components / Character Glyphs
+        of a Font by their id or name at once.
+        """
+        params = {
+            "font_uid": font_uid,
+            "character_glyphs_ids": self._if_int_list(character_glyphs),
+            "character_glyphs_names": self._if_str_list(character_glyphs),
+            "deep_components_ids": self._if_int_list(deep_components),
+            "deep_components_names": self._if_str_list(deep_components),
+            "atomic_elements_ids": self._if_int_list(atomic_elements),
+            "atomic_elements_names": self._if_str_list(atomic_elements),
+            "return_data": return_data,
+            "return_layers": return_layers,
+            "return_related": return_related,
+            "return_made_of": return_made_of,
+            "return_used_by": return_used_by,
+        }
+        return self._api_call("glif_get_many", params)
+
     def atomic_element_list(
         self,
         font_uid,
@@ -437,6 +506,9 @@ class Client:
         has_outlines=None,
         has_components=None,
         has_unicode=None,
+        source_name=None,
+        source_status=None,
+        source_status_done=None,
     ):
         """
         Get the list of Atomic Elements of a Font according to the given filters.
@@ -454,6 +526,9 @@ class Client:
             "has_outlines": has_outlines,
             "has_components": has_components,
             "has_unicode": has_unicode,
+            "source_name": source_name,
+            "source_status": source_status,
+            "source_status_done": source_status_done,
         }
         return self._api_call("atomic_element_list", params)
 
@@ -466,9 +541,12 @@ class Client:
         return_related=False,
         return_made_of=True,
         return_used_by=True,
+        etag=None,
     ):
         """
         Get the data of an Atomic Element.
+        Pass the etag of a previous response to get a not modified response
+        (without data) if nothing has changed meanwhile.
         """
         params = {
             "font_uid": font_uid,
@@ -480,7 +558,7 @@ class Client:
             "return_made_of": return_made_of,
             "return_used_by": return_used_by,
         }
-        return self._api_call("atomic_element_get", params)
+        return self._api_call("atomic_element_get", params, etag=etag)
 
     def atomic_element_create(
         self,
@@ -753,6 +831,9 @@ class Client:
         has_outlines=None,
         has_components=None,
         has_unicode=None,
+        source_name=None,
+        source_status=None,
+        source_status_done=None,
     ):
         """
         Get the list of Deep Components of a Font according to the given filters.
@@ -770,6 +851,9 @@ class Client:
             "has_outlines": has_outlines,
             "has_components": has_components,
             "has_unicode": has_unicode,
+            "source_name": source_name,
+            "source_status": source_status,
+            "source_status_done": source_status_done,
         }
         return self._api_call("deep_component_list", params)
 
@@ -782,9 +866,12 @@ class Client:
         return_related=False,
         return_made_of=True,
         return_used_by=True,
+        etag=None,
     ):
         """
         Get the data of a Deep Component.
+        Pass the etag of a previous response to get a not modified response
+        (without data) if nothing has changed meanwhile.
         """
         params = {
             "font_uid": font_uid,
@@ -796,7 +883,7 @@ class Client:
             "return_made_of": return_made_of,
             "return_used_by": return_used_by,
         }
-        return self._api_call("deep_component_get", params)
+        return self._api_call("deep_component_get", params, etag=etag)
 
     def deep_component_create(
         self,
@@ -958,6 +1045,9 @@ class Client:
         has_outlines=None,
         has_components=None,
         has_unicode=None,
+        source_name=None,
+        source_status=None,
+        source_status_done=None,
     ):
         """
         Get the list of Character Glyphs of a Font according to the given filters.
@@ -975,6 +1065,9 @@ class Client:
             "has_outlines": has_outlines,
             "has_components": has_components,
             "has_unicode": has_unicode,
+            "source_name": source_name,
+            "source_status": source_status,
+            "source_status_done": source_status_done,
         }
         return self._api_call("character_glyph_list", params)
 
@@ -987,9 +1080,12 @@ class Client:
         return_related=False,
         return_made_of=True,
         return_used_by=True,
+        etag=None,
     ):
         """
         Get the data of a Character Glyph.
+        Pass the etag of a previous response to get a not modified response
+        (without data) if nothing has changed meanwhile.
         """
         params = {
             "font_uid": font_uid,
@@ -1001,7 +1097,7 @@ class Client:
             "return_made_of": return_made_of,
             "return_used_by": return_used_by,
         }
-        return self._api_call("character_glyph_get", params)
+        return self._api_call("character_glyph_get", params, etag=etag)
 
     def character_glyph_create(
         self,
@@ -1,8 +1,10 @@
 # import time
+import hashlib
 from functools import wraps
 
 from benedict import benedict
 from django.conf import settings
+from django.db.models import Prefetch
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
@@ -12,9 +14,11 @@ from robocjk.api.http import (
     ApiResponseForbidden,
     ApiResponseInternalServerError,
     ApiResponseNotFound,
+    ApiResponseNotModified,
     ApiResponseServiceUnavailableError,
     ApiResponseUnauthorized,
 )
+from robocjk.api.loaders import get_glifs_graph_ids
 from robocjk.core import GlifData
 from robocjk.models import (
     AtomicElement,
@@ -24,6 +28,7 @@ from robocjk.models import (
     DeepComponent,
     Font,
     Project,
+    StatusModel,
 )
 
 
@@ -45,6 +50,10 @@ def api_view(view_func):
             if settings.DEBUG:
                 raise internal_error
             response = ApiResponseInternalServerError(str(internal_error))
+        # validator computed by the view decorators (conditional requests)
+        etag = getattr(request, "api_etag", None)
+        if etag and response.status_code == 200:
+            response["ETag"] = etag
         #         complete_time = time.time()
         #         elapsed_time = (complete_time - start_time)
         #         logger.debug('API call - status {} ({} seconds): {} - params: {}'.format(
@@ -202,8 +211,23 @@ def require_glif_filters(view_func):
                 "has_components": params.get_bool("has_components", None),
                 "has_unicode": params.get_bool("has_unicode", None),
                 "updated_since": params.get_datetime("updated_since", None),
-            }
+                "changes_since": params.get_int("changes_since", None),
+            },
+            # source names could contain keypath separators
+            keypath_separator=None,
         )
+        try:
+            source_status_filters = StatusModel.get_source_status_filters(
+                source_name=params.get_str("source_name", None),
+                status=params.get_int("source_status", None),
+                done=params.get_bool("source_status_done", None),
+            )
+        except ValueError:
+            return ApiResponseBadRequest(
+                "Invalid parameter 'source_name', it can contain only "
+                "letters, numbers, '_' (not repeated) and '-' characters."
+            )
+        filters.update(source_status_filters)
         filters.clean()
         kwargs["glif_filters"] = filters
         return view_func(request, *args, **kwargs)
@@ -262,6 +286,76 @@ def require_data(view_func):
 #     return wrapper
 
 
+def _get_glifs_prefetch_related(obj_cls, lookups):
+    # related glifs and layers are prefetched without the formatted data,
+    # it is used only by the export
+    prefetch_list = []
+    for lookup in lookups:
+        related_model = obj_cls
+        for field_name in lookup.split("__"):
+            related_model = related_model._meta.get_field(field_name).related_model
+        prefetch_list.append(
+            Prefetch(lookup, queryset=related_model.objects.defer("formatted_data"))
+        )
+    return prefetch_list
+
+
+def _get_glif_etag_fields(obj_cls):
+    # the payload contains the lock fields, lock changes don't touch updated_at
+    fields = ["id", "updated_at", "is_locked", "locked_by_id", "locked_at"]
+    if hasattr(obj_cls, "layers_updated_at"):
+        fields.append("layers_updated_at")
+    return fields
+
+
+def _get_glif_etag(obj_cls, filters, params):
+    # the etag is computed from the glif row only (one indexed query),
+    # related glifs are embedded in the response only when requested:
+    # in this case the rows of all the glifs of its graph (the same glifs
+    # loaded by load_glifs_graph) are taken into account too
+    fields = _get_glif_etag_fields(obj_cls)
+    values = list(obj_cls.objects.filter(**filters).values_list(*fields)[:2])
+    if len(values) != 1:
+        # not found or multiple objects, errors are returned by the view decorator
+        return None
+    etag_values = [obj_cls.__name__, values[0], sorted(params.items())]
+    if (
+        params.get_bool("return_related", False)
+        or params.get_bool("return_made_of", False)
+        or params.get_bool("return_used_by", False)
+    ):
+        graph_ids = get_glifs_graph_ids({obj_cls: [values[0][0]]}, params)
+        for glif_cls, glifs_ids in graph_ids.items():
+            if glifs_ids:
+                glifs_values = glif_cls.objects.filter(id__in=glifs_ids).values_list(
+                    *_get_glif_etag_fields(glif_cls)
+                )
+                etag_values.append((glif_cls.__name__, sorted(glifs_values)))
+    etag_hash = hashlib.md5(repr(etag_values).encode("utf-8")).hexdigest()
+    return f'"{etag_hash}"'
+
+
+def _get_etag_matches(request, etag):
+    if_none_match = request.headers.get("If-None-Match", "")
+    if not if_none_match or not etag:
+        return False
+    etags = [value.strip().removeprefix("W/") for value in if_none_match.split(",")]
+    return "*" in etags or etag in etags
+
+
+def _check_glif_etag(request, obj_cls, filters, params):
+    # compute the glif etag and return a not modified response
+    # if it matches the etag sent by the client, None otherwise
+    etag = _get_glif_etag(obj_cls, filters, params)
+    if not etag:
+        return None
+    if _get_etag_matches(request, etag):
+        return ApiResponseNotModified(etag)
+    # the etag response header is set by the api_view decorator
+    request.api_etag = etag
+    return None
+
+
 def require_atomic_element(**kwargs):
     # read decorator options
     select_related = kwargs.get("select_related", ["font", "locked_by"]) or []
@@ -270,6 +364,7 @@ def require_atomic_element(**kwargs):
     )
     prefix_params = kwargs.get("prefix_params", False)
     check_locked = kwargs.get("check_locked", False)
+    etag = kwargs.get("etag", False)
 
     def decorator(view_func, *args, **kwargs):
         @wraps(view_func)
@@ -290,12 +385,20 @@ def require_atomic_element(**kwargs):
                     f"Missing parameter '{prefix}id' or '{prefix}name'."
                 )
             filters["font__uid"] = kwargs["font"].uid
-            # retrieve atomic element object
             obj_cls = AtomicElement
+            # check etag before retrieving the object and its related objects
+            if etag:
+                response = _check_glif_etag(request, obj_cls, filters, params)
+                if response:
+                    return response
+            # retrieve atomic element object
             try:
                 obj = (
                     obj_cls.objects.select_related(*select_related)
-                    .prefetch_related(*prefetch_related)
+                    .prefetch_related(
+                        *_get_glifs_prefetch_related(obj_cls, prefetch_related)
+                    )
+                    .defer("formatted_data")
                     .get(**filters)
                 )
             except obj_cls.DoesNotExist:
@@ -386,6 +489,7 @@ def require_deep_component(**kwargs):
     prefetch_related = kwargs.get("prefetch_related", prefetch_related_defaults) or []
     prefix_params = kwargs.get("prefix_params", False)
     check_locked = kwargs.get("check_locked", False)
+    etag = kwargs.get("etag", False)
 
     def decorator(view_func, *args, **kwargs):
         @wraps(view_func)
@@ -406,12 +510,20 @@ def require_deep_component(**kwargs):
                     f"Missing parameter '{prefix}id' or '{prefix}name'."
                 )
             filters["font__uid"] = kwargs["font"].uid
-            # retrieve deep component object
             obj_cls = DeepComponent
+            # check etag before retrieving the object and its related objects
+            if etag:
+                response = _check_glif_etag(request, obj_cls, filters, params)
+                if response:
+                    return response
+            # retrieve deep component object
             try:
                 obj = (
                     obj_cls.objects.select_related(*select_related)
-                    .prefetch_related(*prefetch_related)
+                    .prefetch_related(
+                        *_get_glifs_prefetch_related(obj_cls, prefetch_related)
+                    )
+                    .defer("formatted_data")
                     .get(**filters)
                 )
             except obj_cls.DoesNotExist:
@@ -453,6 +565,7 @@ def require_character_glyph(**kwargs):
     prefetch_related = kwargs.get("prefetch_related", prefetch_related_defaults) or []
     prefix_params = kwargs.get("prefix_params", False)
     check_locked = kwargs.get("check_locked", False)
+    etag = kwargs.get("etag", False)
 
     def decorator(view_func, *args, **kwargs):
         @wraps(view_func)
@@ -476,12 +589,20 @@ def require_character_glyph(**kwargs):
                     )
                 )
             filters["font__uid"] = kwargs["font"].uid
-            # retrieve character glyph objecs
             obj_cls = CharacterGlyph
+            # check etag before retrieving the object and its related objects
+            if etag:
+                response = _check_glif_etag(request, obj_cls, filters, params)
+                if response:
+                    return response
+            # retrieve character glyph objecs
             try:
                 obj = (
                     obj_cls.objects.select_related(*select_related)
-                    .prefetch_related(*prefetch_related)
+                    .prefetch_related(
+                        *_get_glifs_prefetch_related(obj_cls, prefetch_related)
+                    )
+                    .defer("formatted_data")
                     .get(**filters)
                 )
             except obj_cls.DoesNotExist:
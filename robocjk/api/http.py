@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from django.conf import settings
-from django.http import JsonResponse
+from django.http import HttpResponseNotModified, JsonResponse
 
 
 class ApiResponse(JsonResponse):
@@ -32,6 +32,14 @@ class ApiResponseSuccess(ApiResponse):
         super().__init__(data=data, status=200, error=None)
 
 
+class ApiResponseNotModified(HttpResponseNotModified):
+    # 304 Not Modified - The resource has not been modified since the version specified by the request header If-None-Match (response has no content).
+
+    def __init__(self, etag):
+        super().__init__()
+        self["ETag"] = etag
+
+
 class ApiResponseError(ApiResponse):
     # 400 Bad Request - The server cannot or will not process the request due to an apparent client error (e.g., malformed request syntax, size too large, invalid request message framing, or deceptive request routing).
     # 401 Unauthorized - Similar to 403 Forbidden, but specifically for use when authentication is required and has failed or has not yet been provided
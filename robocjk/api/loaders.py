@@ -0,0 +1,285 @@
+from benedict import benedict
+
+from robocjk.api.serializers import (
+    ATOMIC_ELEMENT_LAYER_FIELDS,
+    ATOMIC_ELEMENT_LAYER_ID_FIELDS,
+    CHARACTER_GLYPH_ID_FIELDS,
+    CHARACTER_GLYPH_LAYER_FIELDS,
+    CHARACTER_GLYPH_LAYER_ID_FIELDS,
+    DEEP_COMPONENT_ID_FIELDS,
+)
+from robocjk.models import (
+    AtomicElement,
+    AtomicElementLayer,
+    CharacterGlyph,
+    CharacterGlyphLayer,
+    DeepComponent,
+)
+
+GLIFS_CLASSES = [
+    AtomicElement,
+    DeepComponent,
+    CharacterGlyph,
+]
+
+# (glif class, related name, through model, glif field, related glif field, related glif class)
+GLIFS_MADE_OF_RELATIONS = [
+    (
+        DeepComponent,
+        "atomic_elements",
+        DeepComponent.atomic_elements.through,
+        "deepcomponent_id",
+        "atomicelement_id",
+        AtomicElement,
+    ),
+    (
+        CharacterGlyph,
+        "deep_components",
+        CharacterGlyph.deep_components.through,
+        "characterglyph_id",
+        "deepcomponent_id",
+        DeepComponent,
+    ),
+    (
+        CharacterGlyph,
+        "character_glyphs",
+        CharacterGlyph.character_glyphs.through,
+        "from_characterglyph_id",
+        "to_characterglyph_id",
+        CharacterGlyph,
+    ),
+]
+
+# (glif class, related name, through model, glif field, related glif field, related glif class, related glif fields)
+GLIFS_USED_BY_RELATIONS = [
+    (
+        AtomicElement,
+        "deep_components",
+        DeepComponent.atomic_elements.through,
+        "atomicelement_id",
+        "deepcomponent_id",
+        DeepComponent,
+        DEEP_COMPONENT_ID_FIELDS,
+    ),
+    (
+        DeepComponent,
+        "character_glyphs",
+        CharacterGlyph.deep_components.through,
+        "deepcomponent_id",
+        "characterglyph_id",
+        CharacterGlyph,
+        CHARACTER_GLYPH_ID_FIELDS,
+    ),
+    (
+        CharacterGlyph,
+        "used_by_character_glyphs",
+        CharacterGlyph.character_glyphs.through,
+        "to_characterglyph_id",
+        "from_characterglyph_id",
+        CharacterGlyph,
+        CHARACTER_GLYPH_ID_FIELDS,
+    ),
+]
+
+
+def get_glifs_queryset(glif_cls, return_data=True):
+    glifs_qs = glif_cls.objects.select_related("locked_by").defer("formatted_data")
+    if not return_data:
+        glifs_qs = glifs_qs.defer("data")
+    return glifs_qs
+
+
+def load_glifs_graph(glifs, options=None):
+    """
+    Load all the objects needed for serializing the given glifs with the given options
+    (the whole made of closure, the layers and the used by glifs) using a few batched queries,
+    regardless of the number of glifs and of the made of depth.
+    Related objects are stored in the 'prefetched_<related_name>' attributes of the glifs,
+    then the serializers use them instead of querying the database.
+    """
+    options = benedict(options or {})
+    return_data = options.get_bool("return_data", True)
+    return_layers = options.get_bool("return_layers", True)
+    return_related = options.get_bool("return_related", False)
+    return_made_of = options.get_bool("return_made_of", False) or return_related
+    return_used_by = options.get_bool("return_used_by", False) or return_related
+    # glifs objects by class and id
+    graph = {glif_cls: {} for glif_cls in GLIFS_CLASSES}
+    for glif in glifs:
+        graph[type(glif)][glif.id] = glif
+    if return_made_of:
+        _load_made_of(graph, return_data)
+    if return_layers:
+        _load_layers(graph, return_data)
+    if return_used_by:
+        _load_used_by(graph)
+    return glifs
+
+
+def get_glifs_graph_ids(glifs_ids, options=None):
+    """
+    Return the ids (by glif class) of all the glifs loaded by load_glifs_graph
+    for the glifs with the given ids (by glif class) and the given options,
+    only the relations tables are queried, the glifs are not loaded.
+    """
+    options = benedict(options or {})
+    return_related = options.get_bool("return_related", False)
+    return_made_of = options.get_bool("return_made_of", False) or return_related
+    return_used_by = options.get_bool("return_used_by", False) or return_related
+    graph_ids = {
+        glif_cls: set(glifs_ids.get(glif_cls, [])) for glif_cls in GLIFS_CLASSES
+    }
+    if return_made_of:
+        pending_ids = {glif_cls: set(ids) for glif_cls, ids in graph_ids.items()}
+        while any(pending_ids.values()):
+            missing_ids = {glif_cls: set() for glif_cls in GLIFS_CLASSES}
+            for relation in GLIFS_MADE_OF_RELATIONS:
+                (
+                    glif_cls,
+                    _,
+                    through_cls,
+                    glif_field,
+                    related_field,
+                    related_cls,
+                ) = relation
+                if not pending_ids[glif_cls]:
+                    continue
+                related_ids = through_cls.objects.filter(
+                    **{f"{glif_field}__in": pending_ids[glif_cls]}
+                ).values_list(related_field, flat=True)
+                missing_ids[related_cls].update(
+                    set(related_ids) - graph_ids[related_cls]
+                )
+            for glif_cls, ids in missing_ids.items():
+                graph_ids[glif_cls].update(ids)
+            pending_ids = missing_ids
+    if return_used_by:
+        # the used by glifs of all the glifs in the graph are loaded
+        used_by_ids = {glif_cls: set() for glif_cls in GLIFS_CLASSES}
+        for relation in GLIFS_USED_BY_RELATIONS:
+            (
+                glif_cls,
+                _,
+                through_cls,
+                glif_field,
+                related_field,
+                related_cls,
+                _,
+            ) = relation
+            if not graph_ids[glif_cls]:
+                continue
+            used_by_ids[related_cls].update(
+                through_cls.objects.filter(
+                    **{f"{glif_field}__in": graph_ids[glif_cls]}
+                ).values_list(related_field, flat=True)
+            )
+        for glif_cls, ids in used_by_ids.items():
+            graph_ids[glif_cls].update(ids)
+    return graph_ids
+
+
+def _load_made_of(graph, return_data):
+    # load the made of glifs level by level, each glif is loaded only once,
+    # circular references are handled by the serializers
+    pending_ids = {glif_cls: set(graph[glif_cls].keys()) for glif_cls in GLIFS_CLASSES}
+    while any(pending_ids.values()):
+        relations_rows = []
+        for relation in GLIFS_MADE_OF_RELATIONS:
+            glif_cls, _, through_cls, glif_field, related_field, _ = relation
+            glif_ids = pending_ids[glif_cls]
+            rows = []
+            if glif_ids:
+                rows = list(
+                    through_cls.objects.filter(**{f"{glif_field}__in": glif_ids})
+                    .order_by("id")
+                    .values_list(glif_field, related_field)
+                )
+            relations_rows.append((relation, rows))
+        # load the related glifs not loaded yet
+        missing_ids = {glif_cls: set() for glif_cls in GLIFS_CLASSES}
+        for relation, rows in relations_rows:
+            related_cls = relation[5]
+            missing_ids[related_cls].update(
+                related_id
+                for _, related_id in rows
+                if related_id not in graph[related_cls]
+            )
+        for glif_cls, glif_ids in missing_ids.items():
+            if glif_ids:
+                glifs_qs = get_glifs_queryset(glif_cls, return_data)
+                graph[glif_cls].update(glifs_qs.in_bulk(glif_ids))
+        # store the related glifs
+        for relation, rows in relations_rows:
+            glif_cls, related_name, _, _, _, related_cls = relation
+            attr_name = f"prefetched_{related_name}"
+            for glif_id in pending_ids[glif_cls]:
+                setattr(graph[glif_cls][glif_id], attr_name, [])
+            for glif_id, related_id in rows:
+                related_glif = graph[related_cls].get(related_id)
+                if related_glif:
+                    getattr(graph[glif_cls][glif_id], attr_name).append(related_glif)
+        pending_ids = missing_ids
+
+
+def _load_layers(graph, return_data):
+    layers_relations = [
+        (
+            AtomicElement,
+            AtomicElementLayer,
+            ATOMIC_ELEMENT_LAYER_FIELDS
+            if return_data
+            else ATOMIC_ELEMENT_LAYER_ID_FIELDS,
+        ),
+        (
+            CharacterGlyph,
+            CharacterGlyphLayer,
+            CHARACTER_GLYPH_LAYER_FIELDS
+            if return_data
+            else CHARACTER_GLYPH_LAYER_ID_FIELDS,
+        ),
+    ]
+    for glif_cls, layer_cls, layer_fields in layers_relations:
+        glifs = graph[glif_cls]
+        if not glifs:
+            continue
+        for glif in glifs.values():
+            glif.prefetched_layers = []
+        layers_qs = layer_cls.objects.filter(glif_id__in=glifs.keys()).only(
+            *layer_fields
+        )
+        for layer in layers_qs:
+            glifs[layer.glif_id].prefetched_layers.append(layer)
+
+
+def _load_used_by(graph):
+    for relation in GLIFS_USED_BY_RELATIONS:
+        (
+            glif_cls,
+            related_name,
+            through_cls,
+            glif_field,
+            related_field,
+            related_cls,
+            related_fields,
+        ) = relation
+        glifs = graph[glif_cls]
+        if not glifs:
+            continue
+        rows = list(
+            through_cls.objects.filter(**{f"{glif_field}__in": glifs.keys()})
+            .order_by("id")
+            .values_list(glif_field, related_field)
+        )
+        related_ids = {related_id for _, related_id in rows}
+        related_glifs = {}
+        if related_ids:
+            related_glifs = related_cls.objects.only(*related_fields).in_bulk(
+                related_ids
+            )
+        attr_name = f"prefetched_{related_name}"
+        for glif in glifs.values():
+            setattr(glif, attr_name, [])
+        for glif_id, related_id in rows:
+            related_glif = related_glifs.get(related_id)
+            if related_glif:
+                getattr(glifs[glif_id], attr_name).append(related_glif)
@@ -37,6 +37,29 @@ FONT_FIELDS = [
     "designspace",
 ]
 
+EXPORT_RUN_FIELDS = [
+    "id",
+    "full_export",
+    "started_at",
+    "completed_at",
+    "outcome",
+    "error",
+    "db_read_duration",
+    "format_duration",
+    "write_duration",
+    "verify_duration",
+    "cleanup_duration",
+    "git_duration",
+    "character_glyphs_count",
+    "character_glyphs_layers_count",
+    "deep_components_count",
+    "atomic_elements_count",
+    "atomic_elements_layers_count",
+    "glifs_written_count",
+    "glifs_skipped_count",
+    "bytes_written",
+]
+
 GLIF_FIELDS = [
     "id",
     "data",
@@ -163,6 +186,27 @@ def _serialize_object(obj, fields, options):
     }
 
 
+def _serialize_related_objects(obj, related_name, fields):
+    # use the related objects loaded to 'prefetched_<related_name>' attribute
+    # (eg. by the glifs graph loader) if any, otherwise query only the needed fields
+    related_objs = getattr(obj, f"prefetched_{related_name}", None)
+    if related_objs is not None:
+        return [
+            {field: getattr(related_obj, field) for field in fields}
+            for related_obj in related_objs
+        ]
+    return list(getattr(obj, related_name).values(*fields))
+
+
+def _get_related_objects(obj, related_name):
+    # use the related objects loaded to 'prefetched_<related_name>' attribute
+    # (eg. by the glifs graph loader) if any, otherwise query them
+    related_objs = getattr(obj, f"prefetched_{related_name}", None)
+    if related_objs is not None:
+        return related_objs
+    return getattr(obj, related_name).all()
+
+
 def _serialize_glif(obj, fields, options):
     data = _serialize_object(obj, fields, options)
     if obj.unicode_hex:
@@ -230,11 +274,13 @@ def serialize_atomic_element(obj, options=None):
             if return_data
             else ATOMIC_ELEMENT_LAYER_ID_FIELDS
         )
-        data["layers"] = list(obj.layers.values(*layers_fields))
+        data["layers"] = _serialize_related_objects(obj, "layers", layers_fields)
     if return_made_of:
         data["made_of"] = []
     if return_used_by:
-        data["used_by"] = list(obj.deep_components.values(*DEEP_COMPONENT_ID_FIELDS))
+        data["used_by"] = _serialize_related_objects(
+            obj, "deep_components", DEEP_COMPONENT_ID_FIELDS
+        )
     return data
 
 
@@ -262,11 +308,13 @@ def serialize_deep_component(obj, options=None):
     if return_made_of:
         data["made_of"] = [
             serialize_atomic_element(glif_obj, options)
-            for glif_obj in obj.atomic_elements.all()
+            for glif_obj in _get_related_objects(obj, "atomic_elements")
         ]
 
     if return_used_by:
-        data["used_by"] = list(obj.character_glyphs.values(*CHARACTER_GLYPH_ID_FIELDS))
+        data["used_by"] = _serialize_related_objects(
+            obj, "character_glyphs", CHARACTER_GLYPH_ID_FIELDS
+        )
     return data
 
 
@@ -286,7 +334,7 @@ def serialize_character_glyph(obj, options=None):
             if return_data
             else CHARACTER_GLYPH_LAYER_ID_FIELDS
         )
-        data["layers"] = list(obj.layers.values(*layers_fields))
+        data["layers"] = _serialize_related_objects(obj, "layers", layers_fields)
     if return_made_of:
         made_of_character_glyphs = []
         # create a set for storing character-glyphs ids to avoid possible circular references
@@ -298,18 +346,18 @@ def serialize_character_glyph(obj, options=None):
             options["made_of_character_glyphs_refs"] = made_of_character_glyphs_refs
             made_of_character_glyphs = [
                 serialize_character_glyph(glif_obj, options)
-                for glif_obj in obj.character_glyphs.all()
+                for glif_obj in _get_related_objects(obj, "character_glyphs")
             ]
 
         made_of_deep_components = [
             serialize_deep_component(glif_obj, options)
-            for glif_obj in obj.deep_components.all()
+            for glif_obj in _get_related_objects(obj, "deep_components")
         ]
 
         data["made_of"] = made_of_character_glyphs + made_of_deep_components
     if return_used_by:
-        used_by_character_glyphs = list(
-            obj.used_by_character_glyphs.values(*CHARACTER_GLYPH_ID_FIELDS)
+        used_by_character_glyphs = _serialize_related_objects(
+            obj, "used_by_character_glyphs", CHARACTER_GLYPH_ID_FIELDS
         )
         data["used_by"] = used_by_character_glyphs
     return data
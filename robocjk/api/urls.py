@@ -32,11 +32,13 @@ from robocjk.api.views import (
     deep_component_lock,
     deep_component_unlock,
     deep_component_update,
+    export_run_list,
     font_create,
     font_delete,
     font_get,
     font_list,
     font_update,
+    glif_get_many,
     glif_list,
     glif_lock,
     glif_unlock,
@@ -89,10 +91,13 @@ urlpatterns = [
         glyphs_composition_update,
         name="glyphs_composition_update",
     ),
+    # Export Run
+    path("api/export-run/list/", export_run_list, name="export_run_list"),
     # All glif (Atomic Element + Deep Component + Character Glyph)
     path("api/glif/list/", glif_list, name="glif_list"),
     path("api/glif/lock/", glif_lock, name="glif_lock"),
     path("api/glif/unlock/", glif_unlock, name="glif_unlock"),
+    path("api/glif/get-many/", glif_get_many, name="glif_get_many"),
     # Atomic Element
     path("api/atomic-element/list/", atomic_element_list, name="atomic_element_list"),
     path("api/atomic-element/get/", atomic_element_get, name="atomic_element_get"),
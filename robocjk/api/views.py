@@ -1,10 +1,12 @@
+import hashlib
 from datetime import datetime
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import F, Max, Q
 
 from robocjk.api.auth import get_auth_token
 from robocjk.api.decorators import (
@@ -26,11 +28,13 @@ from robocjk.api.http import (
     ApiResponseForbidden,
     ApiResponseSuccess,
 )
+from robocjk.api.loaders import get_glifs_queryset, load_glifs_graph
 from robocjk.api.serializers import (
     ATOMIC_ELEMENT_ID_FIELDS,
     CHARACTER_GLYPH_ID_FIELDS,
     DEEP_COMPONENT_ID_FIELDS,
     DELETED_GLIF_ID_FIELDS,
+    EXPORT_RUN_FIELDS,
     FONT_FIELDS,
     PROJECT_FIELDS,
     USER_FIELDS,
@@ -46,6 +50,7 @@ from robocjk.models import (
     DeepComponent,
     DeletedGlif,
     Font,
+    GlifChange,
     GlyphsComposition,
     Project,
 )
@@ -295,18 +300,92 @@ def glyphs_composition_update(request, params, user, font, *args, **kwargs):
     return ApiResponseSuccess(glyphs_composition_obj.serialize())
 
 
+@api_view
+@require_user
+@require_project
+def export_run_list(request, params, user, project, *args, **kwargs):
+    export_runs_qs = project.export_runs.all()
+    font_uid = params.get_uuid("font_uid")
+    if font_uid:
+        export_runs_qs = export_runs_qs.filter(font__uid=font_uid)
+    limit = max(1, params.get_int("limit", 100))
+    data = list(
+        export_runs_qs.order_by("-id").values(
+            *EXPORT_RUN_FIELDS, font_uid=F("font__uid")
+        )[:limit]
+    )
+    return ApiResponseSuccess(data)
+
+
 @api_view
 @require_user
 @require_font
 @require_glif_filters
 def glif_list(request, params, user, font, glif_filters, *args, **kwargs):
+    cache_timeout = settings.ROBOCJK_GLIF_LIST_CACHE_TIMEOUT
+    if not cache_timeout:
+        return ApiResponseSuccess(_get_glif_list_data(font, glif_filters))
+    # the font glifs version is updated on every glif save, delete, lock and unlock,
+    # so cached data of previous versions are never used again (and expire)
+    cache = caches[settings.ROBOCJK_GLIF_LIST_CACHE]
+    filters_hash = hashlib.md5(
+        repr(sorted(glif_filters.items())).encode("utf-8")
+    ).hexdigest()
+    cache_key = f"robocjk-glif-list-{font.uid}-{font.glifs_version}-{filters_hash}"
+    data = cache.get(cache_key)
+    if data is None:
+        data = _get_glif_list_data(font, glif_filters)
+        cache.set(cache_key, data, cache_timeout)
+    return ApiResponseSuccess(data)
+
+
+def _get_glif_list_data(font, glif_filters):
+    glif_filters = glif_filters.copy()
     updated_since = glif_filters.pop("updated_since", None)
+    changes_since = glif_filters.pop("changes_since", None)
+    changes_cursor = font.glif_changes.aggregate(Max("id"))["id__max"] or 0
 
     atomic_elements_qs = font.atomic_elements.filter(**glif_filters)
     deep_components_qs = font.deep_components.filter(**glif_filters)
     character_glyphs_qs = font.character_glyphs.filter(**glif_filters)
 
-    if updated_since:
+    if changes_since is not None:
+        changes_qs = font.glif_changes.filter(
+            id__gt=changes_since,
+            id__lte=changes_cursor,
+        )
+        changed_qs = changes_qs.exclude(action=GlifChange.ACTION_DELETE)
+        # glifs changed directly or through one of their layers
+        atomic_elements_qs = atomic_elements_qs.filter(
+            Q(
+                id__in=changed_qs.filter(
+                    glif_type=DeletedGlif.GLIF_TYPE_ATOMIC_ELEMENT
+                ).values("glif_id")
+            )
+            | Q(
+                id__in=changes_qs.filter(
+                    glif_type=DeletedGlif.GLIF_TYPE_ATOMIC_ELEMENT_LAYER
+                ).values("parent_glif_id")
+            )
+        )
+        deep_components_qs = deep_components_qs.filter(
+            id__in=changed_qs.filter(
+                glif_type=DeletedGlif.GLIF_TYPE_DEEP_COMPONENT
+            ).values("glif_id")
+        )
+        character_glyphs_qs = character_glyphs_qs.filter(
+            Q(
+                id__in=changed_qs.filter(
+                    glif_type=DeletedGlif.GLIF_TYPE_CHARACTER_GLYPH
+                ).values("glif_id")
+            )
+            | Q(
+                id__in=changes_qs.filter(
+                    glif_type=DeletedGlif.GLIF_TYPE_CHARACTER_GLYPH_LAYER
+                ).values("parent_glif_id")
+            )
+        )
+    elif updated_since:
         atomic_elements_qs = atomic_elements_qs.filter(
             Q(updated_at__gt=updated_since) | Q(layers_updated_at__gt=updated_since)
         )
@@ -343,14 +422,24 @@ def glif_list(request, params, user, font, glif_filters, *args, **kwargs):
         "character_glyphs": character_glyphs_list,
     }
 
-    if updated_since:
+    if changes_since is not None:
+        # same shape of the deleted glifs returned using updated_since
+        deleted_glifs_qs = (
+            changes_qs.filter(action=GlifChange.ACTION_DELETE)
+            .annotate(deleted_at=F("created_at"))
+            .values(*DELETED_GLIF_ID_FIELDS)
+        )
+        deleted_glifs_list = list(deleted_glifs_qs)
+        data["deleted_glifs"] = deleted_glifs_list
+    elif updated_since:
         deleted_glifs_qs = font.deleted_glifs.filter(
             deleted_at__gt=updated_since,
         ).values(*DELETED_GLIF_ID_FIELDS)
         deleted_glifs_list = list(deleted_glifs_qs)
         data["deleted_glifs"] = deleted_glifs_list
 
-    return ApiResponseSuccess(data)
+    data["changes_cursor"] = changes_cursor
+    return data
 
 
 @api_view
@@ -370,20 +459,20 @@ def glif_lock(request, params, user, font, *args, **kwargs):
     character_glyphs_list = []
 
     if atomic_elements_ids or atomic_elements_names:
-        atomic_elements_qs = font.atomic_elements.filter(
+        atomic_elements_qs = font.atomic_elements.defer("formatted_data").filter(
             Q(id__in=atomic_elements_ids) | Q(name__in=atomic_elements_names)
         )
         atomic_elements_list = list(atomic_elements_qs)
 
     if deep_components_ids or deep_components_names:
-        deep_components_qs = font.deep_components.filter(
+        deep_components_qs = font.deep_components.defer("formatted_data").filter(
             Q(id__in=deep_components_ids) | Q(name__in=deep_components_names)
         )
         deep_components_list = list(deep_components_qs)
 
     if character_glyphs_ids or character_glyphs_names:
         # fmt: off
-        character_glyphs_qs = font.character_glyphs.filter(
+        character_glyphs_qs = font.character_glyphs.defer("formatted_data").filter(
             Q(id__in=character_glyphs_ids) |
             Q(name__in=character_glyphs_names) |
             Q(unicode_hex__in=character_glyphs_names)
@@ -394,6 +483,7 @@ def glif_lock(request, params, user, font, *args, **kwargs):
     glif_list = atomic_elements_list + deep_components_list + character_glyphs_list
     for glif_obj in glif_list:
         glif_obj.lock_by(user, save=True)
+    load_glifs_graph(glif_list, params)
 
     data = {
         "atomic_elements": [
@@ -429,20 +519,20 @@ def glif_unlock(request, params, user, font, *args, **kwargs):
     character_glyphs_list = []
 
     if atomic_elements_ids or atomic_elements_names:
-        atomic_elements_qs = font.atomic_elements.filter(
+        atomic_elements_qs = font.atomic_elements.defer("formatted_data").filter(
             Q(id__in=atomic_elements_ids) | Q(name__in=atomic_elements_names)
         )
         atomic_elements_list = list(atomic_elements_qs)
 
     if deep_components_ids or deep_components_names:
-        deep_components_qs = font.deep_components.filter(
+        deep_components_qs = font.deep_components.defer("formatted_data").filter(
             Q(id__in=deep_components_ids) | Q(name__in=deep_components_names)
         )
         deep_components_list = list(deep_components_qs)
 
     if character_glyphs_ids or character_glyphs_names:
         # fmt: off
-        character_glyphs_qs = font.character_glyphs.filter(
+        character_glyphs_qs = font.character_glyphs.defer("formatted_data").filter(
             Q(id__in=character_glyphs_ids) |
             Q(name__in=character_glyphs_names) |
             Q(unicode_hex__in=character_glyphs_names)
@@ -453,6 +543,7 @@ def glif_unlock(request, params, user, font, *args, **kwargs):
     glif_list = atomic_elements_list + deep_components_list + character_glyphs_list
     for glif_obj in glif_list:
         glif_obj.unlock_by(user, save=True)
+    load_glifs_graph(glif_list, params)
 
     data = {
         "atomic_elements": [
@@ -471,6 +562,93 @@ def glif_unlock(request, params, user, font, *args, **kwargs):
     return ApiResponseSuccess(data)
 
 
+@api_view
+@require_user
+@require_font
+def glif_get_many(request, params, user, font, *args, **kwargs):
+    atomic_elements_ids = params.get_int_list("atomic_elements_ids")
+    atomic_elements_names = params.get_str_list("atomic_elements_names")
+    atomic_elements_list = []
+
+    deep_components_ids = params.get_int_list("deep_components_ids")
+    deep_components_names = params.get_str_list("deep_components_names")
+    deep_components_list = []
+
+    character_glyphs_ids = params.get_int_list("character_glyphs_ids")
+    character_glyphs_names = params.get_str_list("character_glyphs_names")
+    character_glyphs_list = []
+
+    glifs_max = settings.ROBOCJK_GLIF_GET_MANY_MAX
+    glifs_count = sum(
+        len(values)
+        for values in [
+            atomic_elements_ids,
+            atomic_elements_names,
+            deep_components_ids,
+            deep_components_names,
+            character_glyphs_ids,
+            character_glyphs_names,
+        ]
+    )
+    if glifs_max and glifs_count > glifs_max:
+        return ApiResponseBadRequest(
+            f"Too many glifs requested ({glifs_count}), the maximum is {glifs_max}."
+        )
+
+    return_data = params.get_bool("return_data", True)
+
+    if atomic_elements_ids or atomic_elements_names:
+        atomic_elements_qs = (
+            get_glifs_queryset(AtomicElement, return_data)
+            .filter(font=font)
+            .filter(Q(id__in=atomic_elements_ids) | Q(name__in=atomic_elements_names))
+        )
+        atomic_elements_list = list(atomic_elements_qs)
+
+    if deep_components_ids or deep_components_names:
+        deep_components_qs = (
+            get_glifs_queryset(DeepComponent, return_data)
+            .filter(font=font)
+            .filter(Q(id__in=deep_components_ids) | Q(name__in=deep_components_names))
+        )
+        deep_components_list = list(deep_components_qs)
+
+    if character_glyphs_ids or character_glyphs_names:
+        # fmt: off
+        character_glyphs_qs = (
+            get_glifs_queryset(CharacterGlyph, return_data)
+            .filter(font=font)
+            .filter(
+                Q(id__in=character_glyphs_ids) |
+                Q(name__in=character_glyphs_names) |
+                Q(unicode_hex__in=character_glyphs_names)
+            )
+        )
+        # fmt: on
+        character_glyphs_list = list(character_glyphs_qs)
+
+    glif_list = atomic_elements_list + deep_components_list + character_glyphs_list
+    load_glifs_graph(glif_list, params)
+
+    # serialization options are copied for each glif because the serializers
+    # store the character glyphs already serialized (circular references) in them
+    data = {
+        "atomic_elements": [
+            atomic_element_obj.serialize(options=params.copy())
+            for atomic_element_obj in atomic_elements_list
+        ],
+        "deep_components": [
+            deep_components_obj.serialize(options=params.copy())
+            for deep_components_obj in deep_components_list
+        ],
+        "character_glyphs": [
+            character_glyphs_obj.serialize(options=params.copy())
+            for character_glyphs_obj in character_glyphs_list
+        ],
+    }
+    return ApiResponseSuccess(data)
+
+
 @transaction.atomic
 def glif_delete(request, user, glif):
     glif_type = DeletedGlif.get_glif_type_by_glif(glif)
@@ -483,6 +661,8 @@ def glif_delete(request, user, glif):
     glif_name = glif.name
     glif_filename = glif.filename
     glif_filepath = glif.path()
+    # the deletion of the glif and its layers is recorded
+    # in the changes journal by the pre_delete signal receiver
     glif_deleted_data = glif.delete()
     DeletedGlif.objects.create(
         deleted_at=datetime.now(),
@@ -511,8 +691,9 @@ def atomic_element_list(request, params, user, font, glif_filters, *args, **kwar
 
 @api_view
 @require_user
-@require_atomic_element()
+@require_atomic_element(etag=True, prefetch_related=[])
 def atomic_element_get(request, params, user, atomic_element, *args, **kwargs):
+    load_glifs_graph([atomic_element], params)
     return ApiResponseSuccess(atomic_element.serialize(options=params))
 
 
@@ -532,7 +713,7 @@ def atomic_element_create(request, params, user, font, data, glif, *args, **kwar
     atomic_element.name = glif.name
     atomic_element.data = data
     # atomic_element.lock_by(user)
-    atomic_element.save_by(user)
+    atomic_element.save_by(user, glif_data=glif)
     return ApiResponseSuccess(atomic_element.serialize(options=params))
 
 
@@ -544,7 +725,7 @@ def atomic_element_update(
     request, params, user, atomic_element, data, glif, *args, **kwargs
 ):
     atomic_element.data = data
-    atomic_element.save_by(user)
+    atomic_element.save_by(user, glif_data=glif)
     return ApiResponseSuccess(atomic_element.serialize(options=params))
 
 
@@ -596,12 +777,13 @@ def atomic_element_layer_create(
             )
         )
 
-    AtomicElementLayer.objects.create(
+    atomic_element_layer = AtomicElementLayer(
         glif_id=atomic_element.id,
         group_name=group_name,
         data=data,
         updated_by=user,
     )
+    atomic_element_layer.save(glif_data=glif)
     return ApiResponseSuccess(atomic_element.serialize(options=params))
 
 
@@ -634,10 +816,18 @@ def atomic_element_layer_rename(
 @require_atomic_element_layer()
 @require_data
 def atomic_element_layer_update(
-    request, params, user, atomic_element, atomic_element_layer, data, *args, **kwargs
+    request,
+    params,
+    user,
+    atomic_element,
+    atomic_element_layer,
+    data,
+    glif,
+    *args,
+    **kwargs,
 ):
     atomic_element_layer.data = data
-    atomic_element_layer.save_by(user)
+    atomic_element_layer.save_by(user, glif_data=glif)
     return ApiResponseSuccess(atomic_element.serialize(options=params))
 
 
@@ -666,8 +856,9 @@ def deep_component_list(request, params, user, font, glif_filters, *args, **kwar
 
 @api_view
 @require_user
-@require_deep_component()
+@require_deep_component(etag=True, prefetch_related=[])
 def deep_component_get(request, params, user, deep_component, *args, **kwargs):
+    load_glifs_graph([deep_component], params)
     return ApiResponseSuccess(deep_component.serialize(options=params))
 
 
@@ -687,7 +878,7 @@ def deep_component_create(request, params, user, font, data, glif, *args, **kwar
     deep_component.name = glif.name
     deep_component.data = data
     # deep_component.lock_by(user)
-    deep_component.save_by(user)
+    deep_component.save_by(user, glif_data=glif)
     return ApiResponseSuccess(deep_component.serialize(options=params))
 
 
@@ -699,7 +890,7 @@ def deep_component_update(
     request, params, user, deep_component, data, glif, *args, **kwargs
 ):
     deep_component.data = data
-    deep_component.save_by(user)
+    deep_component.save_by(user, glif_data=glif)
     return ApiResponseSuccess(deep_component.serialize(options=params))
 
 
@@ -746,8 +937,9 @@ def character_glyph_list(request, params, user, font, glif_filters, *args, **kwa
 
 @api_view
 @require_user
-@require_character_glyph()
+@require_character_glyph(etag=True, prefetch_related=[])
 def character_glyph_get(request, params, user, character_glyph, *args, **kwargs):
+    load_glifs_graph([character_glyph], params)
     return ApiResponseSuccess(character_glyph.serialize(options=params))
 
 
@@ -767,7 +959,7 @@ def character_glyph_create(request, params, user, font, data, glif, *args, **kwa
     character_glyph.name = glif.name
     character_glyph.data = data
     # character_glyph.lock_by(user)
-    character_glyph.save_by(user)
+    character_glyph.save_by(user, glif_data=glif)
     return ApiResponseSuccess(character_glyph.serialize(options=params))
 
 
@@ -779,7 +971,7 @@ def character_glyph_update(
     request, params, user, character_glyph, data, glif, *args, **kwargs
 ):
     character_glyph.data = data
-    character_glyph.save_by(user)
+    character_glyph.save_by(user, glif_data=glif)
     return ApiResponseSuccess(character_glyph.serialize(options=params))
 
 
@@ -831,12 +1023,13 @@ def character_glyph_layer_create(
             )
         )
 
-    CharacterGlyphLayer.objects.create(
+    character_glyph_layer = CharacterGlyphLayer(
         glif_id=character_glyph.id,
         group_name=group_name,
         data=data,
         updated_by=user,
     )
+    character_glyph_layer.save(glif_data=glif)
     return ApiResponseSuccess(character_glyph.serialize(options=params))
 
 
@@ -869,10 +1062,18 @@ def character_glyph_layer_rename(
 @require_character_glyph_layer()
 @require_data
 def character_glyph_layer_update(
-    request, params, user, character_glyph, character_glyph_layer, data, *args, **kwargs
+    request,
+    params,
+    user,
+    character_glyph,
+    character_glyph_layer,
+    data,
+    glif,
+    *args,
+    **kwargs,
 ):
     character_glyph_layer.data = data
-    character_glyph_layer.save_by(user)
+    character_glyph_layer.save_by(user, glif_data=glif)
     return ApiResponseSuccess(character_glyph.serialize(options=params))
 
 
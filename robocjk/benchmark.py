@@ -0,0 +1,127 @@
+import datetime as dt
+import platform
+import statistics
+import tempfile
+import time
+
+import fsutil
+from django.db import transaction
+from django.test.utils import override_settings
+
+from robocjk.core import GlifData
+from robocjk.generator import FontGenerator
+from robocjk.models import ExportRun, Font, Project
+from robocjk.utils import FORMAT_GLIF_VERSION, format_glif, username_to_filename
+
+
+def create_benchmark_font(size):
+    """
+    Create a project with a font containing size generated character glyphs
+    (and the atomic elements and deep components used by them).
+    """
+    project = Project.objects.create(name=f"Benchmark {dt.datetime.now()}")
+    font = Font.objects.create(project=project, name="Benchmark")
+    generator = FontGenerator(
+        font,
+        atomic_elements_count=max(1, size // 20),
+        deep_components_count=max(1, size // 4),
+        character_glyphs_count=size,
+    )
+    generator.generate()
+    return font
+
+
+def measure(func, items, iterations=1):
+    """
+    Call func with each item for the given number of iterations,
+    return the result with the durations (in seconds) of the iterations.
+    """
+    durations = []
+    for _ in range(max(1, iterations)):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        durations.append(time.perf_counter() - start)
+    return get_result(durations, len(items))
+
+
+def get_result(durations, items_count):
+    duration_min = min(durations)
+    return {
+        "items": items_count,
+        "iterations": len(durations),
+        "duration_min": duration_min,
+        "duration_mean": statistics.mean(durations),
+        "duration_max": max(durations),
+        "duration_per_item": (duration_min / items_count) if items_count else 0.0,
+    }
+
+
+def measure_export(font, iterations=1):
+    """
+    Measure the full export of the font to a temporary directory,
+    the result includes the duration of each export phase (of the fastest run).
+    """
+    durations = []
+    phases_durations = None
+    glifs_count = 0
+    with tempfile.TemporaryDirectory() as temp_path:
+        with override_settings(GIT_REPOSITORIES_PATH=temp_path):
+            for _ in range(max(1, iterations)):
+                # always export to an empty directory
+                fsutil.remove_dir(font.path())
+                font.export_run = ExportRun(project=font.project, font=font)
+                start = time.perf_counter()
+                font.save_to_file_system(full_export=True)
+                duration = time.perf_counter() - start
+                if not durations or duration < min(durations):
+                    export_run = font.export_run
+                    phases_durations = {
+                        phase: getattr(export_run, f"{phase}_duration")
+                        for phase in ExportRun.PHASES
+                    }
+                    glifs_count = export_run.glifs_written_count
+                durations.append(duration)
+                del font.export_run
+    result = get_result(durations, glifs_count)
+    result["phases"] = phases_durations
+    return result
+
+
+def run_benchmarks(size=100, iterations=3, font=None):
+    """
+    Run the benchmarks of glifs parsing, formatting, file names, serialization
+    and export, using the given font or a generated font with size character glyphs.
+    Changes to the database are always rolled back.
+    Return the results (json serializable).
+    """
+    results = {}
+    with transaction.atomic():
+        if font is None:
+            font = create_benchmark_font(size)
+        glifs = list(
+            font.character_glyphs.select_related("locked_by").order_by("id")[:size]
+        )
+        glifs_data = [glif.data for glif in glifs]
+        glifs_names = [glif.name for glif in glifs]
+
+        def parse_string(data):
+            GlifData().parse_string(data)
+
+        results["parse_string"] = measure(parse_string, glifs_data, iterations)
+        results["format_glif"] = measure(format_glif, glifs_data, iterations)
+        results["username_to_filename"] = measure(
+            username_to_filename, glifs_names, iterations
+        )
+        results["serialize"] = measure(lambda glif: glif.serialize(), glifs, iterations)
+        results["export"] = measure_export(font, iterations)
+        transaction.set_rollback(True)
+    return {
+        "created_at": dt.datetime.now().isoformat(),
+        "font": font.full_name,
+        "size": len(glifs),
+        "iterations": iterations,
+        "python_version": platform.python_version(),
+        "format_glif_version": FORMAT_GLIF_VERSION,
+        "results": results,
+    }
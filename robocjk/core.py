@@ -1,3 +1,8 @@
+import base64
+import datetime as dt
+import functools
+import multiprocessing
+from collections import namedtuple
 from xml.etree import ElementTree
 
 from benedict import benedict
@@ -8,30 +13,130 @@ from robocjk.utils import username_to_filename
 # from django.conf import settings
 
 
+def plist_from_xml(node):
+    """
+    Convert a plist xml node (eg. <lib><dict>) to the corresponding python object,
+    the result is the same of plistlib.loads with the node serialized to string.
+    """
+    tag = node.tag
+    if tag == "dict":
+        value = {}
+        key = None
+        for child in node:
+            if child.tag == "key":
+                key = child.text or ""
+                continue
+            if key is None:
+                raise ValueError("Invalid plist dict, missing key.")
+            value[key] = plist_from_xml(child)
+            key = None
+        return value
+    elif tag == "array":
+        return [plist_from_xml(child) for child in node]
+    elif tag == "string":
+        return node.text or ""
+    elif tag == "integer":
+        text = node.text or ""
+        if text.startswith("0x") or text.startswith("0X"):
+            return int(text, 16)
+        return int(text)
+    elif tag == "real":
+        return float(node.text)
+    elif tag == "true":
+        return True
+    elif tag == "false":
+        return False
+    elif tag == "data":
+        return base64.b64decode((node.text or "").encode("ascii"))
+    elif tag == "date":
+        return dt.datetime.strptime(node.text, "%Y-%m-%dT%H:%M:%SZ")
+    raise ValueError(f"Invalid plist node <{tag}>.")
+
+
+# compact (picklable) result of a glif parsed by GlifData.parse_strings,
+# it has the same properties of GlifData (except xml and lib),
+# so it can be passed to glif models save(glif_data=...),
+# slim records (parsed with fields) have only the requested values (the others are None)
+# and must not be passed to save
+GlifDataRecord = namedtuple(
+    "GlifDataRecord",
+    [
+        "ok",
+        "error",
+        "xml_string",
+        "name",
+        "filename",
+        "unicode_hex",
+        "unicodes",
+        "components_names",
+        "components_str",
+        "components",
+        "has_components",
+        "has_outlines",
+        "has_unicode",
+        "has_variation_axis",
+        "is_empty",
+        "status_color",
+        "status",
+        "status_with_variations",
+    ],
+    defaults=(None,) * 18,
+)
+
+GLIF_DATA_RECORD_FIELDS = GlifDataRecord._fields[2:]
+
+
+def _parse_string_to_record(s, fields=None):
+    # slim records are parsed lazily, the lib is decoded only if a field needs it
+    glif_data = GlifData()
+    glif_data.parse_string(s, lazy=fields is not None)
+    return glif_data.to_record(fields)
+
+
 class GlifData:
-    _error = None
-    _xml_string = None
-    _xml = None
-    _lib = None
-    _name = ""
-    _filename = ""
-    _unicode_hex = ""
-    _unicodes = []
-    _components_names = []
-    _components_str = ""
-    _has_components = False
-    _has_outlines = False
-    _has_unicode = False
-    _has_variation_axis = False
-    _is_empty = True
-    _status_color = None
-    _status = None
-    _status_dict = None  # status and variation status
-    _status_with_variations = {}
-    _ok = False
+    """
+    Glif xml data parser, the lib (plist) is decoded the first time
+    one of the values read from it is accessed if the data is parsed with lazy=True,
+    otherwise it is decoded (and validated) while parsing.
+    Slots are used to keep instances small, bulk jobs hold many of them at once.
+    """
+
+    __slots__ = (
+        "_error",
+        "_ok",
+        "_xml_string",
+        "_xml",
+        "_name",
+        "_filename",
+        "_unicodes",
+        "_lib_xml",
+        "_lib_dict",
+        "_lib",
+        "_outline_xml",
+        "_status_with_variations",
+        "_components_names",
+        "_components",
+    )
 
     def __init__(self, *args):
         super().__init__()
+        self._reset()
+
+    def _reset(self):
+        self._error = None
+        self._ok = False
+        self._xml_string = None
+        self._xml = None
+        self._name = ""
+        self._filename = ""
+        self._unicodes = []
+        self._lib_xml = None
+        self._lib_dict = None
+        self._lib = None
+        self._outline_xml = None
+        self._status_with_variations = None
+        self._components_names = None
+        self._components = None
 
     #     def parse_file(self, fp):
     #         self._ok = False
@@ -48,12 +153,16 @@ class GlifData:
     #             return
     #         self._ok = True
 
-    def parse_string(self, s):
-        self._ok = False
-        self._error = None
+    def parse_string(self, s, lazy=False):
+        """
+        Parse the glif xml string, if lazy is True the lib is not decoded
+        until needed, so lib errors are raised when accessing its values.
+        """
+        self._reset()
         try:
             self._xml_string = s.strip()
-            self._xml = ElementTree.fromstring(self._xml_string)
+            xml_nodes = self._parse_xml(self._xml_string)
+            self._xml = xml_nodes["glyph_xml"]
             self._xml_string = "<?xml version='1.0' encoding='UTF-8'?>\n{}".format(
                 ElementTree.tostring(self._xml).decode()
             )
@@ -61,15 +170,117 @@ class GlifData:
             self._error = xml_data_error
             return
         try:
-            self._parse_data()
+            self._parse_data(**xml_nodes)
+            if not lazy:
+                self._parse_lib()
         except Exception as xml_parse_error:
             self._error = xml_parse_error
             return
         self._ok = True
 
-    def _parse_data(self):
+    @staticmethod
+    def parse_strings(strings, fields=None, pool=None, processes=None, chunksize=1):
+        """
+        Parse the given xml strings using a processes pool and return the list
+        of the parsed data records (GlifDataRecord) in the same order of the strings,
+        errors are reported per record (ok is False and error is the error message).
+        If fields are given the records contain only their values (slim records),
+        so less data is sent back from the workers.
+        The given pool is used if any, otherwise a new one is created using
+        the given number of processes (by default the number of cpus - 1).
+        """
+        if fields is not None:
+            fields = tuple(fields)
+            invalid_fields = set(fields) - set(GLIF_DATA_RECORD_FIELDS)
+            if invalid_fields:
+                raise ValueError(f"Invalid glif data record fields: {invalid_fields}.")
+        parse_func = functools.partial(_parse_string_to_record, fields=fields)
+        if pool is not None:
+            return pool.map(parse_func, strings, chunksize=chunksize)
+        if processes is None:
+            processes = max(1, (multiprocessing.cpu_count() - 1))
+        if processes <= 1:
+            return [parse_func(s) for s in strings]
+        with multiprocessing.Pool(processes=processes) as pool:
+            return pool.map(parse_func, strings, chunksize=chunksize)
+
+    def to_record(self, fields=None):
+        """
+        Return the parsed data as GlifDataRecord, if fields are given only their
+        values are read (errors raised by a lazily parsed lib make the record not ok).
+        """
+        fields = GLIF_DATA_RECORD_FIELDS if fields is None else fields
+        if self._ok:
+            try:
+                values = {field: getattr(self, field) for field in fields}
+                return GlifDataRecord(ok=True, error=None, **values)
+            except Exception as lib_error:
+                self._ok = False
+                self._error = lib_error
+        error_values = {
+            "name": self._name,
+            "filename": self._filename,
+            "unicode_hex": "",
+            "unicodes": [],
+            "components_names": [],
+            "components_str": "",
+            "components": [],
+            "has_components": False,
+            "has_outlines": False,
+            "has_unicode": False,
+            "has_variation_axis": False,
+            "is_empty": True,
+            "status_with_variations": {},
+        }
+        return GlifDataRecord(
+            ok=False,
+            error=str(self._error),
+            **{field: error_values.get(field) for field in fields},
+        )
+
+    @staticmethod
+    def _parse_xml(xml_string):
+        """
+        Parse the xml string in a single pass (using a pull parser events),
+        collecting the glyph root node and the nodes needed by _parse_data
+        while the tree is built, instead of searching them afterwards.
+        """
+        parser = ElementTree.XMLPullParser(events=("start", "end"))
+        parser.feed(xml_string)
+        parser.close()
+        glyph_xml = None
+        unicodes_xml = []
+        lib_xml = None
+        outline_xml = None
+        depth = 0
+        parent_tag = None
+        for event, node in parser.read_events():
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    glyph_xml = node
+                elif depth == 2:
+                    parent_tag = node.tag
+                continue
+            depth -= 1
+            if depth == 1:
+                if node.tag == "unicode":
+                    unicodes_xml.append(node)
+                elif node.tag == "outline" and outline_xml is None:
+                    outline_xml = node
+            elif depth == 2:
+                if parent_tag == "lib" and node.tag == "dict" and lib_xml is None:
+                    lib_xml = node
+        return {
+            "glyph_xml": glyph_xml,
+            "unicodes_xml": unicodes_xml,
+            "lib_xml": lib_xml,
+            "outline_xml": outline_xml,
+        }
+
+    def _parse_data(self, glyph_xml, unicodes_xml, lib_xml, outline_xml):
         # parse name and generate filename
-        self._name = self._xml.get("name")
+        self._name = glyph_xml.get("name")
         if not self._name:
             raise ValueError(f"Invalid name, name cannot be '{self._name}'.")
 
@@ -77,62 +288,92 @@ class GlifData:
         self._filename = f"{basename}.glif"
 
         # look for glyph unicode hex value
-        unicodes = list(
+        self._unicodes = list(
             filter(
                 None,
-                [
-                    unicode_node.get("hex")
-                    for unicode_node in self._xml.findall("./unicode")
-                ],
+                [unicode_node.get("hex") for unicode_node in unicodes_xml],
             )
         )
-        if unicodes:
-            self._unicode_hex = ",".join(unicodes)
-            self._unicodes = unicodes
-            self._has_unicode = True
-
-        # look for <lib><dict> xml node
-        lib_xml = self._xml.find("./lib/dict")
-        if lib_xml is not None:
-            lib_str = ElementTree.tostring(lib_xml).decode()
-
-            # parse lib as plist
-            self._lib = benedict.from_plist(lib_str, keypath_separator="/")
-
-            # parse status color new format 2021/09: public.markColor -> robocjk.status
-            self._status = self._lib.get("robocjk.status", 0) or 0
-            self._status_with_variations = {
-                "status": self._status,
-            }
-
-            var_glyphs = self._lib.get("robocjk.variationGlyphs", [])
-            if var_glyphs:
+
+        # <lib><dict> and <outline> xml nodes are read when needed
+        self._lib_xml = lib_xml
+        self._outline_xml = outline_xml
+
+    def _parse_lib(self):
+        lib_dict = self._get_lib_dict()
+        self._get_status_with_variations()
+        self._get_components_names()
+        return lib_dict
+
+    def _get_lib_dict(self):
+        if self._lib_dict is None:
+            # parse lib as plist (directly from the xml node),
+            # values are read from the plain dict, faster than benedict lookups
+            self._lib_dict = (
+                plist_from_xml(self._lib_xml) if self._lib_xml is not None else {}
+            )
+        return self._lib_dict
+
+    def _get_status_with_variations(self):
+        if self._status_with_variations is None:
+            status_with_variations = {}
+            if self._lib_xml is not None:
+                lib_dict = self._get_lib_dict()
+                status_with_variations["status"] = self.status
+                var_glyphs = lib_dict.get("robocjk.variationGlyphs", [])
                 for item in var_glyphs:
                     item_key = "status_{}".format(item.get("sourceName", ""))
-                    self._status_with_variations[item_key] = item.get("status", 0) or 0
-
-            # parse status color old format fallback
-            self._status_color = self._lib.get("public.markColor", None)
+                    status_with_variations[item_key] = item.get("status", 0) or 0
+            self._status_with_variations = status_with_variations
+        return self._status_with_variations
 
-            # parse components list
-            components_list = self._lib.get("robocjk.deepComponents", [])
+    def _get_components_names(self):
+        if self._components_names is None:
+            components_list = self._get_lib_dict().get("robocjk.deepComponents", [])
             components_names_set = {item.get("name") for item in components_list}
             if "" in components_names_set:
                 components_names_set.remove("")
-            self._components_names = list(components_names_set)
-            self._components_names.sort(key=str.lower)
-            self._components_str = ",".join(self._components_names)
-            # self._components_str = ','.join({'{}'.format(item) for item in self._components_names})
-
-            # update computed properties
-            self._has_components = bool(components_list)
-            self._has_variation_axis = bool(
-                self._lib.get("robocjk.glyphVariationGlyphs")
-            ) or bool(self._lib.get("robocjk.variationGlyphs"))
+            components_names = list(components_names_set)
+            components_names.sort(key=str.lower)
+            self._components_names = components_names
+        return self._components_names
 
-        # update computed properties
-        self._has_outlines = bool(self._xml.find("./outline"))
-        self._is_empty = not self._has_outlines and not self._has_components
+    def _get_components(self):
+        if self._components is None:
+            components_list = self._get_lib_dict().get("robocjk.deepComponents", [])
+            self._components = [self._parse_component(item) for item in components_list]
+        return self._components
+
+    @staticmethod
+    def _parse_component(item):
+        """
+        Parse a robocjk.deepComponents item, the transform values can be
+        both nested in the "transform" dict and stored in the item itself (old format).
+        """
+
+        def get_float(data, key, default):
+            try:
+                return float(data.get(key, default))
+            except (TypeError, ValueError):
+                return default
+
+        transform = item.get("transform")
+        if not isinstance(transform, dict):
+            transform = item
+        coord = item.get("coord")
+        return {
+            "name": item.get("name") or "",
+            "coord": coord if isinstance(coord, dict) else {},
+            "x": get_float(transform, "x", 0.0),
+            "y": get_float(transform, "y", 0.0),
+            "scale_x": get_float(transform, "scalex", 1.0),
+            "scale_y": get_float(transform, "scaley", 1.0),
+            "rotation": get_float(transform, "rotation", 0.0),
+            "rcenter_x": get_float(transform, "rcenterx", 0.0),
+            "rcenter_y": get_float(transform, "rcentery", 0.0),
+            "tcenter_x": get_float(transform, "tcenterx", 0.0),
+            "tcenter_y": get_float(transform, "tcentery", 0.0),
+        }
 
     @property
     def error(self):
@@ -148,6 +389,8 @@ class GlifData:
 
     @property
     def lib(self):
+        if self._lib is None and self._lib_xml is not None:
+            self._lib = benedict(self._get_lib_dict(), keypath_separator="/")
         return self._lib
 
     @property
@@ -160,7 +403,7 @@ class GlifData:
 
     @property
     def unicode_hex(self):
-        return self._unicode_hex
+        return ",".join(self._unicodes)
 
     @property
     def unicodes(self):
@@ -168,44 +411,59 @@ class GlifData:
 
     @property
     def components_names(self):
-        return self._components_names
+        return self._get_components_names()
 
     @property
     def components_str(self):
-        return self._components_str
+        return ",".join(self._get_components_names())
+
+    @property
+    def components(self):
+        """
+        The robocjk.deepComponents items (name, coord and transform values),
+        in the same order they have in the lib.
+        """
+        return self._get_components()
 
     @property
     def has_components(self):
-        return self._has_components
+        return bool(self._get_lib_dict().get("robocjk.deepComponents"))
 
     @property
     def has_outlines(self):
-        return self._has_outlines
+        return self._outline_xml is not None and len(self._outline_xml) > 0
 
     @property
     def has_unicode(self):
-        return self._has_unicode
+        return bool(self._unicodes)
 
     @property
     def has_variation_axis(self):
-        return self._has_variation_axis
+        lib_dict = self._get_lib_dict()
+        return bool(lib_dict.get("robocjk.glyphVariationGlyphs")) or bool(
+            lib_dict.get("robocjk.variationGlyphs")
+        )
 
     @property
     def is_empty(self):
-        return self._is_empty
+        return not self.has_outlines and not self.has_components
 
     @property
     def status_color(self):
         # old property, deprecated
-        return self._status_color
+        # parse status color old format fallback
+        return self._get_lib_dict().get("public.markColor", None)
 
     @property
     def status(self):
-        return self._status
+        if self._lib_xml is None:
+            return None
+        # parse status color new format 2021/09: public.markColor -> robocjk.status
+        return self._get_lib_dict().get("robocjk.status", 0) or 0
 
     @property
     def status_with_variations(self):
-        return self._status_with_variations.copy()
+        return self._get_status_with_variations().copy()
 
     @property
     def ok(self):
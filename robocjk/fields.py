@@ -0,0 +1,76 @@
+import zlib
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class CompressedTextField(models.TextField):
+    """
+    Text field stored compressed in a binary column.
+    The stored value starts with a version byte (the compression format),
+    values stored without it (plain utf-8 text, eg. rows written before
+    the column was converted) are read as they are, so they stay readable
+    until they are compressed (on save or by the compress_glifs_data command).
+    """
+
+    description = _("Compressed text")
+
+    # version byte of zlib compressed values, plain xml text never starts with it
+    VERSION_ZLIB = b"\x01"
+
+    def __init__(self, *args, compression_level=6, **kwargs):
+        self.compression_level = compression_level
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.compression_level != 6:
+            kwargs["compression_level"] = self.compression_level
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    @classmethod
+    def is_compressed(cls, value):
+        if isinstance(value, memoryview):
+            value = value.tobytes()
+        return isinstance(value, bytes) and value[:1] == cls.VERSION_ZLIB
+
+    @classmethod
+    def compress(cls, value, compression_level=6):
+        if not value:
+            return b""
+        return cls.VERSION_ZLIB + zlib.compress(
+            value.encode("utf-8"), compression_level
+        )
+
+    @classmethod
+    def decompress(cls, value):
+        if value is None or isinstance(value, str):
+            return value
+        if isinstance(value, memoryview):
+            value = value.tobytes()
+        if value[:1] == cls.VERSION_ZLIB:
+            value = zlib.decompress(value[1:])
+        return value.decode("utf-8")
+
+    def from_db_value(self, value, expression, connection):
+        return self.decompress(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return self.decompress(value)
+        return super().to_python(value)
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None:
+            return None
+        return self.compress(value, self.compression_level)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is not None:
+            return connection.Database.Binary(value)
+        return value
@@ -0,0 +1,516 @@
+import datetime as dt
+import random
+
+from robocjk.models import (
+    AtomicElement,
+    AtomicElementLayer,
+    CharacterGlyph,
+    CharacterGlyphLayer,
+    ComponentInstance,
+    DeepComponent,
+    Font,
+    StatusModel,
+)
+from robocjk.utils import username_to_filename
+
+# (source name, axis name) of the generated variations, layers are named as sources
+SOURCES = (
+    ("bold", "wght"),
+    ("wide", "wdth"),
+    ("light", "LGHT"),
+    ("round", "RNDS"),
+)
+
+# unicode ranges of the generated character glyphs (cjk unified ideographs)
+CHARACTER_GLYPHS_UNICODE_RANGES = (
+    (0x4E00, 0x9FFF),
+    (0x3400, 0x4DBF),
+    (0x20000, 0x2A6DF),
+    (0x2A700, 0x2EBEF),
+    (0x30000, 0x323AF),
+)
+
+CHARACTER_GLYPHS_UNICODES_COUNT = sum(
+    (end - start + 1) for start, end in CHARACTER_GLYPHS_UNICODE_RANGES
+)
+
+GLIF_TEMPLATE = """<?xml version='1.0' encoding='UTF-8'?>
+<glyph name="{name}" format="2">
+  <advance width="1000"/>{unicode}
+  <outline>{outline}
+  </outline>{lib}
+</glyph>"""
+
+UNICODE_TEMPLATE = """
+  <unicode hex="{unicode_hex}"/>"""
+
+CONTOUR_TEMPLATE = """
+    <contour>
+      <point x="{x0}" y="{y0}" type="line"/>
+      <point x="{x1}" y="{y0}"/>
+      <point x="{x2}" y="{y0}"/>
+      <point x="{x3}" y="{y0}" type="curve"/>
+      <point x="{x3}" y="{y1}" type="line"/>
+      <point x="{x2}" y="{y1}"/>
+      <point x="{x1}" y="{y1}"/>
+      <point x="{x0}" y="{y1}" type="curve"/>
+    </contour>"""
+
+LIB_TEMPLATE = """
+  <lib>
+    <dict>{items}
+    </dict>
+  </lib>"""
+
+AXIS_TEMPLATE = """
+        <dict>
+          <key>maxValue</key>
+          <real>1.0</real>
+          <key>minValue</key>
+          <real>0.0</real>
+          <key>name</key>
+          <string>{axis_name}</string>
+        </dict>"""
+
+COMPONENT_TEMPLATE = """
+        <dict>
+          <key>coord</key>
+          <dict>{coord}
+          </dict>
+          <key>name</key>
+          <string>{name}</string>
+          <key>transform</key>
+          <dict>
+            <key>rcenterx</key>
+            <integer>0</integer>
+            <key>rcentery</key>
+            <integer>0</integer>
+            <key>rotation</key>
+            <integer>{rotation}</integer>
+            <key>scalex</key>
+            <real>{scale}</real>
+            <key>scaley</key>
+            <real>{scale}</real>
+            <key>x</key>
+            <integer>{x}</integer>
+            <key>y</key>
+            <integer>{y}</integer>
+          </dict>
+        </dict>"""
+
+COORD_TEMPLATE = """
+            <key>{axis_name}</key>
+            <real>{value}</real>"""
+
+VARIATION_GLYPH_TEMPLATE = """
+        <dict>
+          <key>deepComponents</key>
+          <array>{components}
+          </array>
+          <key>layerName</key>
+          <string>{layer_name}</string>
+          <key>location</key>
+          <dict>
+            <key>{axis_name}</key>
+            <real>1.0</real>
+          </dict>
+          <key>sourceName</key>
+          <string>{source_name}</string>
+          <key>status</key>
+          <integer>{status}</integer>
+        </dict>"""
+
+
+class FontGenerator:
+    """
+    Synthetic font generator, it generates atomic elements (with outlines),
+    deep components (made of atomic elements) and character glyphs
+    (made of deep components, with unicodes) with a variation layer per source.
+    Glifs are modeled on real glifs data and are inserted in bulk: all the fields
+    computed on save are computed while generating the data (without parsing it),
+    so glif changes are not recorded and formatted data is computed on export
+    (it is not stored, so its source digest is empty and never matches the data).
+    """
+
+    def __init__(
+        self,
+        font,
+        atomic_elements_count=100,
+        deep_components_count=1000,
+        character_glyphs_count=10000,
+        sources_count=1,
+        seed=0,
+        batch_size=1000,
+    ):
+        if sources_count > len(SOURCES):
+            raise ValueError(f"Invalid sources_count, max value is {len(SOURCES)}.")
+        self.font = font
+        self.atomic_elements_count = max(1, atomic_elements_count)
+        self.deep_components_count = max(1, deep_components_count)
+        self.character_glyphs_count = character_glyphs_count
+        self.sources = SOURCES[:sources_count]
+        self.batch_size = batch_size
+        self._random = random.Random(seed)
+        self._now = dt.datetime.now()
+
+    def generate(self):
+        """
+        Generate all the glifs and their relations, return the glifs counts.
+        """
+        atomic_elements_names = self._generate_atomic_elements()
+        deep_components_names = self._generate_deep_components(atomic_elements_names)
+        self._generate_character_glyphs(deep_components_names)
+        # glifs are inserted in bulk (without calling save), update the version once
+        Font.update_glifs_version(self.font.id)
+        return {
+            "atomic_elements": self.atomic_elements_count,
+            "deep_components": self.deep_components_count,
+            "character_glyphs": self.character_glyphs_count,
+            "layers": len(self.sources)
+            * (self.atomic_elements_count + self.character_glyphs_count),
+        }
+
+    def _generate_atomic_elements(self):
+        names = [f"stroke{index:05d}" for index in range(self.atomic_elements_count)]
+        objs = []
+        layers_data = {}
+        for name in names:
+            statuses = self._get_statuses()
+            data = self._get_glif_data(
+                name,
+                outline=self._get_outline(),
+                axes=self._get_axes(),
+                variations=self._get_variations(statuses),
+            )
+            objs.append(
+                self._init_glif_obj(
+                    AtomicElement(font=self.font),
+                    name,
+                    data,
+                    has_outlines=True,
+                    statuses=statuses,
+                )
+            )
+            layers_data[name] = [
+                (layer_name, self._get_glif_data(name, outline=self._get_outline()))
+                for layer_name, _ in self.sources
+            ]
+        AtomicElement.objects.bulk_create(objs, batch_size=self.batch_size)
+        self._generate_layers(AtomicElement, AtomicElementLayer, layers_data)
+        return names
+
+    def _generate_deep_components(self, atomic_elements_names):
+        names = []
+        for index in range(self.deep_components_count):
+            # deep components of the same radical are numbered
+            unicode_hex = self._get_unicode_hex(index // 10)
+            names.append(f"DC_{unicode_hex}_{index % 10:02d}")
+        objs = []
+        components = {}
+        for name in names:
+            components_names = self._sample(atomic_elements_names, 1, 4)
+            glif_components = self._get_components(components_names)
+            statuses = self._get_statuses()
+            data = self._get_glif_data(
+                name,
+                components=self._get_components_xml(glif_components),
+                axes=self._get_axes(),
+                variations=self._get_variations(statuses, components_names),
+            )
+            objs.append(
+                self._init_glif_obj(
+                    DeepComponent(font=self.font),
+                    name,
+                    data,
+                    components_names=components_names,
+                    statuses=statuses,
+                )
+            )
+            components[name] = glif_components
+        DeepComponent.objects.bulk_create(objs, batch_size=self.batch_size)
+        self._generate_relations(
+            DeepComponent,
+            AtomicElement,
+            DeepComponent.atomic_elements.through,
+            "deepcomponent_id",
+            "atomicelement_id",
+            "deep_component_id",
+            components,
+        )
+        return names
+
+    def _generate_character_glyphs(self, deep_components_names):
+        objs = []
+        components = {}
+        layers_data = {}
+        for index in range(self.character_glyphs_count):
+            unicode_hex = self._get_unicode_hex(index)
+            name = f"uni{unicode_hex}"
+            alternate_index = index // CHARACTER_GLYPHS_UNICODES_COUNT
+            if alternate_index:
+                # unicodes are exhausted, generate unencoded alternates
+                name = f"{name}.alt{alternate_index:02d}"
+                unicode_hex = ""
+            components_names = self._sample(deep_components_names, 1, 4)
+            glif_components = self._get_components(components_names)
+            statuses = self._get_statuses()
+            data = self._get_glif_data(
+                name,
+                unicode_hex=unicode_hex,
+                components=self._get_components_xml(glif_components),
+                axes=self._get_axes(),
+                variations=self._get_variations(statuses, components_names),
+            )
+            objs.append(
+                self._init_glif_obj(
+                    CharacterGlyph(font=self.font),
+                    name,
+                    data,
+                    unicode_hex=unicode_hex,
+                    components_names=components_names,
+                    statuses=statuses,
+                )
+            )
+            components[name] = glif_components
+            layers_data[name] = [
+                (layer_name, self._get_glif_data(name, unicode_hex=unicode_hex))
+                for layer_name, _ in self.sources
+            ]
+            if len(objs) >= self.batch_size:
+                self._create_character_glyphs(objs, components, layers_data)
+                objs, components, layers_data = [], {}, {}
+        self._create_character_glyphs(objs, components, layers_data)
+
+    def _create_character_glyphs(self, objs, components, layers_data):
+        CharacterGlyph.objects.bulk_create(objs, batch_size=self.batch_size)
+        self._generate_relations(
+            CharacterGlyph,
+            DeepComponent,
+            CharacterGlyph.deep_components.through,
+            "characterglyph_id",
+            "deepcomponent_id",
+            "character_glyph_id",
+            components,
+        )
+        self._generate_layers(CharacterGlyph, CharacterGlyphLayer, layers_data)
+
+    def _generate_layers(self, glif_cls, layer_cls, layers_data):
+        # ids are read from the database, bulk_create doesn't set them on all backends
+        glifs_ids = self._get_ids(glif_cls, layers_data.keys())
+        objs = []
+        for name, layers in layers_data.items():
+            for layer_name, data in layers:
+                obj = layer_cls(glif_id=glifs_ids[name], group_name=layer_name)
+                objs.append(self._init_glif_obj(obj, name, data))
+        layer_cls.objects.bulk_create(objs, batch_size=self.batch_size)
+
+    def _generate_relations(
+        self,
+        glif_cls,
+        component_cls,
+        through_cls,
+        glif_field,
+        component_field,
+        instance_glif_field,
+        components,
+    ):
+        glifs_ids = self._get_ids(glif_cls, components.keys())
+        components_ids = self._get_ids(
+            component_cls,
+            {
+                component["name"]
+                for glif_components in components.values()
+                for component in glif_components
+            },
+        )
+        objs = []
+        instances_objs = []
+        for name, glif_components in components.items():
+            for component_name in {component["name"] for component in glif_components}:
+                objs.append(
+                    through_cls(
+                        **{
+                            glif_field: glifs_ids[name],
+                            component_field: components_ids[component_name],
+                        }
+                    )
+                )
+            for index, component in enumerate(glif_components):
+                instances_objs.append(
+                    ComponentInstance(
+                        font=self.font,
+                        index=index,
+                        **{instance_glif_field: glifs_ids[name]},
+                        **component,
+                    )
+                )
+        through_cls.objects.bulk_create(objs, batch_size=self.batch_size)
+        ComponentInstance.objects.bulk_create(
+            instances_objs, batch_size=self.batch_size
+        )
+
+    def _get_ids(self, glif_cls, names):
+        names = list(names)
+        ids = {}
+        for index in range(0, len(names), self.batch_size):
+            ids.update(
+                glif_cls.objects.filter(
+                    font=self.font,
+                    name__in=names[index : index + self.batch_size],
+                ).values_list("name", "id")
+            )
+        return ids
+
+    def _init_glif_obj(
+        self,
+        obj,
+        name,
+        data,
+        unicode_hex="",
+        has_outlines=False,
+        components_names=None,
+        statuses=None,
+    ):
+        obj.data = data
+        obj.name = name
+        obj.filename = f"{username_to_filename(name)}.glif"
+        obj.unicode_hex = unicode_hex
+        obj.has_unicode = bool(unicode_hex)
+        obj.has_outlines = has_outlines
+        obj.has_components = bool(components_names)
+        obj.components = ",".join(sorted(set(components_names or []), key=str.lower))
+        obj.is_empty = not obj.has_outlines and not obj.has_components
+        if statuses is not None:
+            obj.has_variation_axis = bool(self.sources)
+            obj.status = f"{statuses['status']}"
+            obj.previous_status = StatusModel.STATUS_WIP
+            obj.status_changed_at = self._now
+            obj.status_with_variations = statuses
+        return obj
+
+    def _get_glif_data(
+        self,
+        name,
+        unicode_hex="",
+        outline="",
+        components="",
+        axes="",
+        variations="",
+    ):
+        lib_items = ""
+        if axes:
+            lib_items += f"""
+      <key>robocjk.axes</key>
+      <array>{axes}
+      </array>"""
+        if components:
+            lib_items += f"""
+      <key>robocjk.deepComponents</key>
+      <array>{components}
+      </array>"""
+        if variations:
+            lib_items += f"""
+      <key>robocjk.status</key>
+      <integer>{variations[0]}</integer>
+      <key>robocjk.variationGlyphs</key>
+      <array>{variations[1]}
+      </array>"""
+        return GLIF_TEMPLATE.format(
+            name=name,
+            unicode=UNICODE_TEMPLATE.format(unicode_hex=unicode_hex)
+            if unicode_hex
+            else "",
+            outline=outline,
+            lib=LIB_TEMPLATE.format(items=lib_items) if lib_items else "",
+        )
+
+    def _get_outline(self):
+        x0 = self._random.randint(0, 100)
+        x3 = self._random.randint(800, 1000)
+        y0 = self._random.randint(0, 700)
+        return CONTOUR_TEMPLATE.format(
+            x0=x0,
+            x1=x0 + (x3 - x0) // 3,
+            x2=x0 + (x3 - x0) * 2 // 3,
+            x3=x3,
+            y0=y0,
+            y1=y0 + self._random.randint(50, 150),
+        )
+
+    def _get_axes(self):
+        return "".join(
+            AXIS_TEMPLATE.format(axis_name=axis_name) for _, axis_name in self.sources
+        )
+
+    def _get_components(self, components_names):
+        # same format of GlifData.components items
+        return [
+            {
+                "name": component_name,
+                "coord": {
+                    axis_name: round(self._random.random(), 3)
+                    for _, axis_name in self.sources
+                },
+                "x": float(self._random.randint(-100, 500)),
+                "y": float(self._random.randint(-100, 500)),
+                "scale_x": scale,
+                "scale_y": scale,
+                "rotation": float(self._random.choice([0, 0, 0, 90])),
+                "rcenter_x": 0.0,
+                "rcenter_y": 0.0,
+                "tcenter_x": 0.0,
+                "tcenter_y": 0.0,
+            }
+            for component_name, scale in (
+                (component_name, round(self._random.uniform(0.5, 1.0), 3))
+                for component_name in components_names
+            )
+        ]
+
+    def _get_components_xml(self, components):
+        return "".join(
+            COMPONENT_TEMPLATE.format(
+                name=component["name"],
+                coord="".join(
+                    COORD_TEMPLATE.format(axis_name=axis_name, value=value)
+                    for axis_name, value in component["coord"].items()
+                ),
+                rotation=int(component["rotation"]),
+                scale=component["scale_x"],
+                x=int(component["x"]),
+                y=int(component["y"]),
+            )
+            for component in components
+        )
+
+    def _get_statuses(self):
+        statuses = {"status": self._random.randint(0, 4)}
+        for source_name, _ in self.sources:
+            statuses[f"status_{source_name}"] = self._random.randint(0, 4)
+        return statuses
+
+    def _get_variations(self, statuses, components_names=None):
+        variations = "".join(
+            VARIATION_GLYPH_TEMPLATE.format(
+                components=self._get_components_xml(
+                    self._get_components(components_names or [])
+                ),
+                layer_name=source_name,
+                axis_name=axis_name,
+                source_name=source_name,
+                status=statuses[f"status_{source_name}"],
+            )
+            for source_name, axis_name in self.sources
+        )
+        return (statuses["status"], variations) if variations else ""
+
+    def _get_unicode_hex(self, index):
+        index %= CHARACTER_GLYPHS_UNICODES_COUNT
+        for start, end in CHARACTER_GLYPHS_UNICODE_RANGES:
+            if index <= end - start:
+                return f"{start + index:04X}"
+            index -= end - start + 1
+
+    def _sample(self, names, min_count, max_count):
+        count = self._random.randint(min_count, min(max_count, len(names)))
+        return self._random.sample(names, count)
@@ -0,0 +1,59 @@
+import hashlib
+import os
+
+
+def get_files_sizes(*dirpaths):
+    """
+    Walk the given directories (recursively) and return a dict
+    containing the size (in bytes) of each file found, keyed by file path.
+    Missing directories are ignored.
+    """
+    files_sizes = {}
+    dirpaths_stack = list(dirpaths)
+    while dirpaths_stack:
+        dirpath = dirpaths_stack.pop()
+        try:
+            entries = os.scandir(dirpath)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    dirpaths_stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    files_sizes[entry.path] = entry.stat(follow_symlinks=False).st_size
+    return files_sizes
+
+
+def get_file_size(filepath):
+    """
+    Get the size (in bytes) of the file at the given path, None if it doesn't exist.
+    """
+    try:
+        return os.stat(filepath).st_size
+    except FileNotFoundError:
+        return None
+
+
+def get_file_digest(filepath):
+    """
+    Get the md5 hex digest of the content of the file at the given path.
+    """
+    with open(filepath, "rb") as file:
+        return hashlib.md5(file.read()).hexdigest()
+
+
+def remove_files(filepaths):
+    """
+    Remove the files at the given paths, missing files are ignored
+    (no need to check their existence before removing them).
+    Returns the list of removed files paths.
+    """
+    removed_filepaths = []
+    for filepath in filepaths:
+        try:
+            os.remove(filepath)
+        except FileNotFoundError:
+            continue
+        removed_filepaths.append(filepath)
+    return removed_filepaths
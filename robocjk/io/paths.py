@@ -69,6 +69,18 @@ def get_font_path(instance, name=None):
     )
 
 
+def get_font_manifest_path(instance):
+    # the manifest is stored outside of the project git repository
+    project_name = quote_filename(instance.project.slug)
+    font_name = quote_filename(instance.slug)
+    return fsutil.join_path(
+        settings.GIT_REPOSITORIES_PATH,
+        ".manifests",
+        project_name,
+        f"{font_name}.json",
+    )
+
+
 def get_glif_filename(instance, name=None):
     filename = quote_filename(name or instance.filename)
     assert filename.endswith(".glif")
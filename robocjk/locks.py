@@ -0,0 +1,221 @@
+import datetime as dt
+import hashlib
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+
+from robocjk.debug import logger
+
+# mysql lock names are limited to 64 characters
+LOCK_NAME_MAX_LENGTH = 64
+
+# min interval (in seconds) between two heartbeats of the locks of the same owner
+LOCK_HEARTBEAT_INTERVAL = 60
+
+# last heartbeat time (monotonic) by lock owner
+_locks_heartbeats = {}
+
+
+def get_lock_name(obj):
+    """
+    Get the lock name of a model instance (eg. a project or a font),
+    names are prefixed with the database name because
+    mysql locks are shared by all the databases of the server.
+    """
+    database_name = settings.DATABASES[DEFAULT_DB_ALIAS]["NAME"]
+    name = f"{database_name}:robocjk.{obj._meta.model_name}.{obj.pk}"
+    if len(name) > LOCK_NAME_MAX_LENGTH:
+        name = hashlib.md5(name.encode("utf-8")).hexdigest()
+    return name
+
+
+def get_lock_owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class MySQLLock:
+    """
+    Lock backed by mysql advisory locks (GET_LOCK / RELEASE_LOCK).
+    The lock is held by a dedicated database session, so it is not released when
+    django closes old connections, and it is released by the server immediately
+    if the process crashes (its session is closed).
+    """
+
+    def __init__(self, name, using=DEFAULT_DB_ALIAS):
+        self.name = name
+        self.using = using
+        self._connection = None
+
+    def acquire(self, timeout=0):
+        connection = connections.create_connection(self.using)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT GET_LOCK(%s, %s)", [self.name, timeout])
+                (acquired,) = cursor.fetchone()
+        except Exception:
+            connection.close()
+            raise
+        if acquired != 1:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def release(self):
+        if self._connection is None:
+            return
+        try:
+            with self._connection.cursor() as cursor:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", [self.name])
+        finally:
+            self._connection.close()
+            self._connection = None
+
+
+class DatabaseLock:
+    """
+    Lock backed by a table row (unique lock name), used with databases
+    that don't support advisory locks (eg. sqlite in tests).
+    Locks left by crashed processes are considered stale and are removed
+    if the owner process is not running anymore (on the same host)
+    or if the lock heartbeat has not been refreshed (see refresh_locks)
+    for more than ROBOCJK_EXPORT_CANCEL_TIMEOUT minutes.
+    """
+
+    def __init__(self, name, using=DEFAULT_DB_ALIAS):
+        self.name = name
+        self.using = using
+        self.owner = get_lock_owner()
+        self._acquired = False
+
+    @property
+    def model(self):
+        return apps.get_model("robocjk", "Lock")
+
+    def acquire(self, timeout=0):
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._create():
+                self._acquired = True
+                return True
+            if self._delete_stale():
+                continue
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(min(0.5, max(0, deadline - time.monotonic())))
+
+    def release(self):
+        if not self._acquired:
+            return
+        self.model.objects.using(self.using).filter(
+            name=self.name, owner=self.owner
+        ).delete()
+        self._acquired = False
+
+    def _create(self):
+        try:
+            with transaction.atomic(using=self.using):
+                self.model.objects.using(self.using).create(
+                    name=self.name, owner=self.owner
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    def _delete_stale(self):
+        lock_obj = self.model.objects.using(self.using).filter(name=self.name).first()
+        if lock_obj is None:
+            return True
+        if not self._is_stale(lock_obj):
+            return False
+        logger.warning(f"Removed stale lock '{lock_obj.name}' of '{lock_obj.owner}'.")
+        deleted_count, _ = (
+            self.model.objects.using(self.using)
+            .filter(pk=lock_obj.pk, owner=lock_obj.owner)
+            .delete()
+        )
+        return deleted_count > 0
+
+    def _is_stale(self, lock_obj):
+        heartbeat_age = dt.datetime.now() - lock_obj.heartbeat_at
+        if heartbeat_age > dt.timedelta(minutes=settings.ROBOCJK_EXPORT_CANCEL_TIMEOUT):
+            return True
+        hostname, pid, _ = lock_obj.owner.rsplit(":", 2)
+        if hostname != socket.gethostname():
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            # the owner process is not running anymore
+            return True
+        except (PermissionError, ValueError):
+            pass
+        return False
+
+
+def refresh_locks(using=DEFAULT_DB_ALIAS):
+    """
+    Refresh the heartbeat of the locks held by the current owner (host:pid:thread),
+    it must be called periodically by long running tasks holding locks (eg. exports),
+    otherwise their locks could be considered stale and acquired by other processes.
+    Calls are throttled, the heartbeat is refreshed at most once per LOCK_HEARTBEAT_INTERVAL.
+    """
+    if connections[using].vendor == "mysql":
+        # advisory locks are held until their session is closed
+        return
+    owner = get_lock_owner()
+    now = time.monotonic()
+    last_heartbeat = _locks_heartbeats.get(owner)
+    if last_heartbeat is not None and now - last_heartbeat < LOCK_HEARTBEAT_INTERVAL:
+        return
+    _locks_heartbeats[owner] = now
+    lock_model = apps.get_model("robocjk", "Lock")
+    lock_model.objects.using(using).filter(owner=owner).update(
+        heartbeat_at=dt.datetime.now()
+    )
+
+
+def get_lock(name, using=DEFAULT_DB_ALIAS):
+    if connections[using].vendor == "mysql":
+        return MySQLLock(name, using=using)
+    return DatabaseLock(name, using=using)
+
+
+@contextmanager
+def lock(*names, timeout=0, using=DEFAULT_DB_ALIAS):
+    """
+    Acquire the locks with the given names (all or none),
+    waiting at most timeout seconds for each one.
+    Yields True if the locks have been acquired, otherwise False,
+    acquired locks are released on exit.
+
+        with lock(get_lock_name(font)) as acquired:
+            if not acquired:
+                return
+    """
+    acquired_locks = []
+
+    def release_locks():
+        while acquired_locks:
+            acquired_locks.pop().release()
+
+    acquired = True
+    try:
+        # locks are always acquired in the same order to avoid deadlocks
+        for name in sorted(set(names)):
+            name_lock = get_lock(name, using=using)
+            if not name_lock.acquire(timeout=timeout):
+                acquired = False
+                break
+            acquired_locks.append(name_lock)
+        if not acquired:
+            release_locks()
+        yield acquired
+    finally:
+        release_locks()
@@ -0,0 +1,65 @@
+import json
+
+import fsutil
+from django.core.management.base import BaseCommand, CommandError
+
+from robocjk.benchmark import run_benchmarks
+from robocjk.models import Font
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark glifs parsing, formatting, file names, serialization and export "
+        "(on a generated font or on an existing one), changes to the database are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=100,
+            help="The number of character glyphs of the generated font "
+            "(or the max number of glifs to benchmark of an existing font).",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=3,
+            help="The number of times each benchmark is run (the fastest run is reported).",
+        )
+        parser.add_argument(
+            "--font-uid",
+            required=False,
+            help="The uid 'xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx' of the font to benchmark "
+            "instead of a generated one.",
+        )
+        parser.add_argument(
+            "--output",
+            required=False,
+            help="The filepath of the json file where results will be written "
+            "(by default results are written to stdout).",
+        )
+
+    def handle(self, *args, **options):
+        font = None
+        font_uid = options.get("font_uid")
+        if font_uid:
+            try:
+                font = Font.objects.select_related("project").get(uid=font_uid)
+            except Font.DoesNotExist as font_error:
+                message = f"Invalid font_uid, font with uid '{font_uid}' doesn't exist."
+                self.stderr.write(message)
+                raise CommandError(message) from font_error
+
+        results = run_benchmarks(
+            size=options.get("size"),
+            iterations=options.get("iterations"),
+            font=font,
+        )
+        results_str = json.dumps(results, indent=4)
+        output = options.get("output")
+        if output:
+            fsutil.write_file(output, results_str)
+            self.stdout.write(f"Benchmark results written to '{output}'.")
+        else:
+            self.stdout.write(results_str)
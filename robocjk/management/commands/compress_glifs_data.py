@@ -0,0 +1,94 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from robocjk.fields import CompressedTextField
+from robocjk.models import (
+    AtomicElement,
+    AtomicElementLayer,
+    CharacterGlyph,
+    CharacterGlyphLayer,
+    DeepComponent,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compress glifs data and formatted data stored uncompressed "
+        "(rows written before the columns were converted), in chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT,
+            help="The number of rows read and updated at once.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="The number of seconds to wait between chunks "
+            "(to reduce the database load while running in background).",
+        )
+
+    def handle(self, *args, **options):
+        glif_models = [
+            CharacterGlyph,
+            CharacterGlyphLayer,
+            DeepComponent,
+            AtomicElement,
+            AtomicElementLayer,
+        ]
+        chunk_size = max(1, options.get("chunk_size"))
+        sleep = max(0.0, options.get("sleep"))
+        for glif_model in glif_models:
+            for field_name in ["data", "formatted_data"]:
+                self._compress(glif_model, field_name, chunk_size, sleep)
+
+    def _compress(self, glif_model, field_name, chunk_size, sleep):
+        field = glif_model._meta.get_field(field_name)
+        # raw values are read with a plain query, because the field
+        # decompresses values transparently and compressed rows must be skipped
+        query = (
+            "SELECT {id}, {field} FROM {table} "
+            "WHERE {id} > %s ORDER BY {id} LIMIT %s"
+        ).format(
+            id=connection.ops.quote_name("id"),
+            field=connection.ops.quote_name(field.column),
+            table=connection.ops.quote_name(glif_model._meta.db_table),
+        )
+        glif_objs_counter = 0
+        glif_objs_compressed_counter = 0
+        last_pk = 0
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(query, [last_pk, chunk_size])
+                rows = cursor.fetchall()
+            if not rows:
+                break
+            glif_objs = [
+                glif_model(
+                    **{"id": pk, field_name: CompressedTextField.decompress(value)}
+                )
+                for pk, value in rows
+                if value and not CompressedTextField.is_compressed(value)
+            ]
+            # bulk_update doesn't change updated_at and doesn't record glif changes,
+            # the stored value changes, but the text value is the same
+            # (so the formatted data source digest still matches the data)
+            glif_model.objects.bulk_update(glif_objs, [field_name])
+            glif_objs_counter += len(rows)
+            glif_objs_compressed_counter += len(glif_objs)
+            last_pk = rows[-1][0]
+            print(
+                f"Compressed {glif_objs_compressed_counter} of {glif_objs_counter} "
+                f"- {glif_model} models {field_name}."
+            )
+            if len(rows) < chunk_size:
+                break
+            if sleep:
+                time.sleep(sleep)
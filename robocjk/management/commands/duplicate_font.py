@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand, CommandError
 
+from robocjk.locks import get_lock_name, lock
 from robocjk.models import (
     AtomicElement,
     AtomicElementLayer,
@@ -57,17 +58,19 @@ class Command(BaseCommand):
             message = "Unsupported option target_font_clear (not implemented yet, TODO)"
             raise CommandError(message)
 
+        # the fonts can't be exported (or imported) while duplicating
+        with lock(
+            get_lock_name(source_font_obj), get_lock_name(target_font_obj)
+        ) as lock_acquired:
+            if not lock_acquired:
+                message = "Unable to duplicate font, there is an export running for the source or the target font."
+                self.stderr.write(message)
+                raise CommandError(message)
+            self._duplicate_font(source_font_obj, target_font_obj)
+
+    def _duplicate_font(self, source_font_obj, target_font_obj):
         source_project_obj = source_font_obj.project
-        if source_project_obj.export_running:
-            message = f"Unable to duplicate font, there is an export running for '{source_project_obj.name}'."
-            self.stderr.write(message)
-            raise CommandError(message)
-
         target_project_obj = target_font_obj.project
-        if target_project_obj.export_running:
-            message = f"Unable to duplicate font, there is an export running for '{target_project_obj.name}'."
-            self.stderr.write(message)
-            raise CommandError(message)
 
         self.stdout.write(
             f"Duplicating font '{source_project_obj.name} / {source_font_obj.name}' "
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand, CommandError
 
+from robocjk.locks import get_lock_name, lock
 from robocjk.models import (
     AtomicElement,
     AtomicElementLayer,
@@ -60,16 +61,17 @@ class Command(BaseCommand):
             )
             raise CommandError(message)
 
-        if source_project_obj.export_running:
-            message = f"Unable to duplicate project, there is an export running for '{source_project_obj.name}'."
-            self.stderr.write(message)
-            raise CommandError(message)
-
-        if target_project_obj.export_running:
-            message = f"Unable to duplicate project, there is an export running for '{target_project_obj.name}'."
-            self.stderr.write(message)
-            raise CommandError(message)
+        # the projects can't be exported while duplicating
+        with lock(
+            get_lock_name(source_project_obj), get_lock_name(target_project_obj)
+        ) as lock_acquired:
+            if not lock_acquired:
+                message = "Unable to duplicate project, there is an export running for the source or the target project."
+                self.stderr.write(message)
+                raise CommandError(message)
+            self._duplicate_project(source_project_obj, target_project_obj)
 
+    def _duplicate_project(self, source_project_obj, target_project_obj):
         self.stdout.write(
             f"Duplicating project '{source_project_obj.name}' -> '{target_project_obj.name}'"
         )
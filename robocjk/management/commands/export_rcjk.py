@@ -1,13 +1,30 @@
+import multiprocessing
 import os
 import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
 from extra_settings.models import Setting
 
 from robocjk.debug import logger
 from robocjk.models import Project
 
 
+def export_project(project_pk, full):
+    """
+    Worker function for exporting a project in a separate process,
+    each font export uses its own pool of processes for writing the glifs files.
+    """
+    try:
+        project = Project.objects.get(pk=project_pk)
+        return project.export(full=full)
+    finally:
+        # each process uses its own database connection
+        connection.close()
+
+
 class Command(BaseCommand):
     help = "Export all .rcjk projects and push changes to their own git repositories."
 
@@ -22,6 +39,12 @@ class Command(BaseCommand):
             action="store_true",
             help="Run full export.",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.ROBOCJK_EXPORT_WORKERS,
+            help="The number of projects that can be exported concurrently.",
+        )
 
     def handle(self, *args, **options):
         export_enabled = Setting.get("ROBOCJK_EXPORT_ENABLED", default=True)
@@ -38,6 +61,7 @@ class Command(BaseCommand):
 
         project_uid = options.get("project_uid", None)
         projects_full_export = options.get("full", False)
+        projects_workers = options.get("workers") or 1
 
         if project_uid:
             # export specific project
@@ -48,15 +72,92 @@ class Command(BaseCommand):
                 self.stderr.write(message)
                 raise CommandError(message) from project_error
             else:
-                project_obj.export(full=projects_full_export)
+                failed_projects = self._export_projects(
+                    [project_obj], full=projects_full_export, workers=1
+                )
         else:
             # export all projects
-            projects_qs = Project.objects.prefetch_related("fonts")
-            for project in projects_qs:
-                project.export(full=projects_full_export)
+            projects_list = list(Project.objects.prefetch_related("fonts"))
+            failed_projects = self._export_projects(
+                projects_list, full=projects_full_export, workers=projects_workers
+            )
+
+        if failed_projects:
+            failed_projects_names = ", ".join(
+                f"'{project}'" for project in failed_projects
+            )
+            message = f"Export failed for projects: {failed_projects_names}."
+            self.stderr.write(message)
+            raise CommandError(message)
 
         process_id = os.getpid()
         thread_name = threading.current_thread().name
         logger.info(f"Complete export - pid: {process_id} - thread: {thread_name}")
 
         logger.info("-" * 100)
+
+    def _export_projects(self, projects, full, workers):
+        """
+        Export the projects, the ones with more changes since their last export first,
+        independent projects are exported concurrently using the given number of workers
+        (each project export holds the project lock, so it can't run twice at once).
+        Returns the list of projects not exported (export failed, skipped or raised an exception).
+        """
+        projects_changes = {
+            project.pk: project.get_export_pending_changes_count()
+            for project in projects
+        }
+        projects = sorted(
+            projects,
+            key=lambda project: (-projects_changes[project.pk], project.name),
+        )
+        for project in projects:
+            logger.info(
+                f"Scheduled export for '{project}' - "
+                f"{projects_changes[project.pk]} pending changes."
+            )
+
+        failed_projects = []
+
+        if workers <= 1:
+            for project in projects:
+                try:
+                    exported = project.export(full=full)
+                except Exception as export_error:
+                    self._log_export_error(project, export_error)
+                    exported = False
+                if not exported:
+                    failed_projects.append(project)
+            return failed_projects
+
+        # projects are exported in separate processes (not threads), because
+        # each font export forks its own pool of processes, and forking
+        # a multi-threaded process can deadlock; the forked processes
+        # must not share the database connections of this process
+        connections.close_all()
+        # tasks are started in the submission (priority) order
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        ) as executor:
+            futures = {
+                executor.submit(export_project, project.pk, full): project
+                for project in projects
+            }
+            for future in as_completed(futures):
+                project = futures[future]
+                try:
+                    # export returns False if it failed or it has been skipped
+                    exported = future.result()
+                except Exception as export_error:
+                    self._log_export_error(project, export_error)
+                    exported = False
+                if not exported:
+                    failed_projects.append(project)
+        return failed_projects
+
+    def _log_export_error(self, project, export_error):
+        error_type_name = type(export_error).__name__
+        logger.exception(
+            f"Failed export for '{project}' due to an unexpected "
+            f"'{error_type_name}': {export_error}"
+        )
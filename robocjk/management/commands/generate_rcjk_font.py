@@ -0,0 +1,103 @@
+import datetime as dt
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from robocjk.generator import SOURCES, FontGenerator
+from robocjk.models import Font, Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic font (atomic elements, deep components and character glyphs "
+        "with variations and layers) for load and performance testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--font-uid",
+            required=False,
+            help="The uid 'xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx' of the (empty) font "
+            "where glifs will be generated (by default a new project and font are created).",
+        )
+        parser.add_argument(
+            "--atomic-elements",
+            type=int,
+            default=100,
+            help="The number of atomic elements to generate.",
+        )
+        parser.add_argument(
+            "--deep-components",
+            type=int,
+            default=1000,
+            help="The number of deep components to generate.",
+        )
+        parser.add_argument(
+            "--character-glyphs",
+            type=int,
+            default=10000,
+            help="The number of character glyphs to generate.",
+        )
+        parser.add_argument(
+            "--sources",
+            type=int,
+            default=1,
+            help=f"The number of sources (variations and layers) of each glif, "
+            f"max value is {len(SOURCES)}.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="The seed of the random generator (same seed, same font).",
+        )
+
+    def handle(self, *args, **options):
+        font_uid = options.get("font_uid")
+        start = time.perf_counter()
+        with transaction.atomic():
+            if font_uid:
+                try:
+                    font = Font.objects.select_related("project").get(uid=font_uid)
+                except Font.DoesNotExist as font_error:
+                    message = (
+                        f"Invalid font_uid, font with uid '{font_uid}' doesn't exist."
+                    )
+                    self.stderr.write(message)
+                    raise CommandError(message) from font_error
+                if (
+                    font.atomic_elements.exists()
+                    or font.deep_components.exists()
+                    or font.character_glyphs.exists()
+                ):
+                    message = (
+                        f"Invalid font_uid, font with uid '{font_uid}' is not empty."
+                    )
+                    self.stderr.write(message)
+                    raise CommandError(message)
+            else:
+                project = Project.objects.create(name=f"Synthetic {dt.datetime.now()}")
+                font = Font.objects.create(project=project, name="Synthetic")
+            try:
+                generator = FontGenerator(
+                    font,
+                    atomic_elements_count=options.get("atomic_elements"),
+                    deep_components_count=options.get("deep_components"),
+                    character_glyphs_count=options.get("character_glyphs"),
+                    sources_count=options.get("sources"),
+                    seed=options.get("seed"),
+                )
+            except ValueError as generator_error:
+                message = f"{generator_error}"
+                self.stderr.write(message)
+                raise CommandError(message) from generator_error
+            counts = generator.generate()
+        duration = time.perf_counter() - start
+        self.stdout.write(
+            f"Generated font '{font.full_name}' (uid: {font.uid}) with "
+            f"{counts['atomic_elements']} atomic elements, "
+            f"{counts['deep_components']} deep components, "
+            f"{counts['character_glyphs']} character glyphs and "
+            f"{counts['layers']} layers in {duration:.2f}s."
+        )
@@ -1,7 +1,9 @@
+import multiprocessing
 import zipfile
 
 import fsutil
 from benedict import benedict
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from extra_settings.models import Setting
 
@@ -17,6 +19,7 @@ from robocjk.io.paths import (
     FONTLIB_RE,
     unquote_filename,
 )
+from robocjk.locks import get_lock_name, lock
 from robocjk.models import (
     AtomicElement,
     AtomicElementLayer,
@@ -38,41 +41,49 @@ class Command(BaseCommand):
             {
                 "path_regex": CHARACTER_GLYPH_RE,
                 "group_name": "character_glyphs",
+                "parse_glifs": True,
                 "import_func": self._import_character_glyph,
             },
             {
                 "path_regex": CHARACTER_GLYPH_LAYER_RE,
                 "group_name": "character_glyphs_layers",
+                "parse_glifs": True,
                 "import_func": self._import_character_glyph_layer,
             },
             {
                 "path_regex": DEEP_COMPONENT_RE,
                 "group_name": "deep_components",
+                "parse_glifs": True,
                 "import_func": self._import_deep_component,
             },
             {
                 "path_regex": ATOMIC_ELEMENT_RE,
                 "group_name": "atomic_elements",
+                "parse_glifs": True,
                 "import_func": self._import_atomic_element,
             },
             {
                 "path_regex": ATOMIC_ELEMENT_LAYER_RE,
                 "group_name": "atomic_elements_layers",
+                "parse_glifs": True,
                 "import_func": self._import_atomic_element_layer,
             },
             {
                 "path_regex": FONTLIB_RE,
                 "group_name": "fontlib",
+                "parse_glifs": False,
                 "import_func": self._import_fontlib,
             },
             {
                 "path_regex": FEATURES_RE,
                 "group_name": "features",
+                "parse_glifs": False,
                 "import_func": self._import_features,
             },
             {
                 "path_regex": DESIGNSPACE_RE,
                 "group_name": "designspace",
+                "parse_glifs": False,
                 "import_func": self._import_designspace,
             },
         ]
@@ -129,15 +140,21 @@ class Command(BaseCommand):
 
         self.stdout.write(f"Importing '{font_obj.name}' ...")
 
-        if font_obj.export_running:
-            message = "There is an export running for '{font_obj.name}', the import will run on export complete."
-            self.stderr.write(message)
-            raise CommandError(message)
+        # the font can't be exported (or duplicated) while it is being imported
+        with lock(get_lock_name(font_obj)) as lock_acquired:
+            if not lock_acquired:
+                message = f"There is an export running for '{font_obj.name}', the import will run on export complete."
+                self.stderr.write(message)
+                raise CommandError(message)
+            font_clear = options.get("font_clear", False)
+            self._import_font(font_obj, filepath, font_clear=font_clear)
+
+    def _import_font(self, font_obj, filepath, font_clear=False):
+        font_uid = font_obj.uid
 
         font_obj.available = False
         font_obj.save()
 
-        font_clear = options.get("font_clear", False)
         if font_clear:
             self.stdout.write("Deleting existing atomic elements...")
             AtomicElement.objects.filter(font__uid=font_uid).delete()
@@ -163,35 +180,66 @@ class Command(BaseCommand):
                 group_count_title = group_name.replace("_", " ").title()
                 self.stdout.write(f"Found {group_count} {group_count_title} to import.")
 
-            for item in self._import_mappings:
-                for name, match in self._import_groups[item["group_name"]]:
-                    item["import_func"](font_obj, self._zipfile_read(file, name), match)
-
-        # update deep-components relations with atomic-elements
-        glif_objs = font_obj.deep_components.filter(has_components=True)
-        glif_objs_counter = 0
-        glif_objs_total = len(glif_objs)
-        self.stdout.write(f"Updating {glif_objs_total} DeepComponent relations...")
-        for glif_obj in glif_objs:
-            glif_obj.save()
-            glif_objs_counter += 1
-            # self.stdout.write('Updated DeepComponent relations - {} of {}'.format(glif_objs_counter, glif_objs_total))
-        self.stdout.write(f"Updated {glif_objs_total} DeepComponent relations.")
-
-        # update character-glyphs relations with deep-components
-        glif_objs = font_obj.character_glyphs.filter(has_components=True)
-        glif_objs_counter = 0
-        glif_objs_total = len(glif_objs)
-        self.stdout.write(f"Updating {glif_objs_total} CharacterGlyphs relations...")
-        for glif_obj in glif_objs:
-            glif_obj.save()
-            glif_objs_counter += 1
-            # self.stdout.write('Updated CharacterGlyph relations - {} of {}'.format(glif_objs_counter, glif_objs_total))
-        self.stdout.write(f"Updated {glif_objs_total} CharacterGlyphs relations.")
+            # glifs are parsed in a processes pool (in pages to limit memory usage)
+            # and then imported passing the parsed data
+            num_processes = max(1, (multiprocessing.cpu_count() - 1))
+            with multiprocessing.Pool(processes=num_processes) as pool:
+                for item in self._import_mappings:
+                    self._import_group(font_obj, file, item, pool)
+
+                # update deep-components relations with atomic-elements
+                glif_objs = font_obj.deep_components.filter(has_components=True)
+                glif_objs_total = len(glif_objs)
+                self.stdout.write(
+                    f"Updating {glif_objs_total} DeepComponent relations..."
+                )
+                self._save_glifs(glif_objs, pool)
+                self.stdout.write(f"Updated {glif_objs_total} DeepComponent relations.")
+
+                # update character-glyphs relations with deep-components
+                glif_objs = font_obj.character_glyphs.filter(has_components=True)
+                glif_objs_total = len(glif_objs)
+                self.stdout.write(
+                    f"Updating {glif_objs_total} CharacterGlyphs relations..."
+                )
+                self._save_glifs(glif_objs, pool)
+                self.stdout.write(
+                    f"Updated {glif_objs_total} CharacterGlyphs relations."
+                )
 
         font_obj.available = True
         font_obj.save()
 
+    def _import_group(self, font_obj, file, item, pool):
+        group_items = self._import_groups[item["group_name"]]
+        if not item["parse_glifs"]:
+            for name, match in group_items:
+                item["import_func"](font_obj, self._zipfile_read(file, name), match)
+            return
+        per_page = settings.ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT
+        chunksize = max(1, settings.ROBOCJK_EXPORT_WORKERS_CHUNKSIZE)
+        for page_index in range(0, len(group_items), per_page):
+            page_items = group_items[page_index : page_index + per_page]
+            contents = [self._zipfile_read(file, name) for name, _ in page_items]
+            glifs_data = GlifData.parse_strings(
+                contents, pool=pool, chunksize=chunksize
+            )
+            for (name, match), content, glif_data in zip(
+                page_items, contents, glifs_data
+            ):
+                if not glif_data.ok:
+                    self.stderr.write(f"Import Error {name}: {glif_data.error}")
+                    continue
+                item["import_func"](font_obj, content, match, glif_data)
+
+    def _save_glifs(self, glif_objs, pool):
+        chunksize = max(1, settings.ROBOCJK_EXPORT_WORKERS_CHUNKSIZE)
+        glifs_data = GlifData.parse_strings(
+            [glif_obj.data for glif_obj in glif_objs], pool=pool, chunksize=chunksize
+        )
+        for glif_obj, glif_data in zip(glif_objs, glifs_data):
+            glif_obj.save(glif_data=glif_data)
+
     def _zipfile_read(self, file, path, encoding="utf-8"):
         return str(file.read(path), encoding)
 
@@ -207,23 +255,20 @@ class Command(BaseCommand):
         font.designspace = benedict.from_json(content, keypath_separator=None)
         font.save()
 
-    def _import_glif(self, cls, font, content, match):
-        data = GlifData()
-        data.parse_string(content)
+    def _import_glif(self, cls, font, content, match, data):
         # parse status during import
         status = StatusModel.get_status_from_data(data)
         try:
             obj = cls.objects.get(font=font, name__exact=data.name)
         except cls.DoesNotExist:
-            obj = cls.objects.create(font=font, name=data.name)
+            # created on save, when data (and so file name) is set
+            obj = cls(font=font, name=data.name)
         obj.status = status
         obj.data = content
-        obj.save()
+        obj.save(glif_data=data)
         # self.stdout.write('Imported {}: {}'.format(cls, data.name))
 
-    def _import_glif_layer(self, glif_cls, cls, font, content, match):
-        data = GlifData()
-        data.parse_string(content)
+    def _import_glif_layer(self, glif_cls, cls, font, content, match, data):
         layer_name = match.groupdict()["layer_name"]
         layer_name = unquote_filename(layer_name)
         try:
@@ -234,24 +279,26 @@ class Command(BaseCommand):
         try:
             obj = cls.objects.get(glif=glif_obj, group_name__exact=layer_name)
         except cls.DoesNotExist:
-            obj = cls.objects.create(glif=glif_obj, group_name=layer_name)
+            obj = cls(glif=glif_obj, group_name=layer_name)
         obj.data = content
-        obj.save()
+        obj.save(glif_data=data)
         # self.stdout.write('Imported {} [{}]: {}'.format(cls, layer_name, data.name))
 
-    def _import_atomic_element(self, font, content, match):
-        self._import_glif(AtomicElement, font, content, match)
+    def _import_atomic_element(self, font, content, match, data):
+        self._import_glif(AtomicElement, font, content, match, data)
 
-    def _import_atomic_element_layer(self, font, content, match):
-        self._import_glif_layer(AtomicElement, AtomicElementLayer, font, content, match)
+    def _import_atomic_element_layer(self, font, content, match, data):
+        self._import_glif_layer(
+            AtomicElement, AtomicElementLayer, font, content, match, data
+        )
 
-    def _import_deep_component(self, font, content, match):
-        self._import_glif(DeepComponent, font, content, match)
+    def _import_deep_component(self, font, content, match, data):
+        self._import_glif(DeepComponent, font, content, match, data)
 
-    def _import_character_glyph(self, font, content, match):
-        self._import_glif(CharacterGlyph, font, content, match)
+    def _import_character_glyph(self, font, content, match, data):
+        self._import_glif(CharacterGlyph, font, content, match, data)
 
-    def _import_character_glyph_layer(self, font, content, match):
+    def _import_character_glyph_layer(self, font, content, match, data):
         self._import_glif_layer(
-            CharacterGlyph, CharacterGlyphLayer, font, content, match
+            CharacterGlyph, CharacterGlyphLayer, font, content, match, data
         )
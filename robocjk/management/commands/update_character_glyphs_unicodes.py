@@ -1,7 +1,11 @@
+import multiprocessing
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.core.paginator import Paginator
 
+from robocjk.core import GlifData
 from robocjk.models import CharacterGlyph
+from robocjk.utils import iter_queryset_pages
 
 
 class Command(BaseCommand):
@@ -11,24 +15,33 @@ class Command(BaseCommand):
         super().__init__(*args, **kwargs)
 
     def handle(self, *args, **options):
-        glifs_queryset = CharacterGlyph.objects.all()
-        glifs_paginator = Paginator(glifs_queryset, 1000)
+        glifs_queryset = CharacterGlyph.objects.defer("formatted_data")
+        glifs_per_page = settings.ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT
 
         glif_objs_counter = 0
         glif_objs_updated_counter = 0
         glif_objs_total = CharacterGlyph.objects.count()
 
-        for glifs_page in glifs_paginator:
-            glifs_list = glifs_page.object_list
-
-            for glif_obj in glifs_list:
-                glif_data = glif_obj._parse_data(glif_obj.data)
-                if glif_data:
-                    if len(glif_data.unicodes) > 1:
-                        glif_obj.save()
-                        glif_objs_updated_counter += 1
-                glif_objs_counter += 1
-                print(
-                    f"Updated {glif_objs_counter} ({glif_objs_updated_counter}) "
-                    f"of {glif_objs_total} Character Glyphs."
+        num_processes = max(1, (multiprocessing.cpu_count() - 1))
+        chunksize = max(1, settings.ROBOCJK_EXPORT_WORKERS_CHUNKSIZE)
+        with multiprocessing.Pool(processes=num_processes) as pool:
+            for glifs_list in iter_queryset_pages(glifs_queryset, glifs_per_page):
+                # only unicodes are needed, the lib is not decoded
+                glifs_data = GlifData.parse_strings(
+                    [glif_obj.data for glif_obj in glifs_list],
+                    fields=["unicodes"],
+                    pool=pool,
+                    chunksize=chunksize,
                 )
+
+                for glif_obj, glif_data in zip(glifs_list, glifs_data):
+                    if glif_data.ok:
+                        if len(glif_data.unicodes) > 1:
+                            # slim record, save parses (and validates) the data
+                            glif_obj.save()
+                            glif_objs_updated_counter += 1
+                    glif_objs_counter += 1
+                    print(
+                        f"Updated {glif_objs_counter} ({glif_objs_updated_counter}) "
+                        f"of {glif_objs_total} Character Glyphs."
+                    )
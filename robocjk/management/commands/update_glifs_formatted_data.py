@@ -0,0 +1,76 @@
+import multiprocessing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from robocjk.models import (
+    AtomicElement,
+    AtomicElementLayer,
+    CharacterGlyph,
+    CharacterGlyphLayer,
+    DeepComponent,
+    format_glif_data,
+)
+from robocjk.utils import FORMAT_GLIF_VERSION, get_data_digest, iter_queryset_pages
+
+
+def format_glif_data_worker(glif_data):
+    pk, data = glif_data
+    return (pk, format_glif_data(data, pk=pk), get_data_digest(data))
+
+
+class Command(BaseCommand):
+    help = (
+        "Update all glifs formatted data (missing, computed by another formatter version "
+        "or from data different from the current one)."
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def handle(self, *args, **options):
+        glif_models = [
+            CharacterGlyph,
+            CharacterGlyphLayer,
+            DeepComponent,
+            AtomicElement,
+            AtomicElementLayer,
+        ]
+        num_processes = max(1, (multiprocessing.cpu_count() - 1))
+        with multiprocessing.Pool(processes=num_processes) as pool:
+            for glif_model in glif_models:
+                self._update_formatted_data(glif_model, pool)
+
+    def _update_formatted_data(self, glif_model, pool):
+        # the source digest is checked for each row (data can change without save),
+        # formatting is skipped for the rows whose formatted data is still valid
+        objs_qs = glif_model.objects.only(
+            "id", "data", "formatted_data_version", "formatted_data_source_digest"
+        )
+        objs_count = objs_qs.count()
+        objs_counter = 0
+        objs_per_page = settings.ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT
+        chunksize = max(1, settings.ROBOCJK_EXPORT_WORKERS_CHUNKSIZE)
+        for objs_page in iter_queryset_pages(objs_qs, objs_per_page):
+            objs_counter += len(objs_page)
+            objs_list = [obj for obj in objs_page if not obj.formatted_data_valid]
+            objs_by_pk = {obj.pk: obj for obj in objs_list}
+            objs_data = [(obj.pk, obj.data) for obj in objs_list]
+            for pk, formatted_data, data_digest in pool.imap_unordered(
+                format_glif_data_worker, objs_data, chunksize=chunksize
+            ):
+                obj = objs_by_pk[pk]
+                obj.formatted_data = formatted_data
+                obj.formatted_data_version = FORMAT_GLIF_VERSION
+                obj.formatted_data_source_digest = data_digest
+            # bulk_update doesn't change updated_at,
+            # so the next incremental export will not re-export these glifs
+            glif_model.objects.bulk_update(
+                objs_list,
+                [
+                    "formatted_data",
+                    "formatted_data_version",
+                    "formatted_data_source_digest",
+                ],
+            )
+            print(f"Updated {objs_counter} of {objs_count} - {glif_model} models.")
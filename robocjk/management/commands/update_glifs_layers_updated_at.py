@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 
-from robocjk.models import AtomicElement, CharacterGlyph
+from robocjk.models import AtomicElement, CharacterGlyph, Font
 
 
 class Command(BaseCommand):
@@ -11,11 +11,14 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         # update atomic elements
-        atomic_elements_qs = AtomicElement.objects.defer("data").all()
+        atomic_elements_qs = AtomicElement.objects.defer("data", "formatted_data")
         self._update_layers_updated_at(queryset=atomic_elements_qs)
         # update character glyphs
-        character_glyphs_qs = CharacterGlyph.objects.defer("data").all()
+        character_glyphs_qs = CharacterGlyph.objects.defer("data", "formatted_data")
         self._update_layers_updated_at(queryset=character_glyphs_qs)
+        # layers_updated_at is returned by glif lists, invalidate the cached ones
+        for font_id in Font.objects.values_list("id", flat=True):
+            Font.update_glifs_version(font_id)
 
     def _update_layers_updated_at(self, queryset):
         objs_qs = queryset
@@ -28,7 +31,7 @@ class Command(BaseCommand):
             if not objs_list:
                 break
             for obj in objs_list:
-                obj.update_layers_updated_at()
+                obj.update_layers_updated_at(update_font_glifs_version=False)
             objs_counter += len(objs_list)
             objs_min_id = objs_list[-1].id
             print(f"Updated {objs_counter} of {objs_count} glifs.")
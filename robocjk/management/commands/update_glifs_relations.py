@@ -1,5 +1,9 @@
+import multiprocessing
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
+from robocjk.core import GlifData
 from robocjk.models import (
     AtomicElement,
     AtomicElementLayer,
@@ -7,10 +11,14 @@ from robocjk.models import (
     CharacterGlyphLayer,
     DeepComponent,
 )
+from robocjk.utils import iter_queryset_pages
 
 
 class Command(BaseCommand):
-    help = "Update all glifs relations (relations are built on glif save)."
+    help = (
+        "Update all glifs relations and component instances "
+        "(both are built on glif save)."
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -23,13 +31,27 @@ class Command(BaseCommand):
             AtomicElement,
             AtomicElementLayer,
         ]
-        for glif_model in glif_models:
-            print(f"Updating {glif_model} models.")
-            glif_objs = glif_model.objects.filter(has_components=True)
-            glif_objs_counter = 0
-            glif_objs_total = len(glif_objs)
-            for glif_obj in glif_objs:
-                glif_obj.save()
+        num_processes = max(1, (multiprocessing.cpu_count() - 1))
+        with multiprocessing.Pool(processes=num_processes) as pool:
+            for glif_model in glif_models:
+                self._update_relations(glif_model, pool)
+
+    def _update_relations(self, glif_model, pool):
+        print(f"Updating {glif_model} models.")
+        glif_objs_qs = glif_model.objects.filter(has_components=True)
+        glif_objs_counter = 0
+        glif_objs_total = glif_objs_qs.count()
+        glif_objs_per_page = settings.ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT
+        chunksize = max(1, settings.ROBOCJK_EXPORT_WORKERS_CHUNKSIZE)
+        for glif_objs in iter_queryset_pages(glif_objs_qs, glif_objs_per_page):
+            # parse data in the pool, so save doesn't need to parse it again
+            glifs_data = GlifData.parse_strings(
+                [glif_obj.data for glif_obj in glif_objs],
+                pool=pool,
+                chunksize=chunksize,
+            )
+            for glif_obj, glif_data in zip(glif_objs, glifs_data):
+                glif_obj.save(glif_data=glif_data)
                 glif_objs_counter += 1
                 print(
                     f"Updated {glif_objs_counter} of {glif_objs_total} - {glif_model} models."
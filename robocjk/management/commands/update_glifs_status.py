@@ -1,40 +1,94 @@
+import multiprocessing
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db.models import F
 
-from robocjk.models import AtomicElement, CharacterGlyph, DeepComponent, StatusModel
+from robocjk.core import GlifData
+from robocjk.models import (
+    AtomicElement,
+    CharacterGlyph,
+    DeepComponent,
+    Font,
+    StatusModel,
+)
+from robocjk.utils import iter_queryset_pages
 
 
 class Command(BaseCommand):
-    help = "Update all glifs status (from xml value)."
+    help = "Update all glifs status and sources status (from xml value)."
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
     def handle(self, *args, **options):
         glif_models = [CharacterGlyph, DeepComponent, AtomicElement]
-        for glif_model in glif_models:
-            # print('Updating {} models.'.format(glif_model))
-            glif_objs = glif_model.objects.all()
-            glif_objs_counter = 0
-            glif_objs_total = len(glif_objs)
-            for glif_obj in glif_objs:
+        num_processes = max(1, (multiprocessing.cpu_count() - 1))
+        with multiprocessing.Pool(processes=num_processes) as pool:
+            for glif_model in glif_models:
+                self._update_status(glif_model, pool)
+        # status is used by glifs filters, invalidate the cached glif lists
+        Font.objects.update(glifs_version=F("glifs_version") + 1)
+
+    def _update_status(self, glif_model, pool):
+        # print('Updating {} models.'.format(glif_model))
+        glif_objs_qs = glif_model.objects.only(
+            "id",
+            "data",
+            "status",
+            "status_changed_at",
+            "previous_status",
+            "status_with_variations",
+            "updated_at",
+        )
+        glif_objs_counter = 0
+        glif_objs_total = glif_objs_qs.count()
+        glif_objs_per_page = settings.ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT
+        chunksize = max(1, settings.ROBOCJK_EXPORT_WORKERS_CHUNKSIZE)
+        for glif_objs in iter_queryset_pages(glif_objs_qs, glif_objs_per_page):
+            glif_objs_changed = []
+            glifs_data = GlifData.parse_strings(
+                [glif_obj.data for glif_obj in glif_objs],
+                fields=["status", "status_color", "status_with_variations"],
+                pool=pool,
+                chunksize=chunksize,
+            )
+            for glif_obj, glif_data in zip(glif_objs, glifs_data):
                 glif_obj_changed = False
-                glif_data = glif_obj._parse_data(glif_obj.data)
-                if glif_data:
+                if not glif_data.ok:
+                    print(
+                        f"Invalid {glif_model} data (id={glif_obj.pk}): {glif_data.error}"
+                    )
+                else:
                     status = StatusModel.get_status_from_data(data=glif_data)
                     if status != glif_obj.status:
                         glif_obj.status = status
                         glif_obj_changed = True
-                        # glif_model.objects.filter(pk=glif_obj.pk).update(status=status)
                     # set initial status changed at
                     if not glif_obj.status_changed_at:
                         glif_obj.status_changed_at = glif_obj.updated_at
                         glif_obj.previous_status = glif_obj.status
                         glif_obj_changed = True
+                    # set sources status (stored since it is used by queries)
+                    status_with_variations = glif_data.status_with_variations
+                    if status_with_variations != glif_obj.status_with_variations:
+                        glif_obj.status_with_variations = status_with_variations
+                        glif_obj_changed = True
                     # save glif model only if some status field changed
                     if glif_obj_changed:
-                        glif_obj.save()
-
-                glif_objs_counter += 1
-                print(
-                    f"Updated {glif_objs_counter} of {glif_objs_total} - {glif_model} models."
-                )
+                        glif_objs_changed.append(glif_obj)
+            # bulk_update doesn't change updated_at and doesn't record glif changes,
+            # data is not changed, so there is nothing to export again
+            glif_model.objects.bulk_update(
+                glif_objs_changed,
+                [
+                    "status",
+                    "status_changed_at",
+                    "previous_status",
+                    "status_with_variations",
+                ],
+            )
+            glif_objs_counter += len(glif_objs)
+            print(
+                f"Updated {glif_objs_counter} of {glif_objs_total} - {glif_model} models."
+            )
@@ -0,0 +1,117 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0024_alter_atomicelement_filename_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="atomicelement",
+            name="formatted_data",
+            field=models.TextField(
+                blank=True,
+                default="",
+                help_text="(.glif xml formatted data, computed on save)",
+                verbose_name="Formatted data",
+            ),
+        ),
+        migrations.AddField(
+            model_name="atomicelement",
+            name="formatted_data_version",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(version of the formatter used to compute the formatted data)",
+                max_length=50,
+                verbose_name="Formatted data version",
+            ),
+        ),
+        migrations.AddField(
+            model_name="atomicelementlayer",
+            name="formatted_data",
+            field=models.TextField(
+                blank=True,
+                default="",
+                help_text="(.glif xml formatted data, computed on save)",
+                verbose_name="Formatted data",
+            ),
+        ),
+        migrations.AddField(
+            model_name="atomicelementlayer",
+            name="formatted_data_version",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(version of the formatter used to compute the formatted data)",
+                max_length=50,
+                verbose_name="Formatted data version",
+            ),
+        ),
+        migrations.AddField(
+            model_name="characterglyph",
+            name="formatted_data",
+            field=models.TextField(
+                blank=True,
+                default="",
+                help_text="(.glif xml formatted data, computed on save)",
+                verbose_name="Formatted data",
+            ),
+        ),
+        migrations.AddField(
+            model_name="characterglyph",
+            name="formatted_data_version",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(version of the formatter used to compute the formatted data)",
+                max_length=50,
+                verbose_name="Formatted data version",
+            ),
+        ),
+        migrations.AddField(
+            model_name="characterglyphlayer",
+            name="formatted_data",
+            field=models.TextField(
+                blank=True,
+                default="",
+                help_text="(.glif xml formatted data, computed on save)",
+                verbose_name="Formatted data",
+            ),
+        ),
+        migrations.AddField(
+            model_name="characterglyphlayer",
+            name="formatted_data_version",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(version of the formatter used to compute the formatted data)",
+                max_length=50,
+                verbose_name="Formatted data version",
+            ),
+        ),
+        migrations.AddField(
+            model_name="deepcomponent",
+            name="formatted_data",
+            field=models.TextField(
+                blank=True,
+                default="",
+                help_text="(.glif xml formatted data, computed on save)",
+                verbose_name="Formatted data",
+            ),
+        ),
+        migrations.AddField(
+            model_name="deepcomponent",
+            name="formatted_data_version",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(version of the formatter used to compute the formatted data)",
+                max_length=50,
+                verbose_name="Formatted data version",
+            ),
+        ),
+    ]
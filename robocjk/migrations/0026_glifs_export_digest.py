@@ -0,0 +1,67 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0025_glifs_formatted_data"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="atomicelement",
+            name="export_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(md5 digest of the last content written to file-system)",
+                max_length=32,
+                verbose_name="Export digest",
+            ),
+        ),
+        migrations.AddField(
+            model_name="atomicelementlayer",
+            name="export_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(md5 digest of the last content written to file-system)",
+                max_length=32,
+                verbose_name="Export digest",
+            ),
+        ),
+        migrations.AddField(
+            model_name="characterglyph",
+            name="export_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(md5 digest of the last content written to file-system)",
+                max_length=32,
+                verbose_name="Export digest",
+            ),
+        ),
+        migrations.AddField(
+            model_name="characterglyphlayer",
+            name="export_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(md5 digest of the last content written to file-system)",
+                max_length=32,
+                verbose_name="Export digest",
+            ),
+        ),
+        migrations.AddField(
+            model_name="deepcomponent",
+            name="export_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(md5 digest of the last content written to file-system)",
+                max_length=32,
+                verbose_name="Export digest",
+            ),
+        ),
+    ]
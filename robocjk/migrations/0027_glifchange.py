@@ -0,0 +1,113 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0026_glifs_export_digest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="font",
+            name="export_changes_cursor",
+            field=models.PositiveBigIntegerField(
+                blank=True,
+                help_text="(id of the last glif change exported)",
+                null=True,
+                verbose_name="Export changes cursor",
+            ),
+        ),
+        migrations.CreateModel(
+            name="GlifChange",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("create", "Create"),
+                            ("update", "Update"),
+                            ("rename", "Rename"),
+                            ("delete", "Delete"),
+                        ],
+                        max_length=10,
+                        verbose_name="Action",
+                    ),
+                ),
+                (
+                    "glif_type",
+                    models.CharField(
+                        choices=[
+                            ("atomic_element", "Atomic Element"),
+                            ("atomic_element_layer", "Atomic Element Layer"),
+                            ("deep_component", "Deep Component"),
+                            ("character_glyph", "Character Glyph"),
+                            ("character_glyph_layer", "Character Glyph Layer"),
+                        ],
+                        max_length=50,
+                        verbose_name="Glif Type",
+                    ),
+                ),
+                ("glif_id", models.PositiveIntegerField(verbose_name="Glif ID")),
+                (
+                    "parent_glif_id",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="(only for layers)",
+                        null=True,
+                        verbose_name="Parent Glif ID",
+                    ),
+                ),
+                (
+                    "group_name",
+                    models.CharField(
+                        blank=True, max_length=50, verbose_name="Group Name"
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(blank=True, max_length=100, verbose_name="Name"),
+                ),
+                (
+                    "filename",
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name="Filename"
+                    ),
+                ),
+                (
+                    "filepath",
+                    models.CharField(
+                        blank=True,
+                        help_text="(previous file path for rename and delete actions)",
+                        max_length=255,
+                        verbose_name="Filepath",
+                    ),
+                ),
+                (
+                    "font",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="glif_changes",
+                        to="robocjk.font",
+                        verbose_name="Font",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Glif Change",
+                "verbose_name_plural": "Glif Changes",
+                "indexes": [
+                    models.Index(
+                        fields=["font", "id"], name="robocjk_gli_font_id_a8a9b4_idx"
+                    )
+                ],
+            },
+        ),
+    ]
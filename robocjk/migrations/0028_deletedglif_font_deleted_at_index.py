@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0027_glifchange"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="deletedglif",
+            index=models.Index(
+                fields=["font", "deleted_at"], name="robocjk_del_font_id_f5e5ca_idx"
+            ),
+        ),
+    ]
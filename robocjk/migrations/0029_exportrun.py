@@ -0,0 +1,173 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:57
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0028_deletedglif_font_deleted_at_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportRun",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "full_export",
+                    models.BooleanField(default=False, verbose_name="Full export"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        default=datetime.datetime.now, verbose_name="Started at"
+                    ),
+                ),
+                (
+                    "completed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Completed at"
+                    ),
+                ),
+                (
+                    "outcome",
+                    models.CharField(
+                        choices=[
+                            ("running", "Running"),
+                            ("success", "Success"),
+                            ("failure", "Failure"),
+                        ],
+                        db_index=True,
+                        default="running",
+                        max_length=20,
+                        verbose_name="Outcome",
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "db_read_duration",
+                    models.FloatField(default=0, verbose_name="DB read duration"),
+                ),
+                (
+                    "format_duration",
+                    models.FloatField(
+                        default=0,
+                        help_text="(sum of the workers formatting time)",
+                        verbose_name="Format duration",
+                    ),
+                ),
+                (
+                    "write_duration",
+                    models.FloatField(
+                        default=0,
+                        help_text="(sum of the workers writing time)",
+                        verbose_name="Write duration",
+                    ),
+                ),
+                (
+                    "verify_duration",
+                    models.FloatField(default=0, verbose_name="Verify duration"),
+                ),
+                (
+                    "cleanup_duration",
+                    models.FloatField(default=0, verbose_name="Cleanup duration"),
+                ),
+                (
+                    "git_duration",
+                    models.FloatField(default=0, verbose_name="Git duration"),
+                ),
+                (
+                    "character_glyphs_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Character Glyphs count"
+                    ),
+                ),
+                (
+                    "character_glyphs_layers_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Character Glyphs Layers count"
+                    ),
+                ),
+                (
+                    "deep_components_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Deep Components count"
+                    ),
+                ),
+                (
+                    "atomic_elements_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Atomic Elements count"
+                    ),
+                ),
+                (
+                    "atomic_elements_layers_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Atomic Elements Layers count"
+                    ),
+                ),
+                (
+                    "glifs_written_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Glifs written count"
+                    ),
+                ),
+                (
+                    "glifs_skipped_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="(unchanged glifs files not written)",
+                        verbose_name="Glifs skipped count",
+                    ),
+                ),
+                (
+                    "bytes_written",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Bytes written"
+                    ),
+                ),
+                (
+                    "font",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="(empty for project export runs)",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="export_runs",
+                        to="robocjk.font",
+                        verbose_name="Font",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="export_runs",
+                        to="robocjk.project",
+                        verbose_name="Project",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Export Run",
+                "verbose_name_plural": "Export Runs",
+                "ordering": ["-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["project", "id"], name="robocjk_exp_project_33a74f_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-17 04:01
+
+import datetime
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0029_exportrun"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Lock",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=64, unique=True, verbose_name="Name"),
+                ),
+                ("owner", models.CharField(max_length=150, verbose_name="Owner")),
+                (
+                    "acquired_at",
+                    models.DateTimeField(
+                        default=datetime.datetime.now, verbose_name="Acquired at"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Lock",
+                "verbose_name_plural": "Locks",
+            },
+        ),
+    ]
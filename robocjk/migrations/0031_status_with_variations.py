@@ -0,0 +1,45 @@
+# Generated by Django 5.0.1 on 2026-10-17 04:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0030_lock"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="atomicelement",
+            name="status_with_variations",
+            field=models.JSONField(
+                blank=True,
+                default=None,
+                help_text="(autodetected from xml data)",
+                null=True,
+                verbose_name="Status with variations",
+            ),
+        ),
+        migrations.AddField(
+            model_name="characterglyph",
+            name="status_with_variations",
+            field=models.JSONField(
+                blank=True,
+                default=None,
+                help_text="(autodetected from xml data)",
+                null=True,
+                verbose_name="Status with variations",
+            ),
+        ),
+        migrations.AddField(
+            model_name="deepcomponent",
+            name="status_with_variations",
+            field=models.JSONField(
+                blank=True,
+                default=None,
+                help_text="(autodetected from xml data)",
+                null=True,
+                verbose_name="Status with variations",
+            ),
+        ),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.0.1 on 2026-10-17 04:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0031_status_with_variations"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ComponentInstance",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "index",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="(position in the glif components list)",
+                        verbose_name="Index",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        blank=True,
+                        help_text="(name of the component glif)",
+                        max_length=100,
+                        verbose_name="Name",
+                    ),
+                ),
+                (
+                    "coord",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="(axes values)",
+                        verbose_name="Coord",
+                    ),
+                ),
+                ("x", models.FloatField(default=0.0, verbose_name="X")),
+                ("y", models.FloatField(default=0.0, verbose_name="Y")),
+                ("scale_x", models.FloatField(default=1.0, verbose_name="Scale X")),
+                ("scale_y", models.FloatField(default=1.0, verbose_name="Scale Y")),
+                ("rotation", models.FloatField(default=0.0, verbose_name="Rotation")),
+                (
+                    "rcenter_x",
+                    models.FloatField(default=0.0, verbose_name="Rotation center X"),
+                ),
+                (
+                    "rcenter_y",
+                    models.FloatField(default=0.0, verbose_name="Rotation center Y"),
+                ),
+                (
+                    "tcenter_x",
+                    models.FloatField(
+                        default=0.0, verbose_name="Transformation center X"
+                    ),
+                ),
+                (
+                    "tcenter_y",
+                    models.FloatField(
+                        default=0.0, verbose_name="Transformation center Y"
+                    ),
+                ),
+                (
+                    "character_glyph",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="component_instances",
+                        to="robocjk.characterglyph",
+                        verbose_name="Character Glyph",
+                    ),
+                ),
+                (
+                    "deep_component",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="component_instances",
+                        to="robocjk.deepcomponent",
+                        verbose_name="Deep Component",
+                    ),
+                ),
+                (
+                    "font",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="component_instances",
+                        to="robocjk.font",
+                        verbose_name="Font",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Component Instance",
+                "verbose_name_plural": "Component Instances",
+                "ordering": ["index"],
+                "indexes": [
+                    models.Index(
+                        fields=["font", "name"], name="robocjk_com_font_id_1b9dec_idx"
+                    )
+                ],
+            },
+        ),
+    ]
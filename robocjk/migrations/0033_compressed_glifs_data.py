@@ -0,0 +1,99 @@
+# Generated by Django 5.0.1 on 2026-10-17 04:29
+
+from django.db import migrations
+
+import robocjk.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0032_component_instance"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="atomicelement",
+            name="data",
+            field=robocjk.fields.CompressedTextField(
+                help_text="(.glif xml data)", verbose_name="Data"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="atomicelement",
+            name="formatted_data",
+            field=robocjk.fields.CompressedTextField(
+                blank=True,
+                default="",
+                help_text="(.glif xml formatted data, computed on save)",
+                verbose_name="Formatted data",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="atomicelementlayer",
+            name="data",
+            field=robocjk.fields.CompressedTextField(
+                help_text="(.glif xml data)", verbose_name="Data"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="atomicelementlayer",
+            name="formatted_data",
+            field=robocjk.fields.CompressedTextField(
+                blank=True,
+                default="",
+                help_text="(.glif xml formatted data, computed on save)",
+                verbose_name="Formatted data",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="characterglyph",
+            name="data",
+            field=robocjk.fields.CompressedTextField(
+                help_text="(.glif xml data)", verbose_name="Data"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="characterglyph",
+            name="formatted_data",
+            field=robocjk.fields.CompressedTextField(
+                blank=True,
+                default="",
+                help_text="(.glif xml formatted data, computed on save)",
+                verbose_name="Formatted data",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="characterglyphlayer",
+            name="data",
+            field=robocjk.fields.CompressedTextField(
+                help_text="(.glif xml data)", verbose_name="Data"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="characterglyphlayer",
+            name="formatted_data",
+            field=robocjk.fields.CompressedTextField(
+                blank=True,
+                default="",
+                help_text="(.glif xml formatted data, computed on save)",
+                verbose_name="Formatted data",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="deepcomponent",
+            name="data",
+            field=robocjk.fields.CompressedTextField(
+                help_text="(.glif xml data)", verbose_name="Data"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="deepcomponent",
+            name="formatted_data",
+            field=robocjk.fields.CompressedTextField(
+                blank=True,
+                default="",
+                help_text="(.glif xml formatted data, computed on save)",
+                verbose_name="Formatted data",
+            ),
+        ),
+    ]
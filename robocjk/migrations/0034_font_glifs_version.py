@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-17 04:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0033_compressed_glifs_data"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="font",
+            name="glifs_version",
+            field=models.PositiveBigIntegerField(
+                default=0,
+                editable=False,
+                help_text="(incremented on every glif save, delete, lock and unlock)",
+                verbose_name="Glifs version",
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.0.1 on 2026-10-17 04:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0034_font_glifs_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="atomicelement",
+            name="formatted_data_source_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(md5 digest of the data used to compute the formatted data)",
+                max_length=32,
+                verbose_name="Formatted data source digest",
+            ),
+        ),
+        migrations.AddField(
+            model_name="atomicelementlayer",
+            name="formatted_data_source_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(md5 digest of the data used to compute the formatted data)",
+                max_length=32,
+                verbose_name="Formatted data source digest",
+            ),
+        ),
+        migrations.AddField(
+            model_name="characterglyph",
+            name="formatted_data_source_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(md5 digest of the data used to compute the formatted data)",
+                max_length=32,
+                verbose_name="Formatted data source digest",
+            ),
+        ),
+        migrations.AddField(
+            model_name="characterglyphlayer",
+            name="formatted_data_source_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(md5 digest of the data used to compute the formatted data)",
+                max_length=32,
+                verbose_name="Formatted data source digest",
+            ),
+        ),
+        migrations.AddField(
+            model_name="deepcomponent",
+            name="formatted_data_source_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="(md5 digest of the data used to compute the formatted data)",
+                max_length=32,
+                verbose_name="Formatted data source digest",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-17 05:00
+
+import datetime
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("robocjk", "0035_glifs_formatted_data_source_digest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lock",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                default=datetime.datetime.now,
+                help_text="(refreshed periodically by the owner while holding the lock)",
+                verbose_name="Heartbeat at",
+            ),
+        ),
+    ]
@@ -1,18 +1,21 @@
 import datetime as dt
+import hashlib
 import multiprocessing
-
-# import os
+import os
+import re
 import subprocess
+import time
+from contextlib import contextmanager
 
 import fsutil
 from benedict import benedict
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.paginator import Paginator
 from django.core.validators import FileExtensionValidator
 from django.db import models
-from django.db.models import Max
+from django.db.models import F, Max
+from django.db.models.functions import Coalesce
 from django.utils.encoding import force_str
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
@@ -36,6 +39,13 @@ from robocjk.api.serializers import (
 from robocjk.core import GlifData
 from robocjk.debug import logger
 from robocjk.exceptions import VerificationError
+from robocjk.fields import CompressedTextField
+from robocjk.io.files import (
+    get_file_digest,
+    get_file_size,
+    get_files_sizes,
+    remove_files,
+)
 from robocjk.io.paths import (
     get_atomic_element_layer_path,
     get_atomic_element_path,
@@ -45,10 +55,12 @@ from robocjk.io.paths import (
     get_character_glyphs_path,
     get_deep_component_path,
     get_deep_components_path,
+    get_font_manifest_path,
     get_font_path,
     get_project_path,
     get_proof_path,
 )
+from robocjk.locks import refresh_locks
 from robocjk.managers import (
     AtomicElementLayerManager,
     AtomicElementManager,
@@ -59,7 +71,13 @@ from robocjk.managers import (
     ProjectManager,
 )
 from robocjk.signals import connect_signals
-from robocjk.utils import format_glif, unicodes_str_to_list
+from robocjk.utils import (
+    FORMAT_GLIF_VERSION,
+    format_glif,
+    get_data_digest,
+    iter_queryset_pages,
+    unicodes_str_to_list,
+)
 from robocjk.validators import GitSSHRepositoryURLValidator
 
 # import time
@@ -101,6 +119,34 @@ def run_commands(*args):
             raise error
 
 
+def run_git_command(path, *args, input_paths=None, check=True):
+    """
+    Run a git command in the given repository path without using the shell.
+    If input_paths is passed, paths are passed to git through stdin
+    (NUL separated), to be used with --pathspec-from-file=- --pathspec-file-nul.
+    """
+    cmd = ["git", "--literal-pathspecs", *args]
+    cmd_str = " ".join(cmd)
+    cmd_input = None
+    if input_paths is not None:
+        cmd_input = "\0".join(input_paths).encode("UTF-8")
+        cmd_str = f"{cmd_str} ({len(input_paths)} paths)"
+    logger.info(f"Run git command: \n{cmd_str}")
+    cmd_result = subprocess.run(cmd, cwd=path, input=cmd_input, capture_output=True)
+    cmd_output_str = cmd_result.stdout.decode("UTF-8")
+    if cmd_result.returncode != 0 and check:
+        cmd_error_str = cmd_result.stderr.decode("UTF-8")
+        logger.error(f"Command error: {cmd_error_str}")
+        raise subprocess.CalledProcessError(
+            cmd_result.returncode,
+            cmd,
+            output=cmd_result.stdout,
+            stderr=cmd_result.stderr,
+        )
+    logger.info(f"Command output: {cmd_output_str}")
+    return cmd_result
+
+
 class Project(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
     """
     The Project model.
@@ -146,42 +192,71 @@ class Project(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel)
     def path(self):
         return get_project_path(self)
 
-    def save_by(self, user):
-        super().save_by(user)
+    def get_export_pending_changes_count(self):
+        """
+        Get the number of glif changes recorded since the last export of each font,
+        (all the changes of fonts never exported using the changes journal).
+        """
+        return GlifChange.objects.filter(
+            font__project=self,
+            id__gt=Coalesce("font__export_changes_cursor", 0),
+        ).count()
+
+    def save_by(self, user, **kwargs):
+        super().save_by(user, **kwargs)
         self.designers.add(user)
 
+    def export_started(self, full_export):
+        self.export_run = ExportRun.objects.create(
+            project=self,
+            full_export=full_export,
+        )
+
+    def export_completed(self, error=None):
+        self.get_export_run().complete(error=error)
+
+    def get_export_run(self):
+        """
+        Get the export run being recorded, if the project is not being exported
+        an unsaved export run is returned (and its measures are discarded).
+        """
+        return getattr(self, "export_run", None) or ExportRun()
+
     def save_to_file_system(self, full_export=False):
         logger.info(f'Saving project "{self.name}" to file system...')
         path = self.path()
         fsutil.make_dirs(path)
         repo_path = fsutil.join_path(path, ".git")
         repo_branch = self.repo_branch or "main"
+        export_run = self.get_export_run()
         if not fsutil.exists(repo_path):
             # repository doesn't exist, initialize it
             logger.info(
                 f"Repository for project '{self.name}' doesn't exist, initialize it."
             )
-            run_commands(
-                f"cd {path}",
-                "git init",
-                f'git config --local --add "user.name" "{settings.GIT_USER_NAME}"',
-                f'git config --local --add "user.email" "{settings.GIT_USER_EMAIL}"',
-                f"git remote add origin {self.repo_url}",
-                f"git pull origin {repo_branch}",
-                f"git push --set-upstream origin {repo_branch}",
-            )
+            with export_run.measure(ExportRun.PHASE_GIT):
+                run_commands(
+                    f"cd {path}",
+                    "git init",
+                    f'git config --local --add "user.name" "{settings.GIT_USER_NAME}"',
+                    f'git config --local --add "user.email" "{settings.GIT_USER_EMAIL}"',
+                    f"git remote add origin {self.repo_url}",
+                    f"git pull origin {repo_branch}",
+                    f"git push --set-upstream origin {repo_branch}",
+                )
         else:
             # repository exist
             logger.info(
                 f'Repository for project "{self.name}" already exist, update it.'
             )
-            run_commands(
-                f"cd {path}",
-                "git reset --hard",
-                f"git checkout {repo_branch}",
-                f"git pull origin {repo_branch}",
-                "git clean -df",
-            )
+            with export_run.measure(ExportRun.PHASE_GIT):
+                run_commands(
+                    f"cd {path}",
+                    "git reset --hard",
+                    f"git checkout {repo_branch}",
+                    f"git pull origin {repo_branch}",
+                    "git clean -df",
+                )
         # save all project fonts to file.system
         fonts_qs = self.fonts.all()
         fonts_list = list(fonts_qs)
@@ -193,7 +268,8 @@ class Project(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel)
             f"Deleting project '{self.name}' old fonts "
             f"from file system... \n{fonts_rcjk_deleted_dirs}"
         )
-        fsutil.remove_dirs(*fonts_rcjk_deleted_dirs)
+        with export_run.measure(ExportRun.PHASE_CLEANUP):
+            fsutil.remove_dirs(*fonts_rcjk_deleted_dirs)
         # save all project fonts to the file system
         export_strategy_name = "full" if full_export else "incremental"
         font_names = [font.name for font in fonts_list]
@@ -202,27 +278,36 @@ class Project(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel)
             f"to file system... \n{font_names}"
         )
 
+        if settings.ROBOCJK_EXPORT_GIT_BATCHED:
+            self._save_fonts_to_file_system_batched(fonts_list, full_export)
+            return
+
         for font in fonts_list:
             font_dirpath = fsutil.get_filename(font.path())
             font_commit_message = font.get_commit_message()
+            # the font export state is stored only if its changes are committed
+            font.export_state_deferred = True
             font_export_success = font.export(full=full_export)
+            with self._measure_font_git(font):
+                if font_export_success:
+                    # add all changed files, commit and push to the git repository
+                    run_commands(
+                        f"cd {path}",
+                        f"git add ./{font_dirpath}",
+                        f'git commit -m "{font_commit_message}"',
+                        f"git push origin {repo_branch}",
+                    )
+                else:
+                    # reset all changed files
+                    run_commands(
+                        f"cd {path}",
+                        "git reset --hard",
+                        f"git checkout {repo_branch}",
+                        f"git pull origin {repo_branch}",
+                        "git clean -df",
+                    )
             if font_export_success:
-                # add all changed files, commit and push to the git repository
-                run_commands(
-                    f"cd {path}",
-                    f"git add ./{font_dirpath}",
-                    f'git commit -m "{font_commit_message}"',
-                    f"git push origin {repo_branch}",
-                )
-            else:
-                # reset all changed files
-                run_commands(
-                    f"cd {path}",
-                    "git reset --hard",
-                    f"git checkout {repo_branch}",
-                    f"git pull origin {repo_branch}",
-                    "git clean -df",
-                )
+                font.save_export_state()
 
         # # This is not needed for exporting .rcjk data and could commit
         # # unwanted changes when font export failed (font_export_success=False).
@@ -233,6 +318,97 @@ class Project(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel)
         #     f"git push origin {repo_branch}",
         # )
 
+    def _save_fonts_to_file_system_batched(self, fonts_list, full_export):
+        """
+        Export all fonts committing each font changes separately,
+        git is given only the exact list of written/removed paths (when known)
+        and the project repository is pushed only once at the end.
+        """
+        path = self.path()
+        repo_branch = self.repo_branch or "main"
+        commits_count = 0
+        for font in fonts_list:
+            font_commit_message = font.get_commit_message()
+            # track paths written/removed by the font export
+            font.changed_paths = set()
+            # the font export state is stored only if its changes are committed
+            font.export_state_deferred = True
+            font_export_success = font.export(full=full_export)
+            with self._measure_font_git(font):
+                if font_export_success:
+                    if self._git_commit_font_changes(font, font_commit_message):
+                        commits_count += 1
+                else:
+                    # reset all changed files, previous fonts commits are kept
+                    run_git_command(path, "reset", "--hard")
+                    run_git_command(path, "clean", "-df")
+            if font_export_success:
+                font.save_export_state()
+            font.changed_paths = None
+        if commits_count:
+            with self.get_export_run().measure(ExportRun.PHASE_GIT):
+                run_git_command(path, "push", "origin", repo_branch)
+
+    @contextmanager
+    def _measure_font_git(self, font):
+        """
+        Add the time spent committing/resetting the font changes
+        to the git duration of both the project and the font export runs.
+        """
+        project_export_run = self.get_export_run()
+        font_export_run = font.get_export_run()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            project_export_run.add_duration(ExportRun.PHASE_GIT, duration)
+            font_export_run.add_duration(ExportRun.PHASE_GIT, duration)
+            if font_export_run.pk:
+                font_export_run.save(update_fields=["git_duration"])
+
+    def _git_commit_font_changes(self, font, message):
+        path = self.path()
+        changed_paths = font.changed_paths
+        if changed_paths is None:
+            # changed paths are unknown, add the whole font directory
+            font_dirpath = fsutil.get_filename(font.path())
+            run_git_command(path, "add", "--all", "--", f"./{font_dirpath}")
+        else:
+            added_paths = []
+            removed_paths = []
+            for changed_path in sorted(changed_paths):
+                changed_relpath = os.path.relpath(changed_path, path)
+                if os.path.exists(changed_path):
+                    added_paths.append(changed_relpath)
+                else:
+                    removed_paths.append(changed_relpath)
+            if added_paths:
+                run_git_command(
+                    path,
+                    "add",
+                    "--pathspec-from-file=-",
+                    "--pathspec-file-nul",
+                    input_paths=added_paths,
+                )
+            if removed_paths:
+                run_git_command(
+                    path,
+                    "rm",
+                    "--cached",
+                    "--quiet",
+                    "--ignore-unmatch",
+                    "--pathspec-from-file=-",
+                    "--pathspec-file-nul",
+                    input_paths=removed_paths,
+                )
+        # commit only if something has been staged
+        staged = run_git_command(path, "diff", "--cached", "--quiet", check=False)
+        if staged.returncode == 0:
+            return False
+        run_git_command(path, "commit", "--quiet", "-m", message)
+        return True
+
     def cleanup_file_system(self):
         for font_obj in self.fonts.all():
             font_obj.cleanup_file_system()
@@ -248,19 +424,49 @@ class Project(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel)
         return force_str(f"{self.name}")
 
 
-def save_glif_to_file_system(glif_data):
+def format_glif_data(data, pk=None):
     """
-    Worker function for saving glif files to file-system.
+    Format glif xml data, fallback to the unformatted data in case of errors.
     """
-    # logger.debug('Saving glif "{}" to file system: {}'.format(glif, glif.path()))
-    filepath, content = glif_data
-    # file_exists = fsutil.exists(filepath)
-    # assert not file_exists
+    try:
+        return format_glif(data)
+    except Exception as formatting_error:
+        message = "glif xml data formatting error - pk: {}, error: {}".format(
+            pk, formatting_error
+        )
+        logger.exception(message)
+        return data
+
+
+def format_and_save_glif_to_file_system(glif_data):
+    """
+    Worker function for formatting glif xml data and saving it to file-system,
+    formatting is cpu-bound, so it is done in the worker instead of the main process.
+    Formatting is skipped if the already formatted data is passed.
+    Writing is skipped if the file exists (file_size is not None), its size matches
+    and its content is equal to the content to write (the file is read only if the size
+    matches), the file content is compared because a failed export restores previous files.
+    Returns a tuple (pk, digest, size, written, format duration, write duration).
+    """
+    pk, filepath, data, formatted_data, file_size = glif_data
+    format_start = time.perf_counter()
+    content = formatted_data or format_glif_data(data, pk=pk)
+    content_bytes = content.encode("utf-8")
+    digest = hashlib.md5(content_bytes).hexdigest()
+    size = len(content_bytes)
+    format_duration = time.perf_counter() - format_start
+    write_start = time.perf_counter()
+    if file_size is not None and file_size == size:
+        try:
+            with open(filepath, "rb") as file:
+                file_content_bytes = file.read()
+        except FileNotFoundError:
+            file_content_bytes = None
+        if file_content_bytes == content_bytes:
+            return (pk, digest, size, False, format_duration, 0.0)
     fsutil.write_file(filepath, content)
-    # file_exists = fsutil.exists(filepath)
-    # assert file_exists
-    # return file_exists
-    return True
+    write_duration = time.perf_counter() - write_start
+    return (pk, digest, size, True, format_duration, write_duration)
 
 
 class Font(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
@@ -306,8 +512,27 @@ class Font(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
         verbose_name=_("Designspace"),
     )
 
+    export_changes_cursor = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_("Export changes cursor"),
+        help_text=_("(id of the last glif change exported)"),
+    )
+
+    glifs_version = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Glifs version"),
+        help_text=_("(incremented on every glif save, delete, lock and unlock)"),
+    )
+
     objects = FontManager()
 
+    @classmethod
+    def update_glifs_version(cls, font_id):
+        # update query, to avoid race conditions and to not call save signals
+        cls.objects.filter(pk=font_id).update(glifs_version=F("glifs_version") + 1)
+
     @cached_property
     def full_name(self):
         return f"{self.project.name} / {self.name}"
@@ -344,6 +569,23 @@ class Font(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
     def path(self):
         return get_font_path(self)
 
+    def export_started(self, full_export):
+        self.export_run = ExportRun.objects.create(
+            project_id=self.project_id,
+            font=self,
+            full_export=full_export,
+        )
+
+    def export_completed(self, error=None):
+        self.get_export_run().complete(error=error)
+
+    def get_export_run(self):
+        """
+        Get the export run being recorded, if the font is not being exported
+        an unsaved export run is returned (and its measures are discarded).
+        """
+        return getattr(self, "export_run", None) or ExportRun()
+
     def save_to_file_system(self, full_export=False):  # noqa: C901
         font = self
         font_name = font.full_name
@@ -354,34 +596,43 @@ class Font(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
             )
             return
         logger.info(f"Saving font '{font_name}' to file system...")
+        export_run = font.get_export_run()
         font_path = font.path()
         fsutil.make_dirs(font_path)
-        # write fontLib.json file
-        logger.info(f"Saving font '{font_name}' 'fontLib.json' to file system...")
-        fontlib_path = fsutil.join_path(font_path, "fontLib.json")
-        fontlib_str = benedict(font.fontlib, keypath_separator=None).dump()
-        fsutil.write_file(fontlib_path, fontlib_str)
-        # write features.fea file
-        logger.info(f"Saving font '{font_name}' 'features.fea' to file system...")
-        features_path = fsutil.join_path(font_path, "features.fea")
-        fsutil.write_file(features_path, font.features)
-        # write designspace.json file
-        logger.info(f"Saving font '{font_name}' 'designspace.json' to file system...")
-        designspace_path = fsutil.join_path(font_path, "designspace.json")
-        designspace_str = benedict(font.designspace, keypath_separator=None).dump()
-        fsutil.write_file(designspace_path, designspace_str)
-        # write glyphsComposition.json file
-        logger.info(
-            f"Saving font '{font_name}' 'glyphsComposition.json' to file system..."
-        )
-        glyphs_composition_obj, _ = GlyphsComposition.objects.get_or_create(
-            font_id=font.id
+        with export_run.measure(ExportRun.PHASE_WRITE):
+            # write fontLib.json file
+            logger.info(f"Saving font '{font_name}' 'fontLib.json' to file system...")
+            fontlib_path = fsutil.join_path(font_path, "fontLib.json")
+            fontlib_str = benedict(font.fontlib, keypath_separator=None).dump()
+            fsutil.write_file(fontlib_path, fontlib_str)
+            # write features.fea file
+            logger.info(f"Saving font '{font_name}' 'features.fea' to file system...")
+            features_path = fsutil.join_path(font_path, "features.fea")
+            fsutil.write_file(features_path, font.features)
+            # write designspace.json file
+            logger.info(
+                f"Saving font '{font_name}' 'designspace.json' to file system..."
+            )
+            designspace_path = fsutil.join_path(font_path, "designspace.json")
+            designspace_str = benedict(font.designspace, keypath_separator=None).dump()
+            fsutil.write_file(designspace_path, designspace_str)
+            # write glyphsComposition.json file
+            logger.info(
+                f"Saving font '{font_name}' 'glyphsComposition.json' to file system..."
+            )
+            glyphs_composition_obj, _ = GlyphsComposition.objects.get_or_create(
+                font_id=font.id
+            )
+            glyphs_composition_path = fsutil.join_path(
+                font_path, "glyphsComposition.json"
+            )
+            glyphs_composition_str = benedict(
+                glyphs_composition_obj.serialize(), keypath_separator=None
+            ).dump()
+            fsutil.write_file(glyphs_composition_path, glyphs_composition_str)
+        font.track_changed_paths(
+            [fontlib_path, features_path, designspace_path, glyphs_composition_path]
         )
-        glyphs_composition_path = fsutil.join_path(font_path, "glyphsComposition.json")
-        glyphs_composition_str = benedict(
-            glyphs_composition_obj.serialize(), keypath_separator=None
-        ).dump()
-        fsutil.write_file(glyphs_composition_path, glyphs_composition_str)
 
         # delete existing character-glyphs, deep-components and atomic-elements directories
         logger.info(
@@ -393,28 +644,73 @@ class Font(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
         deep_components_path = get_deep_components_path(font)
         atomic_elements_path = get_atomic_elements_path(font)
 
+        # the manifest of the last export is needed for verifying incremental exports
+        manifest = {}
+        if not full_export:
+            with export_run.measure(ExportRun.PHASE_VERIFY):
+                manifest = font.load_manifest()
+            if manifest is None:
+                logger.info(
+                    f"Saving font '{font_name}' - "
+                    "manifest not found, running full export."
+                )
+                manifest = {}
+                full_export = True
+        export_run.full_export = full_export
+
+        # read the changes journal up to the current last change,
+        # changes recorded while exporting will be exported next time
+        with export_run.measure(ExportRun.PHASE_DB_READ):
+            changes_last_id = font.glif_changes.aggregate(Max("id"))["id__max"] or 0
+        changes_qs = None
+        if not full_export and font.export_changes_cursor is not None:
+            # the font has already been exported since the journal exists,
+            # so the incremental export can read just the changes since the cursor
+            changes_qs = font.glif_changes.filter(
+                id__gt=font.export_changes_cursor,
+                id__lte=changes_last_id,
+            )
+
         # cleanup glifs dirs/files
         updated_after = None
-        if full_export:
-            # remove existing glifs dirs
-            fsutil.remove_dirs(
-                character_glyphs_path,
-                deep_components_path,
-                atomic_elements_path,
-            )
-        else:
-            # set updated_after only if not running a full export
-            if font.export_started_at and font.export_completed_at:
-                updated_after = min(font.export_started_at, font.export_completed_at)
-            # delete possible zombie files of glifs that have been deleted
-            if updated_after:
-                deleted_glifs_qs = DeletedGlif.objects.select_related(
-                    "font",
-                ).filter(deleted_at__gt=updated_after)
-                for deleted_glif_obj in deleted_glifs_qs:
-                    deleted_glif_filepath = deleted_glif_obj.filepath
-                    if fsutil.is_file(deleted_glif_filepath):
-                        fsutil.remove_file(deleted_glif_filepath)
+        reconcile = full_export and settings.ROBOCJK_EXPORT_RECONCILE
+        existing_files_sizes = {}
+        with export_run.measure(ExportRun.PHASE_CLEANUP):
+            if reconcile:
+                # keep existing glifs dirs, only changed files will be written
+                # and files without corresponding glif will be removed at the end
+                existing_files_sizes = get_files_sizes(
+                    character_glyphs_path,
+                    deep_components_path,
+                    atomic_elements_path,
+                )
+            elif full_export:
+                # remove existing glifs dirs,
+                # the exact list of changed paths is not known anymore
+                font.track_changed_paths(None)
+                fsutil.remove_dirs(
+                    character_glyphs_path,
+                    deep_components_path,
+                    atomic_elements_path,
+                )
+            elif changes_qs is not None:
+                # delete files of glifs that have been renamed or deleted
+                removed_files_paths = list(
+                    changes_qs.filter(action__in=GlifChange.ACTIONS_REMOVE)
+                    .values_list("filepath", flat=True)
+                    .distinct()
+                )
+                font.track_changed_paths(remove_files(removed_files_paths))
+                font._remove_manifest_entries(removed_files_paths, manifest=manifest)
+            else:
+                # set updated_after only if not running a full export
+                if font.export_started_at and font.export_completed_at:
+                    updated_after = min(
+                        font.export_started_at, font.export_completed_at
+                    )
+                # delete possible zombie files of glifs that have been deleted
+                if updated_after:
+                    font.delete_deleted_glifs_files(deleted_after=updated_after)
 
         # create empty dirs to avoid errors in fonts that have not all entities
         fsutil.make_dirs(character_glyphs_path)
@@ -423,33 +719,59 @@ class Font(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
 
         logger.info(f"Loading font '{font_name}' glifs from database.")
 
-        per_page = settings.ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT
-
-        glifs_filters = {}
-        if not full_export and updated_after:
-            glifs_filters["updated_at__gt"] = updated_after
+        glifs_filters = {glif_type: {} for glif_type in DeletedGlif.GLIF_TYPES}
+        for glif_type in DeletedGlif.GLIF_TYPES:
+            if changes_qs is not None:
+                glifs_filters[glif_type]["id__in"] = changes_qs.filter(
+                    glif_type=glif_type,
+                    action__in=GlifChange.ACTIONS_WRITE,
+                ).values("glif_id")
+            elif not full_export and updated_after:
+                glifs_filters[glif_type]["updated_at__gt"] = updated_after
 
         character_glyphs_qs = CharacterGlyph.objects.select_related(
             "font", "font__project"
-        ).filter(font=font, **glifs_filters)
+        ).filter(
+            font=font,
+            **glifs_filters[DeletedGlif.GLIF_TYPE_CHARACTER_GLYPH],
+        )
         character_glyphs_layers_qs = CharacterGlyphLayer.objects.select_related(
             "glif", "glif__font", "glif__font__project"
-        ).filter(glif__font=font, **glifs_filters)
+        ).filter(
+            glif__font=font,
+            **glifs_filters[DeletedGlif.GLIF_TYPE_CHARACTER_GLYPH_LAYER],
+        )
         deep_components_qs = DeepComponent.objects.select_related(
             "font", "font__project"
-        ).filter(font=font, **glifs_filters)
+        ).filter(
+            font=font,
+            **glifs_filters[DeletedGlif.GLIF_TYPE_DEEP_COMPONENT],
+        )
         atomic_elements_qs = AtomicElement.objects.select_related(
             "font", "font__project"
-        ).filter(font=font, **glifs_filters)
+        ).filter(
+            font=font,
+            **glifs_filters[DeletedGlif.GLIF_TYPE_ATOMIC_ELEMENT],
+        )
         atomic_elements_layers_qs = AtomicElementLayer.objects.select_related(
             "glif", "glif__font", "glif__font__project"
-        ).filter(glif__font=font, **glifs_filters)
+        ).filter(
+            glif__font=font,
+            **glifs_filters[DeletedGlif.GLIF_TYPE_ATOMIC_ELEMENT_LAYER],
+        )
 
-        character_glyphs_count = character_glyphs_qs.count()
-        character_glyphs_layers_count = character_glyphs_layers_qs.count()
-        deep_components_count = deep_components_qs.count()
-        atomic_elements_count = atomic_elements_qs.count()
-        atomic_elements_layers_count = atomic_elements_layers_qs.count()
+        with export_run.measure(ExportRun.PHASE_DB_READ):
+            character_glyphs_count = character_glyphs_qs.count()
+            character_glyphs_layers_count = character_glyphs_layers_qs.count()
+            deep_components_count = deep_components_qs.count()
+            atomic_elements_count = atomic_elements_qs.count()
+            atomic_elements_layers_count = atomic_elements_layers_qs.count()
+
+        export_run.character_glyphs_count = character_glyphs_count
+        export_run.character_glyphs_layers_count = character_glyphs_layers_count
+        export_run.deep_components_count = deep_components_count
+        export_run.atomic_elements_count = atomic_elements_count
+        export_run.atomic_elements_layers_count = atomic_elements_layers_count
 
         # fmt: off
         glifs_count = (
@@ -460,19 +782,13 @@ class Font(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
             atomic_elements_layers_count
         )
         # fmt: on
-        glifs_progress = 0
-        glifs_progress_perc = 0
 
         glifs_querysets = [
-            character_glyphs_qs.order_by('id'),
-            character_glyphs_layers_qs.order_by('id'),
-            deep_components_qs.order_by('id'),
-            atomic_elements_qs.order_by('id'),
-            atomic_elements_layers_qs.order_by('id'),
-        ]
-
-        glifs_paginators = [
-            Paginator(glifs_queryset, per_page) for glifs_queryset in glifs_querysets
+            character_glyphs_qs,
+            character_glyphs_layers_qs,
+            deep_components_qs,
+            atomic_elements_qs,
+            atomic_elements_layers_qs,
         ]
 
         # close old database connection to prevent OperationalError(s)
@@ -492,20 +808,198 @@ class Font(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
         logger.info(f" - {atomic_elements_count} atomic elements")
         logger.info(f" - {atomic_elements_layers_count} atomic elements layers")
 
+        # glifs export digests changed by this export (by model and pk)
+        export_digests = {}
+        glifs_written_count, glifs_skipped_count = font._save_glifs_to_file_system(
+            glifs_querysets,
+            manifest=manifest,
+            export_digests=export_digests,
+            files_sizes=existing_files_sizes if reconcile else None,
+            glifs_count=glifs_count,
+        )
+
+        logger.info(
+            f"Saved font '{font_name}' - "
+            f"{glifs_written_count} glifs written, "
+            f"{glifs_skipped_count} glifs unchanged."
+        )
+
+        # verify the file-system against the database and the manifest,
+        # zombie files are removed and missing or mismatching files re-written,
+        # only if it is still not possible to fix them run a full export;
+        # incremental exports verify only the exported glifs,
+        # the whole font is verified by full exports and by verify_file_system
+        compared_glifs_querysets = None if full_export else glifs_querysets
+        with export_run.measure(ExportRun.PHASE_VERIFY):
+            comparison = font.compare_file_system(
+                manifest=manifest,
+                export_digests=export_digests,
+                glifs_querysets=compared_glifs_querysets,
+            )
+        if reconcile and comparison["zombie"]:
+            # remove files that have no corresponding glif in the database
+            logger.info(
+                f"Saving font '{font_name}' - "
+                f"removing {len(comparison['zombie'])} files without glif."
+            )
+            font._remove_zombie_files(comparison["zombie"], manifest=manifest)
+            comparison["zombie"] = set()
+        comparison_errors = font._get_file_system_comparison_errors(comparison)
+        if comparison_errors:
+            logger.warning("\n".join(comparison_errors))
+            font._repair_file_system(
+                comparison, manifest=manifest, export_digests=export_digests
+            )
+            with export_run.measure(ExportRun.PHASE_VERIFY):
+                comparison = font.compare_file_system(
+                    manifest=manifest,
+                    export_digests=export_digests,
+                    glifs_querysets=compared_glifs_querysets,
+                )
+            comparison_errors = font._get_file_system_comparison_errors(comparison)
+            if comparison_errors:
+                error_message = "\n".join(comparison_errors)
+                if full_export:
+                    logger.error(error_message)
+                    raise VerificationError(error_message)
+                logger.warning(error_message)
+                return self.save_to_file_system(full_export=True)
+
+        # the manifest (only files of existing glifs), the glifs export digests
+        # and the changes journal cursor for the next incremental export
+        # are stored only when the exported files have been committed
+        font.export_state = {
+            "manifest": manifest,
+            # the glifs paths are known only if the whole font has been compared
+            "glifs_paths": comparison["expected"] if full_export else None,
+            "export_digests": export_digests,
+            "changes_cursor": changes_last_id,
+        }
+        if not getattr(font, "export_state_deferred", False):
+            # not exported by the project, there is nothing to commit
+            font.save_export_state()
+
+    def save_export_state(self):
+        """
+        Store the state of the last export (set by save_to_file_system),
+        if the project is exported it must be called only after the exported files
+        have been committed, because a failed export restores the previous files.
+        """
+        export_state = getattr(self, "export_state", None)
+        if export_state is None:
+            return
+        self.export_state = None
+        per_page = settings.ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT
+        for glif_model, glifs_digests in export_state["export_digests"].items():
+            glifs_list = [
+                glif_model(pk=glif_pk, export_digest=glif_digest)
+                for glif_pk, glif_digest in glifs_digests.items()
+            ]
+            # bulk_update doesn't change updated_at
+            glif_model.objects.bulk_update(
+                glifs_list, ["export_digest"], batch_size=per_page
+            )
+        self.save_manifest(export_state["manifest"], export_state["glifs_paths"])
+        changes_cursor = export_state["changes_cursor"]
+        self.export_changes_cursor = changes_cursor
+        Font.objects.filter(pk=self.pk).update(export_changes_cursor=changes_cursor)
+
+    def _save_glifs_to_file_system(
+        self,
+        glifs_querysets,
+        manifest,
+        export_digests,
+        files_sizes=None,
+        glifs_count=None,
+    ):
+        """
+        Save the glifs of the given querysets to the file-system,
+        if files_sizes is passed, files not changed since the last export are not written.
+        Manifest entries and export_digests (changed glifs digests by model and pk)
+        are updated accordingly, the glifs export digests are stored by save_export_state.
+        Returns a tuple (written count, skipped count).
+        """
+        font = self
+        font_name = font.full_name
+        font_path = font.path()
+        export_run = font.get_export_run()
+
+        per_page = settings.ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT
+        format_in_workers = settings.ROBOCJK_EXPORT_FORMAT_IN_WORKERS
+        chunksize = max(1, settings.ROBOCJK_EXPORT_WORKERS_CHUNKSIZE)
+        num_processes = max(1, (multiprocessing.cpu_count() - 1))
+
+        glifs_progress = 0
+        glifs_progress_perc = 0
+        glifs_written_count = 0
+        glifs_skipped_count = 0
+
         with multiprocessing.Pool(processes=num_processes) as pool:
-            for glifs_paginator in glifs_paginators:
-                for glifs_page in glifs_paginator:
-                    glifs_list = glifs_page.object_list
-                    glifs_data = (
-                        (glif.path(), glif.data_formatted) for glif in glifs_list
-                    )
-                    glifs_files_written_on_disk = pool.map(
-                        save_glif_to_file_system, glifs_data
+            for glifs_queryset in glifs_querysets:
+                # keyset pagination, each page costs the same regardless of its position
+                for glifs_list in export_run.measure_iter(
+                    ExportRun.PHASE_DB_READ,
+                    iter_queryset_pages(glifs_queryset, per_page),
+                ):
+                    # keep the export locks alive while exporting
+                    refresh_locks()
+                    glifs_data = []
+                    glifs_paths_by_pk = {}
+                    for glif in glifs_list:
+                        glif_path = glif.path()
+                        glifs_paths_by_pk[glif.pk] = glif_path
+                        glif_file_size = (
+                            files_sizes.get(glif_path) if files_sizes else None
+                        )
+                        glifs_data.append(
+                            (
+                                glif.pk,
+                                glif_path,
+                                glif.data,
+                                # send raw data to workers, they format and write it
+                                glif.formatted_data_cached
+                                if format_in_workers
+                                else glif.data_formatted,
+                                glif_file_size,
+                            )
+                        )
+                    # results are consumed as soon as each chunk is done
+                    glifs_results = pool.imap_unordered(
+                        format_and_save_glif_to_file_system,
+                        glifs_data,
+                        chunksize=chunksize,
                     )
-                    if not all(glifs_files_written_on_disk):
-                        logger.exception("Some files were not written to disk.")
+                    glifs_by_pk = {glif.pk: glif for glif in glifs_list}
+                    glifs_digests = export_digests.setdefault(glifs_queryset.model, {})
+                    for (
+                        glif_pk,
+                        glif_digest,
+                        glif_size,
+                        glif_written,
+                        glif_format_duration,
+                        glif_write_duration,
+                    ) in glifs_results:
+                        glif_path = glifs_paths_by_pk[glif_pk]
+                        export_run.add_duration(
+                            ExportRun.PHASE_FORMAT, glif_format_duration
+                        )
+                        export_run.add_duration(
+                            ExportRun.PHASE_WRITE, glif_write_duration
+                        )
+                        if glif_written:
+                            glifs_written_count += 1
+                            export_run.bytes_written += glif_size
+                            font.track_changed_paths([glif_path])
+                        else:
+                            glifs_skipped_count += 1
+                        glif_manifest_key = os.path.relpath(glif_path, font_path)
+                        manifest[glif_manifest_key] = [glif_size, glif_digest]
+                        if glifs_by_pk[glif_pk].export_digest != glif_digest:
+                            glifs_digests[glif_pk] = glif_digest
 
                     glifs_progress += len(glifs_list)
+                    if glifs_count is None:
+                        continue
                     glifs_progress_perc = (
                         int(round((glifs_progress / glifs_count) * 100))
                         if glifs_count > 0
@@ -516,41 +1010,12 @@ class Font(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
                         f"{glifs_progress} of {glifs_count} total glifs - {glifs_progress_perc}%"
                     )
 
-        try:
-            self.verify_file_system()
-        except VerificationError as verification_error:
-            # try to cleanup file-system, may be there is only some zombie file
-            cleaned = self.cleanup_file_system()
-            if cleaned:
-                # some zombie file has been deleted, retry to verify
-                try:
-                    self.verify_file_system()
-                except VerificationError as verification_error_despite_cleanup:
-                    # there are still some verification errors.
-                    # if this is already a full export let's raise the exception,
-                    # otherwise let's run a full export to fix the problem
-                    if full_export:
-                        raise verification_error_despite_cleanup
-                    self.save_to_file_system(full_export=True)
-            else:
-                # nothing has been cleaned up.
-                # if this is already a full export let's raise the exception,
-                # otherwise let's run a full export to fix the problem
-                if full_export:
-                    raise verification_error
-                self.save_to_file_system(full_export=True)
+        export_run.glifs_written_count += glifs_written_count
+        export_run.glifs_skipped_count += glifs_skipped_count
+        return (glifs_written_count, glifs_skipped_count)
 
-    def cleanup_file_system(self):
+    def _get_glifs_querysets(self):
         font = self
-        font_name = font.full_name
-        font_path = font.path()
-
-        logger.info(
-            f"Cleanup font {font_name!r} - "
-            "comparing .glif objects in database with .glif files on file-system "
-            "for checking potential missing and/or zombie files."
-        )
-
         glif_related = [
             "font",
             "font__project",
@@ -560,66 +1025,217 @@ class Font(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
             "glif__font",
             "glif__font__project",
         ]
+        return [
+            CharacterGlyph.objects.select_related(*glif_related).filter(font=font),
+            CharacterGlyphLayer.objects.select_related(*glif_layer_related).filter(
+                glif__font=font
+            ),
+            DeepComponent.objects.select_related(*glif_related).filter(font=font),
+            AtomicElement.objects.select_related(*glif_related).filter(font=font),
+            AtomicElementLayer.objects.select_related(*glif_layer_related).filter(
+                glif__font=font
+            ),
+        ]
 
-        character_glyphs_qs = (
-            CharacterGlyph.objects.select_related(*glif_related)
-            .defer("data")
-            .filter(font=font)
-        )
-        character_glyphs_layers_qs = (
-            CharacterGlyphLayer.objects.select_related(*glif_layer_related)
-            .defer("data")
-            .filter(glif__font=font)
-        )
-        deep_components_qs = (
-            DeepComponent.objects.select_related(*glif_related)
-            .defer("data")
-            .filter(font=font)
-        )
-        atomic_elements_qs = (
-            AtomicElement.objects.select_related(*glif_related)
-            .defer("data")
-            .filter(font=font)
-        )
-        atomic_elements_layers_qs = (
-            AtomicElementLayer.objects.select_related(*glif_layer_related)
-            .defer("data")
-            .filter(glif__font=font)
-        )
+    def load_manifest(self):
+        """
+        Load the manifest written by the last export, it contains
+        the size and the digest of each .glif file, keyed by path (relative to the font path).
+        Returns None if the manifest doesn't exist.
+        """
+        manifest_path = get_font_manifest_path(self)
+        if not fsutil.is_file(manifest_path):
+            return None
+        try:
+            manifest_data = fsutil.read_file_json(manifest_path)
+            return dict(manifest_data["files"])
+        except (KeyError, TypeError, ValueError) as manifest_error:
+            logger.exception(
+                f"Invalid manifest for font '{self.full_name}': {manifest_error}"
+            )
+            return None
 
+    def save_manifest(self, manifest, glifs_paths=None):
+        """
+        Save the manifest, if glifs_paths is passed only the entries
+        of the files of existing glifs are saved.
+        """
+        if glifs_paths is not None:
+            font_path = self.path()
+            glifs_manifest_keys = {
+                os.path.relpath(glif_path, font_path) for glif_path in glifs_paths
+            }
+            manifest = {
+                key: value
+                for key, value in manifest.items()
+                if key in glifs_manifest_keys
+            }
+        manifest_data = {
+            "files": manifest,
+        }
+        manifest_path = get_font_manifest_path(self)
+        fsutil.write_file_json(manifest_path, manifest_data, separators=(",", ":"))
+
+    def compare_file_system(
+        self,
+        manifest=None,
+        export_digests=None,
+        glifs_querysets=None,
+        hash_files=False,
+    ):
+        """
+        Compare the glifs in the database with the .glif files on file-system
+        and, if passed, with the manifest written by the last export,
+        export_digests (by model and pk) override the glifs export digests not stored yet.
+        If glifs_querysets is passed only their glifs are compared (zombie files are not searched),
+        otherwise all the font glifs are compared walking the file-system once.
+        If hash_files is True, files contents are hashed and compared with the glifs export digests.
+        Returns a dict containing the sets of missing, zombie and mismatching files paths
+        and the expected glifs (model, pk) keyed by file path.
+        """
+        font = self
+        font_path = font.path()
+
+        files_sizes = None
+        if glifs_querysets is None:
+            glifs_querysets = font._get_glifs_querysets()
+            files_sizes = {
+                filepath: size
+                for filepath, size in get_files_sizes(
+                    get_character_glyphs_path(font),
+                    get_deep_components_path(font),
+                    get_atomic_elements_path(font),
+                ).items()
+                if filepath.endswith(".glif")
+            }
+
+        per_page = settings.ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT
+        expected = {}
+        existing = set()
+        mismatching = set()
+        for glifs_queryset in glifs_querysets:
+            glifs_queryset = glifs_queryset.defer("data", "formatted_data")
+            glifs_digests = (export_digests or {}).get(glifs_queryset.model, {})
+            for glifs_list in iter_queryset_pages(glifs_queryset, per_page):
+                refresh_locks()
+                for glif in glifs_list:
+                    glif_path = glif.path()
+                    expected[glif_path] = (glifs_queryset.model, glif.pk)
+                    glif_file_size = (
+                        files_sizes.get(glif_path)
+                        if files_sizes is not None
+                        else get_file_size(glif_path)
+                    )
+                    if glif_file_size is None:
+                        continue
+                    existing.add(glif_path)
+                    glif_export_digest = glifs_digests.get(glif.pk, glif.export_digest)
+                    if hash_files and get_file_digest(glif_path) != glif_export_digest:
+                        mismatching.add(glif_path)
+                        continue
+                    if manifest is None:
+                        continue
+                    glif_manifest_key = os.path.relpath(glif_path, font_path)
+                    glif_manifest_entry = manifest.get(glif_manifest_key)
+                    if glif_manifest_entry != [glif_file_size, glif_export_digest]:
+                        mismatching.add(glif_path)
+
+        files_paths = set(files_sizes.keys()) if files_sizes is not None else existing
+        expected_paths = set(expected.keys())
+        return {
+            "expected": expected,
+            "missing": expected_paths - files_paths,
+            "zombie": files_paths - expected_paths,
+            "mismatching": mismatching,
+        }
+
+    def _get_file_system_comparison_errors(self, comparison):
+        font_name = self.full_name
+        errors = []
+        for key in ["missing", "zombie", "mismatching"]:
+            count = len(comparison[key])
+            if count:
+                errors.append(
+                    f"Verifying font {font_name!r} - "
+                    f"found {count} {key} .glif files on file-system."
+                )
+        return errors
+
+    def _remove_zombie_files(self, zombie_files_paths, manifest):
+        with self.get_export_run().measure(ExportRun.PHASE_CLEANUP):
+            self.track_changed_paths(remove_files(zombie_files_paths))
+        self._remove_manifest_entries(zombie_files_paths, manifest=manifest)
+
+    def _remove_manifest_entries(self, files_paths, manifest):
+        font_path = self.path()
+        for file_path in files_paths:
+            manifest.pop(os.path.relpath(file_path, font_path), None)
+
+    def _repair_file_system(self, comparison, manifest, export_digests):
+        font = self
+        font._remove_zombie_files(comparison["zombie"], manifest=manifest)
+        # re-write missing and mismatching files
+        expected = comparison["expected"]
+        glifs_pks_by_model = {}
+        for glif_path in comparison["missing"] | comparison["mismatching"]:
+            glif_model, glif_pk = expected[glif_path]
+            glifs_pks_by_model.setdefault(glif_model, []).append(glif_pk)
         glifs_querysets = [
-            character_glyphs_qs,
-            character_glyphs_layers_qs,
-            deep_components_qs,
-            atomic_elements_qs,
-            atomic_elements_layers_qs,
+            glifs_queryset.filter(pk__in=glifs_pks_by_model[glifs_queryset.model])
+            for glifs_queryset in font._get_glifs_querysets()
+            if glifs_queryset.model in glifs_pks_by_model
         ]
+        font._save_glifs_to_file_system(
+            glifs_querysets, manifest=manifest, export_digests=export_digests
+        )
 
-        glifs_pagination_limit = settings.ROBOCJK_EXPORT_QUERIES_PAGINATION_LIMIT
-        glifs_paginators = [
-            Paginator(glifs_queryset, glifs_pagination_limit)
-            for glifs_queryset in glifs_querysets
-        ]
+    def track_changed_paths(self, paths):
+        """
+        Keep track of the files written/removed during the export
+        if changed_paths has been set to a set, None means not tracked or unknown.
+        """
+        if getattr(self, "changed_paths", None) is None:
+            return
+        if paths is None:
+            self.changed_paths = None
+            return
+        self.changed_paths.update(paths)
 
-        glifs_files_found = set(fsutil.search_files(font_path, "**/*.glif"))
-        glifs_files_expected = set()
+    def delete_deleted_glifs_files(self, deleted_after):
+        """
+        Remove the files of the font glifs deleted after the given datetime.
+        """
+        deleted_glifs_filepaths = (
+            self.deleted_glifs.filter(deleted_at__gt=deleted_after)
+            .exclude(filepath="")
+            .values_list("filepath", flat=True)
+            .distinct()
+        )
+        removed_filepaths = remove_files(deleted_glifs_filepaths)
+        self.track_changed_paths(removed_filepaths)
+        return len(removed_filepaths)
+
+    def cleanup_file_system(self):
+        font = self
+        font_name = font.full_name
+
+        logger.info(
+            f"Cleanup font {font_name!r} - "
+            "comparing .glif objects in database with .glif files on file-system "
+            "for checking potential missing and/or zombie files."
+        )
 
-        for glifs_paginator in glifs_paginators:
-            for glifs_page in glifs_paginator:
-                glifs_list = glifs_page.object_list
-                glifs_data = (glif.path() for glif in glifs_list)
-                glifs_files_expected.update(glifs_data)
+        comparison = font.compare_file_system()
 
-        if not glifs_files_expected:
+        if not comparison["expected"]:
             logger.warning(
                 f"Cleanup font {font_name!r} - " "expected glifs files set is empty."
             )
             return False
 
-        zombie_glifs_files = glifs_files_found - glifs_files_expected
+        zombie_glifs_files = comparison["zombie"]
         if zombie_glifs_files:
-            zombie_glifs_files_count = len(zombie_glifs_files)
-            fsutil.remove_files(*zombie_glifs_files)
+            zombie_glifs_files_count = len(remove_files(zombie_glifs_files))
             logger.error(
                 f"Cleanup font {font_name!r} - "
                 f"removed {zombie_glifs_files_count} zombie glifs files from file system."
@@ -634,143 +1250,21 @@ class Font(UIDModel, HashidModel, NameSlugModel, TimestampModel, ExportModel):
 
         logger.info(f"Verifying font {font_name!r}.")
 
-        glif_related = [
-            "font",
-            "font__project",
-        ]
-        glif_layer_related = [
-            "glif",
-            "glif__font",
-            "glif__font__project",
-        ]
-
-        character_glyphs_qs = (
-            CharacterGlyph.objects.select_related(*glif_related)
-            .defer("data")
-            .filter(font=font)
+        # the whole font is compared and files contents are hashed
+        comparison = font.compare_file_system(
+            manifest=font.load_manifest(), hash_files=True
         )
-        character_glyphs_layers_qs = (
-            CharacterGlyphLayer.objects.select_related(*glif_layer_related)
-            .defer("data")
-            .filter(glif__font=font)
-        )
-        deep_components_qs = (
-            DeepComponent.objects.select_related(*glif_related)
-            .defer("data")
-            .filter(font=font)
-        )
-        atomic_elements_qs = (
-            AtomicElement.objects.select_related(*glif_related)
-            .defer("data")
-            .filter(font=font)
-        )
-        atomic_elements_layers_qs = (
-            AtomicElementLayer.objects.select_related(*glif_layer_related)
-            .defer("data")
-            .filter(glif__font=font)
-        )
-
-        character_glyphs_count = character_glyphs_qs.count()
-        character_glyphs_layers_count = character_glyphs_layers_qs.count()
-        deep_components_count = deep_components_qs.count()
-        atomic_elements_count = atomic_elements_qs.count()
-        atomic_elements_layers_count = atomic_elements_layers_qs.count()
-
-        def count_glif_files(dirpath):
-            return (
-                len(fsutil.search_files(dirpath, "*.glif"))
-                if fsutil.is_dir(dirpath)
-                else 0
-            )
-
-        def count_glif_layers_files(dirpath):
-            layers_dirs = fsutil.list_dirs(dirpath) if fsutil.is_dir(dirpath) else []
-            return sum(count_glif_files(layer_dir) for layer_dir in layers_dirs)
-
-        character_glyphs_path = get_character_glyphs_path(font)
-        deep_components_path = get_deep_components_path(font)
-        atomic_elements_path = get_atomic_elements_path(font)
-
-        character_glyphs_files_count = count_glif_files(character_glyphs_path)
-        character_glyphs_layers_files_count = count_glif_layers_files(
-            character_glyphs_path
-        )
-        deep_components_files_count = count_glif_files(deep_components_path)
-        atomic_elements_files_count = count_glif_files(atomic_elements_path)
-        atomic_elements_layers_files_count = count_glif_layers_files(
-            atomic_elements_path
-        )
-
-        def verify_glifs_count(
-            glifs_type_name, glifs_files_count, glifs_expected_count
-        ):
-            success = False
-            message = (
-                f"Verifying font {font_name!r} - expected {glifs_expected_count}, "
-                f"found {glifs_files_count} {glifs_type_name} .glif files on file-system."
-            )
-            if glifs_files_count == glifs_expected_count:
-                success = True
-            else:
-                # some files have been created/deleted in the mean time or zombie files?!
-                glifs_files_delta_tolerance = 50
-                glifs_files_delta = abs(glifs_expected_count - glifs_files_count)
-                if (
-                    glifs_files_delta < glifs_files_delta_tolerance
-                    or not glifs_expected_count
-                ):
-                    success = True
-                    message = (
-                        f"{message} "
-                        "Probably some files have been created/deleted in the meanwhile, "
-                        "don't treat it as an error."
-                    )
-            return {
-                "success": success,
-                "message": message,
-            }
-
-        results = [
-            verify_glifs_count(
-                "character glyphs",
-                character_glyphs_files_count,
-                character_glyphs_count,
-            ),
-            verify_glifs_count(
-                "character glyphs layers",
-                character_glyphs_layers_files_count,
-                character_glyphs_layers_count,
-            ),
-            verify_glifs_count(
-                "deep components",
-                deep_components_files_count,
-                deep_components_count,
-            ),
-            verify_glifs_count(
-                "atomic elements",
-                atomic_elements_files_count,
-                atomic_elements_count,
-            ),
-            verify_glifs_count(
-                "atomic elements layers",
-                atomic_elements_layers_files_count,
-                atomic_elements_layers_count,
-            ),
-        ]
-
-        info_messages = [result["message"] for result in results if result["success"]]
-        if info_messages:
-            info_message = "\n".join(info_messages)
-            logger.info(info_message)
-
-        error_messages = [
-            result["message"] for result in results if not result["success"]
-        ]
+        error_messages = font._get_file_system_comparison_errors(comparison)
         if error_messages:
             error_message = "\n".join(error_messages)
             logger.error(error_message)
             raise VerificationError(error_message)
 
+        logger.info(
+            f"Verifying font {font_name!r} - "
+            f"found all {len(comparison['expected'])} expected .glif files on file-system."
+        )
+
     def updated_by_users(self, since=None, minutes=None, hours=None, days=None):
         """
         Get the list of users that have updated the font or any object that belongs to it.
@@ -864,70 +1358,291 @@ class FontImport(TimestampModel):
         on_delete=models.CASCADE,
         verbose_name=_("Font"),
     )
-
-    file = models.FileField(
-        upload_to="fonts/imports",
-        validators=[FileExtensionValidator(allowed_extensions=("zip",))],
-        verbose_name=_("File"),
-        help_text=_(".zip file containing .rcjk font project."),
+
+    file = models.FileField(
+        upload_to="fonts/imports",
+        validators=[FileExtensionValidator(allowed_extensions=("zip",))],
+        verbose_name=_("File"),
+        help_text=_(".zip file containing .rcjk font project."),
+    )
+
+    logs = models.TextField(
+        blank=True,
+        verbose_name=_("Logs"),
+    )
+
+    @property
+    def filename(self):
+        return fsutil.get_filename(self.file.path)
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_WAITING,
+        db_index=True,
+        verbose_name=_("Status"),
+    )
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = _("Font Import")
+        verbose_name_plural = _("Fonts Imports")
+
+    def __str__(self):
+        return force_str(f"Font Import [{self.status}]: {self.filename}")
+
+
+class GlyphsComposition(TimestampModel):
+    """
+    The Glyphs Composition model.
+    """
+
+    class Meta:
+        app_label = "robocjk"
+        verbose_name = _("Glyphs Composition")
+        verbose_name_plural = _("Glyphs Composition")
+
+    font = models.OneToOneField(
+        "robocjk.Font",
+        null=True,
+        on_delete=models.CASCADE,
+        related_name="glyphs_composition",
+        verbose_name=_("Font"),
+    )
+
+    data = models.JSONField(
+        blank=True,
+        null=True,
+        default=dict,
+        verbose_name=_("Data"),
+    )
+
+    def serialize(self, options=None):
+        return self.data or {}
+
+    def __str__(self):
+        return force_str(f"{self.font.name} / Glyphs Composition")
+
+
+class ExportRun(models.Model):
+    """
+    The Export Run model, it records the outcome of each project/font export,
+    the duration (in seconds) of each phase, the glifs counts and the bytes written.
+    """
+
+    OUTCOME_RUNNING = "running"
+    OUTCOME_SUCCESS = "success"
+    OUTCOME_FAILURE = "failure"
+    OUTCOME_CHOICES = (
+        (OUTCOME_RUNNING, _("Running")),
+        (OUTCOME_SUCCESS, _("Success")),
+        (OUTCOME_FAILURE, _("Failure")),
+    )
+
+    PHASE_DB_READ = "db_read"
+    PHASE_FORMAT = "format"
+    PHASE_WRITE = "write"
+    PHASE_VERIFY = "verify"
+    PHASE_CLEANUP = "cleanup"
+    PHASE_GIT = "git"
+    PHASES = (
+        PHASE_DB_READ,
+        PHASE_FORMAT,
+        PHASE_WRITE,
+        PHASE_VERIFY,
+        PHASE_CLEANUP,
+        PHASE_GIT,
+    )
+
+    class Meta:
+        app_label = "robocjk"
+        ordering = ["-id"]
+        indexes = [
+            models.Index(fields=["project", "id"]),
+        ]
+        verbose_name = _("Export Run")
+        verbose_name_plural = _("Export Runs")
+
+    project = models.ForeignKey(
+        "robocjk.Project",
+        on_delete=models.CASCADE,
+        related_name="export_runs",
+        verbose_name=_("Project"),
+    )
+    font = models.ForeignKey(
+        "robocjk.Font",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="export_runs",
+        verbose_name=_("Font"),
+        help_text=_("(empty for project export runs)"),
+    )
+    full_export = models.BooleanField(
+        default=False,
+        verbose_name=_("Full export"),
     )
-
-    logs = models.TextField(
+    started_at = models.DateTimeField(
+        default=dt.datetime.now,
+        verbose_name=_("Started at"),
+    )
+    completed_at = models.DateTimeField(
+        null=True,
         blank=True,
-        verbose_name=_("Logs"),
+        verbose_name=_("Completed at"),
     )
-
-    @property
-    def filename(self):
-        return fsutil.get_filename(self.file.path)
-
-    status = models.CharField(
+    outcome = models.CharField(
         max_length=20,
-        choices=STATUS_CHOICES,
-        default=STATUS_WAITING,
+        choices=OUTCOME_CHOICES,
+        default=OUTCOME_RUNNING,
         db_index=True,
-        verbose_name=_("Status"),
+        verbose_name=_("Outcome"),
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name=_("Error"),
+    )
+    db_read_duration = models.FloatField(
+        default=0,
+        verbose_name=_("DB read duration"),
+    )
+    format_duration = models.FloatField(
+        default=0,
+        verbose_name=_("Format duration"),
+        help_text=_("(sum of the workers formatting time)"),
+    )
+    write_duration = models.FloatField(
+        default=0,
+        verbose_name=_("Write duration"),
+        help_text=_("(sum of the workers writing time)"),
+    )
+    verify_duration = models.FloatField(
+        default=0,
+        verbose_name=_("Verify duration"),
+    )
+    cleanup_duration = models.FloatField(
+        default=0,
+        verbose_name=_("Cleanup duration"),
+    )
+    git_duration = models.FloatField(
+        default=0,
+        verbose_name=_("Git duration"),
+    )
+    character_glyphs_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Character Glyphs count"),
+    )
+    character_glyphs_layers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Character Glyphs Layers count"),
+    )
+    deep_components_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Deep Components count"),
+    )
+    atomic_elements_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Atomic Elements count"),
+    )
+    atomic_elements_layers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Atomic Elements Layers count"),
+    )
+    glifs_written_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Glifs written count"),
+    )
+    glifs_skipped_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Glifs skipped count"),
+        help_text=_("(unchanged glifs files not written)"),
+    )
+    bytes_written = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_("Bytes written"),
     )
 
-    class Meta:
-        ordering = ["-created_at"]
-        verbose_name = _("Font Import")
-        verbose_name_plural = _("Fonts Imports")
+    @property
+    def duration(self):
+        if not self.completed_at:
+            return None
+        return (self.completed_at - self.started_at).total_seconds()
+
+    def add_duration(self, phase, seconds):
+        field_name = f"{phase}_duration"
+        setattr(self, field_name, getattr(self, field_name) + seconds)
+
+    @contextmanager
+    def measure(self, phase):
+        """
+        Add the time spent in the with block to the given phase duration.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_duration(phase, time.perf_counter() - start)
+
+    def measure_iter(self, phase, iterable):
+        """
+        Iterate over the iterable adding the time spent
+        producing each item to the given phase duration.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.add_duration(phase, time.perf_counter() - start)
+            yield item
+
+    def complete(self, error=None):
+        self.completed_at = dt.datetime.now()
+        self.outcome = self.OUTCOME_FAILURE if error else self.OUTCOME_SUCCESS
+        self.error = error or ""
+        if self.pk:
+            self.save()
 
     def __str__(self):
-        return force_str(f"Font Import [{self.status}]: {self.filename}")
+        target = self.font.full_name if self.font_id else self.project.name
+        return force_str(f"Export Run [{self.outcome}]: {target}")
 
 
-class GlyphsComposition(TimestampModel):
+class Lock(models.Model):
     """
-    The Glyphs Composition model.
+    The Lock model, each row is a lock held by its owner (host:pid:thread),
+    used by robocjk.locks only with databases without advisory locks support.
     """
 
     class Meta:
         app_label = "robocjk"
-        verbose_name = _("Glyphs Composition")
-        verbose_name_plural = _("Glyphs Composition")
+        verbose_name = _("Lock")
+        verbose_name_plural = _("Locks")
 
-    font = models.OneToOneField(
-        "robocjk.Font",
-        null=True,
-        on_delete=models.CASCADE,
-        related_name="glyphs_composition",
-        verbose_name=_("Font"),
+    name = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name=_("Name"),
     )
-
-    data = models.JSONField(
-        blank=True,
-        null=True,
-        default=dict,
-        verbose_name=_("Data"),
+    owner = models.CharField(
+        max_length=150,
+        verbose_name=_("Owner"),
+    )
+    acquired_at = models.DateTimeField(
+        default=dt.datetime.now,
+        verbose_name=_("Acquired at"),
+    )
+    heartbeat_at = models.DateTimeField(
+        default=dt.datetime.now,
+        verbose_name=_("Heartbeat at"),
+        help_text=_("(refreshed periodically by the owner while holding the lock)"),
     )
-
-    def serialize(self, options=None):
-        return self.data or {}
 
     def __str__(self):
-        return force_str(f"{self.font.name} / Glyphs Composition")
+        return force_str(f"Lock: {self.name} [{self.owner}]")
 
 
 class LockableModel(models.Model):
@@ -983,6 +1698,7 @@ class LockableModel(models.Model):
                     locked_by=self.locked_by,
                     locked_at=self.locked_at,
                 )
+                Font.update_glifs_version(self.font_id)
             return True
         return False
 
@@ -1018,6 +1734,7 @@ class LockableModel(models.Model):
                         locked_by=self.locked_by,
                         locked_at=self.locked_at,
                     )
+                    Font.update_glifs_version(self.font_id)
                 return True
             return False
         return True
@@ -1128,10 +1845,45 @@ class StatusModel(models.Model):
         verbose_name=_("Status downgraded at"),
     )
 
+    status_with_variations = models.JSONField(
+        blank=True,
+        null=True,
+        default=None,
+        verbose_name=_("Status with variations"),
+        help_text=_("(autodetected from xml data)"),
+    )
+
     @property
     def status_color(self):
         return StatusModel.STATUS_COLORS.get(self.status, "#000000")
 
+    # source names are used in lookups, "__" would be parsed as a lookup separator
+    SOURCE_NAME_RE = re.compile(r"^(?!.*__)[A-Za-z0-9_-]+$")
+
+    @staticmethod
+    def get_source_status_filters(source_name=None, status=None, done=None):
+        """
+        Get the query filters for the status of a source (variation),
+        the default source is used if source_name is empty.
+        Status is the source status index (0-4), done is a shortcut
+        for selecting done (status 4) or not done (status < 4) sources.
+        Raises ValueError if source_name is not valid.
+        """
+        if source_name and not StatusModel.SOURCE_NAME_RE.match(source_name):
+            raise ValueError(f"Invalid source name: '{source_name}'")
+        key = f"status_{source_name}" if source_name else "status"
+        lookup = f"status_with_variations__{key}"
+        filters = {}
+        if status is not None:
+            filters[lookup] = status
+        if done is not None:
+            done_status = len(StatusModel.STATUS_CHOICES_VALUES_LIST) - 1
+            if done:
+                filters[lookup] = done_status
+            else:
+                filters[f"{lookup}__lt"] = done_status
+        return filters
+
     @staticmethod
     def get_status_from_data(data):
         status = None
@@ -1166,23 +1918,68 @@ class GlifDataModel(models.Model):
         verbose_name=_("Deleted"),
     )
 
-    data = models.TextField(
+    data = CompressedTextField(
         verbose_name=_("Data"),
         help_text=_("(.glif xml data)"),
     )
 
     @property
     def data_formatted(self):
-        try:
-            s = format_glif(self.data)
-        except Exception as formatting_error:
-            s = self.data
-            message = "glif xml data formatting error - pk: {}, error: {}".format(
-                self.pk, formatting_error
-            )
-            # print(message)
-            logger.exception(message)
-        return s
+        return self.formatted_data_cached or format_glif_data(self.data, pk=self.pk)
+
+    export_digest = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        verbose_name=_("Export digest"),
+        help_text=_("(md5 digest of the last content written to file-system)"),
+    )
+
+    formatted_data = CompressedTextField(
+        blank=True,
+        default="",
+        verbose_name=_("Formatted data"),
+        help_text=_("(.glif xml formatted data, computed on save)"),
+    )
+
+    formatted_data_version = models.CharField(
+        max_length=50,
+        blank=True,
+        default="",
+        verbose_name=_("Formatted data version"),
+        help_text=_("(version of the formatter used to compute the formatted data)"),
+    )
+
+    formatted_data_source_digest = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        verbose_name=_("Formatted data source digest"),
+        help_text=_("(md5 digest of the data used to compute the formatted data)"),
+    )
+
+    @property
+    def formatted_data_cached(self):
+        """
+        Return the stored formatted data if it is still valid, otherwise None.
+        The data digest is compared because data can change without calling save
+        (eg. queryset update, bulk update or bulk create).
+        """
+        if self.formatted_data_valid and self.formatted_data:
+            return self.formatted_data
+        return None
+
+    @property
+    def formatted_data_valid(self):
+        """
+        Return True if the stored formatted data has been built from the current data
+        with the current formatter version, without reading the formatted data
+        (it is deferred by most querysets).
+        """
+        return (
+            self.formatted_data_version == FORMAT_GLIF_VERSION
+            and self.formatted_data_source_digest == get_data_digest(self.data)
+        )
 
     name = models.CharField(
         blank=True,
@@ -1259,6 +2056,14 @@ class GlifDataModel(models.Model):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._init_data = None
+        # status of each source stored with the current data,
+        # used to detect status changes without parsing the previous data again
+        self._init_status_with_variations = self.__dict__.get("status_with_variations")
+        # data stored in the database, used to detect data changes on save,
+        # use __dict__ to avoid loading data if it has been deferred
+        self._stored_data = self.__dict__.get("data")
+        # file path before renaming, used for recording changes
+        self._previous_path = None
 
     @property
     def unicodes_hex(self):
@@ -1290,6 +2095,7 @@ class GlifDataModel(models.Model):
         if data.filename != self.filename and self.filename:
             # the file name will change, so delete the existing glif file.
             # the renamed file will be created during the next export process.
+            self._update_previous_path()
             self.delete_from_file_system()
 
         self.data = data.xml_string
@@ -1318,44 +2124,40 @@ class GlifDataModel(models.Model):
 
         self._update_init_data()
 
-        if self.data == self._init_data:
-            # data is not changed
-            return
+        # the previous status is stored, so the status is compared
+        # without parsing the previous data again
+        status_with_variations = glif_data.status_with_variations
+        init_status_with_variations = self._get_init_status_with_variations()
+        self.status_with_variations = status_with_variations
 
-        if self._init_data:
+        if init_status_with_variations is not None:
             # it is not the first save/creation
-            init_glif_data = self._parse_data(self._init_data)
-            if init_glif_data:
-                any_status_downgraded = False
-                any_status_upgraded = False
-                if (
-                    init_glif_data.status_with_variations
-                    != glif_data.status_with_variations
-                ):
-                    # some status changed, check if any status has been downgraded
-                    for key, val in glif_data.status_with_variations.items():
-                        init_val = (
-                            init_glif_data.status_with_variations.get(key, 0) or 0
-                        )
-                        # flag as downgraded when any source changes from done to a previous status
-                        if init_val == 4 and val < init_val:
-                            any_status_downgraded = True
-                        # deflag downgraded when any source changes to done
-                        if init_val < 4 and val == 4:
-                            any_status_upgraded = True
-
-                if any_status_downgraded:
-                    if not self.status_downgraded:
-                        self.status_downgraded = True
-                        self.status_downgraded_at = dt.datetime.now()
-                elif any_status_upgraded:
-                    if self.status_downgraded:
-                        self.status_downgraded = False
-                        self.status_downgraded_at = None
+            any_status_downgraded = False
+            any_status_upgraded = False
+            if init_status_with_variations != status_with_variations:
+                # some status changed, check if any status has been downgraded
+                for key, val in status_with_variations.items():
+                    init_val = init_status_with_variations.get(key, 0) or 0
+                    # flag as downgraded when any source changes from done to a previous status
+                    if init_val == 4 and val < init_val:
+                        any_status_downgraded = True
+                    # deflag downgraded when any source changes to done
+                    if init_val < 4 and val == 4:
+                        any_status_upgraded = True
+
+            if any_status_downgraded:
+                if not self.status_downgraded:
+                    self.status_downgraded = True
+                    self.status_downgraded_at = dt.datetime.now()
+            elif any_status_upgraded:
+                if self.status_downgraded:
+                    self.status_downgraded = False
+                    self.status_downgraded_at = None
 
         # update init data to avoid to re-compute downgrade/upgrade
         # on possibile subsequent save calls on the same instance
         self._init_data = self.data
+        self._init_status_with_variations = status_with_variations
 
         # this should be removed because not useful for detecting variations downgrades
         data_status = StatusModel.get_status_from_data(glif_data)
@@ -1365,6 +2167,59 @@ class GlifDataModel(models.Model):
             self.status = data_status
             self.status_changed_at = dt.datetime.now()
 
+    def _get_init_status_with_variations(self):
+        if self._init_status_with_variations is not None:
+            return self._init_status_with_variations
+        # data stored in the database (if loaded)
+        stored_data = self._stored_data
+        if self._state.adding or not stored_data or stored_data == self.data:
+            # first save/creation or data not changed
+            return None
+        # status not stored (glif saved before it was stored), parse the stored data
+        init_glif_data = self._parse_data(stored_data)
+        if not init_glif_data:
+            return None
+        return init_glif_data.status_with_variations
+
+    def _update_previous_path(self):
+        if self._previous_path or not self.pk:
+            return
+        try:
+            self._previous_path = self.path()
+        except ObjectDoesNotExist:
+            pass
+
+    def _record_change(self, created, data_changed):
+        previous_path = self._previous_path
+        self._previous_path = None
+        if created:
+            GlifChange.record(self, GlifChange.ACTION_CREATE)
+            return
+        current_path = self.path()
+        if previous_path and previous_path != current_path:
+            GlifChange.record(self, GlifChange.ACTION_RENAME, filepath=previous_path)
+        elif data_changed:
+            GlifChange.record(self, GlifChange.ACTION_UPDATE, filepath=current_path)
+
+    def update_font_glifs_version(self):
+        # layers have not a font field, the font is the glif one
+        font_id = getattr(self, "font_id", None)
+        if font_id is None:
+            try:
+                font_id = self.glif.font_id
+            except ObjectDoesNotExist:
+                # glif already deleted (the version is updated on glif deletion)
+                return
+        Font.update_glifs_version(font_id)
+
+    def _update_formatted_data(self):
+        if self.formatted_data_valid:
+            # data and formatter version are not changed
+            return
+        self.formatted_data = format_glif_data(self.data, pk=self.pk)
+        self.formatted_data_version = FORMAT_GLIF_VERSION
+        self.formatted_data_source_digest = get_data_digest(self.data)
+
     def _update_components(self):
         if self.has_components:
             comp_managers = self.get_components_managers()
@@ -1390,17 +2245,40 @@ class GlifDataModel(models.Model):
     def update_components(self):
         self._update_components()
 
+    def _update_component_instances(self, glif_data, created):
+        if not glif_data:
+            # invalid glif data
+            return
+
+        if not isinstance(self, (CharacterGlyph, DeepComponent)):
+            # only character glyphs and deep components have components
+            return
+
+        ComponentInstance.update_glif(self, glif_data.components, created=created)
+
     def path(self):
         raise NotImplementedError
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, glif_data=None, **kwargs):
+        """
+        glif_data is the already parsed data (GlifData instance),
+        it can be passed to avoid to parse data again (eg. data parsed by an api view).
+        """
+        created = self._state.adding
         self._update_init_data()
-        glif_data = self._parse_data(self.data)
+        if glif_data is None or not glif_data.ok:
+            glif_data = self._parse_data(self.data)
         self._apply_data(glif_data)
         self._update_status(glif_data)
+        data_changed = self.data != self._stored_data
+        self._update_formatted_data()
         super().save(*args, **kwargs)
+        self._stored_data = self.data
         # update many-to-many relations after the instance has been saved
         self._update_components()
+        self._update_component_instances(glif_data, created)
+        self._record_change(created, data_changed)
+        self.update_font_glifs_version()
 
     def save_to_file_system(self):
         # this method is not actually used
@@ -1462,6 +2340,9 @@ class DeletedGlif(models.Model):
 
     class Meta:
         app_label = "robocjk"
+        indexes = [
+            models.Index(fields=["font", "deleted_at"]),
+        ]
         verbose_name = _("Deleted Glif")
         verbose_name_plural = _("Deleted Glifs")
 
@@ -1519,6 +2400,238 @@ class DeletedGlif(models.Model):
         return force_str(f"[{self.glif_type}] {self.glif_id}")
 
 
+class GlifChange(models.Model):
+    """
+    Append-only journal of glifs changes, the auto-incremented id
+    is used as monotonically increasing sequence number.
+    """
+
+    ACTION_CREATE = "create"
+    ACTION_UPDATE = "update"
+    ACTION_RENAME = "rename"
+    ACTION_DELETE = "delete"
+
+    ACTION_CHOICES = (
+        (ACTION_CREATE, _("Create")),
+        (ACTION_UPDATE, _("Update")),
+        (ACTION_RENAME, _("Rename")),
+        (ACTION_DELETE, _("Delete")),
+    )
+
+    # actions after which the glif file must be (re)written
+    ACTIONS_WRITE = (ACTION_CREATE, ACTION_UPDATE, ACTION_RENAME)
+    # actions after which the previous glif file must be removed
+    ACTIONS_REMOVE = (ACTION_RENAME, ACTION_DELETE)
+
+    @classmethod
+    def record(cls, glif, action, filepath=None):
+        glif_is_layer = isinstance(glif, (AtomicElementLayer, CharacterGlyphLayer))
+        return cls.objects.create(
+            font_id=glif.glif.font_id if glif_is_layer else glif.font_id,
+            action=action,
+            glif_type=DeletedGlif.get_glif_type_by_glif(glif),
+            glif_id=glif.id,
+            parent_glif_id=glif.glif_id if glif_is_layer else None,
+            group_name=glif.group_name if glif_is_layer else "",
+            name=glif.name,
+            filename=glif.filename,
+            filepath=filepath or glif.path(),
+        )
+
+    class Meta:
+        app_label = "robocjk"
+        indexes = [
+            models.Index(fields=["font", "id"]),
+        ]
+        verbose_name = _("Glif Change")
+        verbose_name_plural = _("Glif Changes")
+
+    id = models.BigAutoField(
+        primary_key=True,
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Created at"),
+    )
+    font = models.ForeignKey(
+        "robocjk.Font",
+        on_delete=models.CASCADE,
+        related_name="glif_changes",
+        verbose_name=_("Font"),
+    )
+    action = models.CharField(
+        max_length=10,
+        choices=ACTION_CHOICES,
+        verbose_name=_("Action"),
+    )
+    glif_type = models.CharField(
+        max_length=50,
+        choices=DeletedGlif.GLIF_TYPE_CHOICES,
+        verbose_name=_("Glif Type"),
+    )
+    glif_id = models.PositiveIntegerField(
+        verbose_name=_("Glif ID"),
+    )
+    parent_glif_id = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_("Parent Glif ID"),
+        help_text=_("(only for layers)"),
+    )
+    group_name = models.CharField(
+        blank=True,
+        max_length=50,
+        verbose_name=_("Group Name"),
+    )
+    name = models.CharField(
+        blank=True,
+        max_length=100,
+        verbose_name=_("Name"),
+    )
+    filename = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name=_("Filename"),
+    )
+    filepath = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name=_("Filepath"),
+        help_text=_("(previous file path for rename and delete actions)"),
+    )
+
+    def __str__(self):
+        return force_str(f"[{self.action}] [{self.glif_type}] {self.glif_id}")
+
+
+class ComponentInstance(models.Model):
+    """
+    Instance of a component used by a glif (item of its robocjk.deepComponents),
+    rebuilt on glif save, so components usage and coords can be queried
+    without parsing glifs xml data.
+    """
+
+    @classmethod
+    def get_glif_field_name(cls, glif):
+        if isinstance(glif, CharacterGlyph):
+            return "character_glyph"
+        elif isinstance(glif, DeepComponent):
+            return "deep_component"
+        else:
+            raise ValueError(f"Invalid glif: {glif}")
+
+    @classmethod
+    def update_glif(cls, glif, components, created=False):
+        """
+        Replace the component instances of the glif with the given ones
+        (list of dicts, as returned by GlifData.components).
+        """
+        glif_field_name = cls.get_glif_field_name(glif)
+        if not created:
+            cls.objects.filter(**{glif_field_name: glif}).delete()
+        if not components:
+            return
+        cls.objects.bulk_create(
+            [
+                cls(
+                    font_id=glif.font_id,
+                    index=index,
+                    **{glif_field_name: glif},
+                    **component,
+                )
+                for index, component in enumerate(components)
+            ]
+        )
+
+    class Meta:
+        app_label = "robocjk"
+        indexes = [
+            models.Index(fields=["font", "name"]),
+        ]
+        ordering = ["index"]
+        verbose_name = _("Component Instance")
+        verbose_name_plural = _("Component Instances")
+
+    font = models.ForeignKey(
+        "robocjk.Font",
+        on_delete=models.CASCADE,
+        related_name="component_instances",
+        verbose_name=_("Font"),
+    )
+    character_glyph = models.ForeignKey(
+        "robocjk.CharacterGlyph",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="component_instances",
+        verbose_name=_("Character Glyph"),
+    )
+    deep_component = models.ForeignKey(
+        "robocjk.DeepComponent",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="component_instances",
+        verbose_name=_("Deep Component"),
+    )
+    index = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Index"),
+        help_text=_("(position in the glif components list)"),
+    )
+    name = models.CharField(
+        blank=True,
+        max_length=100,
+        verbose_name=_("Name"),
+        help_text=_("(name of the component glif)"),
+    )
+    coord = models.JSONField(
+        blank=True,
+        default=dict,
+        verbose_name=_("Coord"),
+        help_text=_("(axes values)"),
+    )
+    x = models.FloatField(
+        default=0.0,
+        verbose_name=_("X"),
+    )
+    y = models.FloatField(
+        default=0.0,
+        verbose_name=_("Y"),
+    )
+    scale_x = models.FloatField(
+        default=1.0,
+        verbose_name=_("Scale X"),
+    )
+    scale_y = models.FloatField(
+        default=1.0,
+        verbose_name=_("Scale Y"),
+    )
+    rotation = models.FloatField(
+        default=0.0,
+        verbose_name=_("Rotation"),
+    )
+    rcenter_x = models.FloatField(
+        default=0.0,
+        verbose_name=_("Rotation center X"),
+    )
+    rcenter_y = models.FloatField(
+        default=0.0,
+        verbose_name=_("Rotation center Y"),
+    )
+    tcenter_x = models.FloatField(
+        default=0.0,
+        verbose_name=_("Transformation center X"),
+    )
+    tcenter_y = models.FloatField(
+        default=0.0,
+        verbose_name=_("Transformation center Y"),
+    )
+
+    def __str__(self):
+        return force_str(f"{self.name} [{self.index}]")
+
+
 class CharacterGlyph(GlifDataModel, StatusModel, LockableModel, TimestampModel):
     class Meta:
         app_label = "robocjk"
@@ -1578,7 +2691,7 @@ class CharacterGlyph(GlifDataModel, StatusModel, LockableModel, TimestampModel):
     def serialize(self, options=None):
         return serialize_character_glyph(self, options)
 
-    def update_layers_updated_at(self):
+    def update_layers_updated_at(self, update_font_glifs_version=True):
         layers_updated_at_max = self.layers.aggregate(Max("updated_at"))[
             "updated_at__max"
         ]
@@ -1601,6 +2714,11 @@ class CharacterGlyph(GlifDataModel, StatusModel, LockableModel, TimestampModel):
         cls = self.__class__
         cls.objects.filter(pk=self.pk).update(layers_updated_at=layers_updated_at)
 
+        # the layer save/delete updates the font glifs version before this update,
+        # update it again, so glif lists cached meanwhile are invalidated
+        if update_font_glifs_version:
+            Font.update_glifs_version(self.font_id)
+
     def __str__(self):
         return force_str(f"{self.name}")
 
@@ -1640,6 +2758,7 @@ class CharacterGlyphLayer(GlifDataModel, TimestampModel):
     def rename(self, new_group_name):
         if self.group_name == new_group_name:
             return
+        self._update_previous_path()
         self.delete_from_file_system()
         self.group_name = new_group_name
 
@@ -1731,7 +2850,7 @@ class AtomicElement(GlifDataModel, StatusModel, LockableModel, TimestampModel):
     def serialize(self, options=None):
         return serialize_atomic_element(self, options)
 
-    def update_layers_updated_at(self):
+    def update_layers_updated_at(self, update_font_glifs_version=True):
         layers_updated_at_max = self.layers.aggregate(Max("updated_at"))[
             "updated_at__max"
         ]
@@ -1754,6 +2873,11 @@ class AtomicElement(GlifDataModel, StatusModel, LockableModel, TimestampModel):
         cls = self.__class__
         cls.objects.filter(pk=self.pk).update(layers_updated_at=layers_updated_at)
 
+        # the layer save/delete updates the font glifs version before this update,
+        # update it again, so glif lists cached meanwhile are invalidated
+        if update_font_glifs_version:
+            Font.update_glifs_version(self.font_id)
+
     def __str__(self):
         return force_str(f"{self.name}")
 
@@ -1793,6 +2917,7 @@ class AtomicElementLayer(GlifDataModel, TimestampModel):
     def rename(self, new_group_name):
         if self.group_name == new_group_name:
             return
+        self._update_previous_path()
         self.delete_from_file_system()
         self.group_name = new_group_name
 
@@ -1,4 +1,20 @@
-from django.db.models.signals import post_save, pre_delete
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+
+def record_glif_delete(instance, origin=None, **kwargs):
+    from robocjk.models import Font, GlifChange, Project
+
+    # origin is the deleted instance or queryset that caused the deletion
+    origin_cls = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if issubclass(origin_cls, (Font, Project)):
+        # the font changes journal is deleted too
+        return
+    GlifChange.record(instance, GlifChange.ACTION_DELETE)
+
+
+def update_font_glifs_version(instance, **kwargs):
+    instance.update_font_glifs_version()
 
 
 def connect_signals():
@@ -24,3 +40,13 @@ def connect_signals():
     pre_delete.connect(delete_glif, sender=DeepComponent)
     pre_delete.connect(delete_glif, sender=AtomicElement)
     pre_delete.connect(delete_glif, sender=AtomicElementLayer)
+    pre_delete.connect(record_glif_delete, sender=CharacterGlyph)
+    pre_delete.connect(record_glif_delete, sender=CharacterGlyphLayer)
+    pre_delete.connect(record_glif_delete, sender=DeepComponent)
+    pre_delete.connect(record_glif_delete, sender=AtomicElement)
+    pre_delete.connect(record_glif_delete, sender=AtomicElementLayer)
+    post_delete.connect(update_font_glifs_version, sender=CharacterGlyph)
+    post_delete.connect(update_font_glifs_version, sender=CharacterGlyphLayer)
+    post_delete.connect(update_font_glifs_version, sender=DeepComponent)
+    post_delete.connect(update_font_glifs_version, sender=AtomicElement)
+    post_delete.connect(update_font_glifs_version, sender=AtomicElementLayer)
@@ -166,6 +166,14 @@ class ClientTestCase(TestCase):
         self.assert_response_ok(response)
         self.assertEqual(response["data"], {"Glyphs-Composition-Test": "ok"})
 
+    def test_export_run_list(self):
+        response = self._client.export_run_list(
+            project_uid=self._project_uid, font_uid=self._font_uid, limit=10
+        )
+        # print(response)
+        self.assert_response_ok(response)
+        self.assertTrue(isinstance(response["data"], list))
+
     def test_font_glif_list(self):
         response = self._client.glif_list(font_uid=self._font_uid)
         # print(response)
@@ -254,6 +262,13 @@ class ClientTestCase(TestCase):
         # print(response)
         self.assert_response_ok(response)
 
+    def test_character_glyph_list_source_status(self):
+        response = self._client.character_glyph_list(
+            font_uid=self._font_uid, source_name="bold", source_status_done=False
+        )
+        # print(response)
+        self.assert_response_ok(response)
+
     def test_character_glyph_get(self):
         response = self._client.character_glyph_get(
             font_uid=self._font_uid, character_glyph_id=18627
@@ -0,0 +1,106 @@
+import fsutil
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from robocjk.api.auth import generate_auth_token
+from robocjk.models import CharacterGlyph, DeepComponent, Font, Project
+
+
+class DecoratorsTestCase(TestCase):
+    def setUp(self):
+        self._user = get_user_model().objects.create_user(
+            username="designer", password="designer"
+        )
+        self._project = Project.objects.create(name="My Font Family")
+        self._project.designers.add(self._user)
+        self._font = Font.objects.create(project=self._project, name="My Font")
+        # deep component used by the character glyph
+        self._deep_component = DeepComponent.objects.create(
+            font=self._font,
+            data=self._read_glif_data("deepComponent/D_C__2B_740_00.glif").replace(
+                'name="DC_2B740_00"', 'name="DC_4E00_00"'
+            ),
+        )
+        self._character_glyph = CharacterGlyph.objects.create(
+            font=self._font, data=self._read_glif_data("characterGlyph/uni4E_25.glif")
+        )
+        self._auth_token = generate_auth_token(data={"user_pk": self._user.pk})
+
+    def _read_glif_data(self, path):
+        return fsutil.read_file(fsutil.join_path(__file__, "../test_models_data", path))
+
+    def _get_character_glyph(self, etag=None, **params):
+        headers = {"Authorization": f"Bearer {self._auth_token}"}
+        if etag:
+            headers["If-None-Match"] = etag
+        payload = {
+            "font_uid": str(self._font.uid),
+            "id": self._character_glyph.id,
+            **params,
+        }
+        return self.client.post(
+            reverse("character_glyph_get"), payload, headers=headers, secure=True
+        )
+
+    def test_etag(self):
+        response = self._get_character_glyph()
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        # not modified
+        response = self._get_character_glyph(etag=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+        response = self._get_character_glyph(etag=f'W/{etag}, "other"')
+        self.assertEqual(response.status_code, 304)
+        # serialization options change the etag
+        response = self._get_character_glyph(etag=etag, return_layers="false")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        # modified
+        self._character_glyph.lock_by(self._user, save=True)
+        response = self._get_character_glyph(etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        etag = response["ETag"]
+        self._character_glyph.save()
+        response = self._get_character_glyph(etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_with_related_glifs(self):
+        response = self._get_character_glyph(return_made_of="true")
+        etag = response["ETag"]
+        response = self._get_character_glyph(etag=etag, return_made_of="true")
+        self.assertEqual(response.status_code, 304)
+        # related glif changes invalidate the etag
+        self._deep_component.lock_by(self._user, save=True)
+        response = self._get_character_glyph(etag=etag, return_made_of="true")
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self._deep_component.data = self._deep_component.data.replace(
+            "</glyph>", "<note>changed</note></glyph>"
+        )
+        self._deep_component.save()
+        response = self._get_character_glyph(etag=etag, return_made_of="true")
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_with_related_glifs_and_unrelated_glif_change(self):
+        response = self._get_character_glyph(return_related="true")
+        etag = response["ETag"]
+        # glifs not in the character glyph graph don't invalidate the etag
+        deep_component = DeepComponent.objects.create(
+            font=self._font,
+            data=self._read_glif_data("deepComponent/D_C__2B_740_00.glif"),
+        )
+        deep_component.lock_by(self._user, save=True)
+        response = self._get_character_glyph(etag=etag, return_related="true")
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_not_found(self):
+        self._character_glyph.id += 1000
+        response = self._get_character_glyph(etag="*")
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header("ETag"))
@@ -9,6 +9,7 @@ from robocjk.api.http import (
     ApiResponseInternalServerError,
     ApiResponseMethodNotAllowed,
     ApiResponseNotFound,
+    ApiResponseNotModified,
     ApiResponseServiceUnavailableError,
     ApiResponseSuccess,
     ApiResponseUnauthorized,
@@ -31,6 +32,12 @@ class HttpTestCase(TestCase):
         self.assertEqual(d["error"], None)
         self.assertEqual(d["data"]["message"], "Hello World")
 
+    def test_not_modified_response(self):
+        r = ApiResponseNotModified('"etag"')
+        self.assertEqual(r.status_code, 304)
+        self.assertEqual(r.content, b"")
+        self.assertEqual(r["ETag"], '"etag"')
+
     def test_bad_request_response(self):
         m = "Error message description"
         r = ApiResponseBadRequest(m)
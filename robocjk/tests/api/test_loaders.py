@@ -0,0 +1,117 @@
+from benedict import benedict
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from robocjk.api.loaders import (
+    get_glifs_graph_ids,
+    get_glifs_queryset,
+    load_glifs_graph,
+)
+from robocjk.generator import FontGenerator
+from robocjk.models import AtomicElement, CharacterGlyph, DeepComponent, Font, Project
+
+
+class LoadersTestCase(TestCase):
+    def setUp(self):
+        self._project = Project.objects.create(name="My Font Family")
+        self._font = Font.objects.create(project=self._project, name="My Font")
+        FontGenerator(
+            self._font,
+            atomic_elements_count=5,
+            deep_components_count=20,
+            character_glyphs_count=30,
+            sources_count=2,
+        ).generate()
+        # character glyphs made of character glyphs, with a circular reference
+        character_glyphs = list(self._font.character_glyphs.order_by("id")[:3])
+        character_glyphs[0].character_glyphs.add(character_glyphs[1])
+        character_glyphs[1].character_glyphs.add(character_glyphs[2])
+        character_glyphs[2].character_glyphs.add(character_glyphs[0])
+
+    def _get_options(self):
+        return benedict({"return_related": "true"})
+
+    def _get_glifs(self, glif_cls, count):
+        return list(
+            get_glifs_queryset(glif_cls).filter(font=self._font).order_by("id")[:count]
+        )
+
+    def _sorted(self, data):
+        # related objects order is not relevant
+        if isinstance(data, dict):
+            return {key: self._sorted(value) for key, value in data.items()}
+        if isinstance(data, list):
+            values = [self._sorted(value) for value in data]
+            return sorted(values, key=repr)
+        return data
+
+    def test_load_glifs_graph(self):
+        for glif_cls in [AtomicElement, DeepComponent, CharacterGlyph]:
+            glifs = self._get_glifs(glif_cls, 5)
+            load_glifs_graph(glifs, self._get_options())
+            for glif in glifs:
+                # same data serialized without loading the graph
+                expected_glif = glif_cls.objects.get(id=glif.id)
+                self.assertEqual(
+                    self._sorted(glif.serialize(options=self._get_options())),
+                    self._sorted(expected_glif.serialize(options=self._get_options())),
+                )
+
+    def test_load_glifs_graph_made_of_closure(self):
+        glif = self._get_glifs(CharacterGlyph, 1)[0]
+        load_glifs_graph([glif], self._get_options())
+        with self.assertNumQueries(0):
+            data = glif.serialize(options=self._get_options())
+        made_of_glif = glif.prefetched_character_glyphs[0]
+        self.assertEqual(
+            made_of_glif.prefetched_character_glyphs[0].prefetched_character_glyphs,
+            [glif],
+        )
+        made_of_data = [item for item in data["made_of"] if item["type_code"] == "CG"]
+        self.assertEqual(made_of_data[0]["id"], made_of_glif.id)
+
+    def test_get_glifs_graph_ids(self):
+        def get_loaded_ids(glif, related_names):
+            # ids of the glifs reachable through the prefetched relations
+            loaded_ids = {
+                glif_cls: set()
+                for glif_cls in [AtomicElement, DeepComponent, CharacterGlyph]
+            }
+            # the same glif can be loaded twice (made of and used by instances)
+            visited = set()
+            pending = [glif]
+            while pending:
+                glif = pending.pop()
+                if id(glif) in visited:
+                    continue
+                visited.add(id(glif))
+                loaded_ids[type(glif)].add(glif.id)
+                for related_name in related_names:
+                    pending.extend(getattr(glif, f"prefetched_{related_name}", []))
+            return loaded_ids
+
+        related_names = [
+            "atomic_elements",
+            "deep_components",
+            "character_glyphs",
+            "used_by_character_glyphs",
+        ]
+        for glif_cls in [AtomicElement, DeepComponent, CharacterGlyph]:
+            glif = self._get_glifs(glif_cls, 1)[0]
+            load_glifs_graph([glif], self._get_options())
+            self.assertEqual(
+                get_glifs_graph_ids({glif_cls: [glif.id]}, self._get_options()),
+                get_loaded_ids(glif, related_names),
+            )
+
+    def test_load_glifs_graph_queries_count(self):
+        def get_queries_count(count):
+            glifs = self._get_glifs(CharacterGlyph, count)
+            with CaptureQueriesContext(connection) as context:
+                load_glifs_graph(glifs, self._get_options())
+                for glif in glifs:
+                    glif.serialize(options=self._get_options())
+            return len(context.captured_queries)
+
+        self.assertEqual(get_queries_count(5), get_queries_count(30))
@@ -0,0 +1,172 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from robocjk.api.auth import generate_auth_token
+from robocjk.api.serializers import DELETED_GLIF_ID_FIELDS
+from robocjk.generator import FontGenerator
+from robocjk.models import Font, Project
+
+
+class ViewsTestCase(TestCase):
+    def setUp(self):
+        self._user = get_user_model().objects.create_user(
+            username="designer", password="designer"
+        )
+        self._project = Project.objects.create(name="My Font Family")
+        self._project.designers.add(self._user)
+        self._font = Font.objects.create(project=self._project, name="My Font")
+        FontGenerator(
+            self._font,
+            atomic_elements_count=5,
+            deep_components_count=20,
+            character_glyphs_count=30,
+            sources_count=2,
+        ).generate()
+        self._auth_token = generate_auth_token(data={"user_pk": self._user.pk})
+
+    def _post(self, view_name, **params):
+        headers = {"Authorization": f"Bearer {self._auth_token}"}
+        payload = {"font_uid": str(self._font.uid), **params}
+        response = self.client.post(
+            reverse(view_name), payload, headers=headers, secure=True
+        )
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)["data"]
+
+    def _sorted(self, data):
+        # related objects order is not relevant
+        if isinstance(data, dict):
+            return {key: self._sorted(value) for key, value in data.items()}
+        if isinstance(data, list):
+            values = [self._sorted(value) for value in data]
+            return sorted(values, key=lambda value: json.dumps(value, sort_keys=True))
+        return data
+
+    def test_glif_get_many(self):
+        glifs_names = {
+            "atomic_elements": ["stroke00000", "stroke00001"],
+            "deep_components": list(
+                self._font.deep_components.values_list("name", flat=True)[:3]
+            ),
+            "character_glyphs": ["uni4E01", "uni4E02", "uni4E03"],
+        }
+        options = {"return_related": "true"}
+        data = self._post(
+            "glif_get_many",
+            atomic_elements_names=json.dumps(glifs_names["atomic_elements"]),
+            deep_components_names=json.dumps(glifs_names["deep_components"]),
+            character_glyphs_names=json.dumps(glifs_names["character_glyphs"]),
+            **options,
+        )
+        # same data returned by the single glif get endpoints
+        for glifs_type, glif_type in [
+            ("atomic_elements", "atomic_element"),
+            ("deep_components", "deep_component"),
+            ("character_glyphs", "character_glyph"),
+        ]:
+            self.assertEqual(len(data[glifs_type]), len(glifs_names[glifs_type]))
+            for glif_data in data[glifs_type]:
+                expected_glif_data = self._post(
+                    f"{glif_type}_get", id=glif_data["id"], **options
+                )
+                self.assertEqual(
+                    self._sorted(glif_data), self._sorted(expected_glif_data)
+                )
+
+    def test_glif_get_many_queries_count(self):
+        def get_queries_count(character_glyphs_count):
+            names = list(
+                self._font.character_glyphs.order_by("id").values_list(
+                    "name", flat=True
+                )[:character_glyphs_count]
+            )
+            with CaptureQueriesContext(connection) as context:
+                data = self._post(
+                    "glif_get_many",
+                    character_glyphs_names=json.dumps(names),
+                    return_related="true",
+                )
+            self.assertEqual(len(data["character_glyphs"]), character_glyphs_count)
+            return len(context.captured_queries)
+
+        self.assertEqual(get_queries_count(2), get_queries_count(20))
+
+    @override_settings(ROBOCJK_GLIF_GET_MANY_MAX=3)
+    def test_glif_get_many_max(self):
+        headers = {"Authorization": f"Bearer {self._auth_token}"}
+        payload = {
+            "font_uid": str(self._font.uid),
+            "atomic_elements_names": json.dumps(["stroke00000", "stroke00001"]),
+            "character_glyphs_names": json.dumps(["uni4E01", "uni4E02"]),
+        }
+        response = self.client.post(
+            reverse("glif_get_many"), payload, headers=headers, secure=True
+        )
+        self.assertEqual(response.status_code, 400)
+        data = self._post(
+            "glif_get_many",
+            character_glyphs_names=json.dumps(["uni4E01", "uni4E02", "uni4E03"]),
+        )
+        self.assertEqual(len(data["character_glyphs"]), 3)
+
+    def test_glif_list_invalid_source_name(self):
+        headers = {"Authorization": f"Bearer {self._auth_token}"}
+        payload = {
+            "font_uid": str(self._font.uid),
+            "source_name": "bold__isnull",
+            "source_status": "0",
+        }
+        response = self.client.post(
+            reverse("glif_list"), payload, headers=headers, secure=True
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_glif_list_deleted_glifs(self):
+        changes_cursor = self._post("glif_list")["changes_cursor"]
+        character_glyph = self._font.character_glyphs.get(name="uni4E01")
+        character_glyph_id = character_glyph.id
+        character_glyph.delete()
+        updated_since = self._post("glif_list", updated_since="2000-01-01")
+        changes_since = self._post("glif_list", changes_since=changes_cursor)
+        self.assertEqual(updated_since["deleted_glifs"], [])
+        # the deletion of the character glyph layers is recorded too
+        self.assertEqual(len(changes_since["deleted_glifs"]), 3)
+        deleted_glif = [
+            deleted_glif
+            for deleted_glif in changes_since["deleted_glifs"]
+            if deleted_glif["glif_type"] == "character_glyph"
+        ][0]
+        self.assertEqual(set(deleted_glif.keys()), set(DELETED_GLIF_ID_FIELDS))
+        self.assertEqual(deleted_glif["glif_id"], character_glyph_id)
+        self.assertEqual(deleted_glif["name"], "uni4E01")
+
+    def test_glif_list_cache(self):
+        def get_glif_list(**params):
+            with CaptureQueriesContext(connection) as context:
+                data = self._post("glif_list", **params)
+            return data, len(context.captured_queries)
+
+        data, queries_count = get_glif_list()
+        self.assertEqual(len(data["character_glyphs"]), 30)
+        # unchanged font, data served from cache
+        cached_data, cached_queries_count = get_glif_list()
+        self.assertEqual(cached_data, data)
+        self.assertLess(cached_queries_count, queries_count)
+        # different filters, different cache entries
+        data, _ = get_glif_list(is_locked="true")
+        self.assertEqual(len(data["character_glyphs"]), 0)
+        # glif lock invalidates cached data
+        character_glyph = self._font.character_glyphs.get(name="uni4E01")
+        character_glyph.lock_by(self._user, save=True)
+        data, _ = get_glif_list(is_locked="true")
+        self.assertEqual(len(data["character_glyphs"]), 1)
+        # glif save invalidates cached data
+        character_glyph.data = character_glyph.data.replace("uni4E01", "uni4E01.alt")
+        character_glyph.save()
+        data, _ = get_glif_list(is_locked="true")
+        self.assertEqual(data["character_glyphs"][0]["name"], "uni4E01.alt")
@@ -0,0 +1,18 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from robocjk.models import Project
+
+
+class ExportRCJKTestCase(TestCase):
+    def setUp(self):
+        self._project = Project.objects.create(
+            name="My Font Family", export_enabled=False
+        )
+
+    def test_not_exported_project_is_reported(self):
+        with self.assertRaisesMessage(CommandError, "'My Font Family'"):
+            call_command("export_rcjk", project_uid=str(self._project.uid))
+        with self.assertRaisesMessage(CommandError, "'My Font Family'"):
+            call_command("export_rcjk", workers=1)
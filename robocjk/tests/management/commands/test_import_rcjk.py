@@ -1,13 +1,45 @@
+import tempfile
+import zipfile
+
+import fsutil
+from django.core.management import call_command
 from django.test import TestCase
 
+from robocjk.models import Font, Project
+
 
 class ImportRCJKTestCase(TestCase):
     def setUp(self):
-        pass
+        self._project = Project.objects.create(name="My Font Family")
+        self._font = Font.objects.create(project=self._project, name="My Font")
+        self._temp_dir = tempfile.TemporaryDirectory()
 
     def tearDown(self):
-        pass
+        self._temp_dir.cleanup()
+
+    def _create_rcjk_zip(self, extra_files=None):
+        dirpath = fsutil.join_path(__file__, "../../test_models_data")
+        filepath = fsutil.join_path(self._temp_dir.name, "MyFont.rcjk.zip")
+        with zipfile.ZipFile(filepath, "w") as file:
+            for glif_filepath in fsutil.search_files(dirpath, "**/*.glif"):
+                glif_path = glif_filepath[len(dirpath) + 1 :]
+                file.write(glif_filepath, f"MyFont.rcjk/{glif_path}")
+            for name, content in (extra_files or {}).items():
+                file.writestr(f"MyFont.rcjk/{name}", content)
+        return filepath
 
     def test_io(self):
-        # TODO
-        pass
+        filepath = self._create_rcjk_zip(
+            extra_files={"characterGlyph/invalid.glif": "<glyph"},
+        )
+        call_command("import_rcjk", filepath=filepath, font_uid=str(self._font.uid))
+        font = Font.objects.get(pk=self._font.pk)
+        self.assertTrue(font.available)
+        self.assertEqual(font.atomic_elements.count(), 1)
+        self.assertEqual(font.deep_components.count(), 1)
+        self.assertEqual(font.character_glyphs.count(), 1)
+        character_glyph = font.character_glyphs.get()
+        self.assertEqual(character_glyph.name, "uni4E25")
+        self.assertEqual(character_glyph.layers.count(), 1)
+        self.assertEqual(font.atomic_elements.get().layers.count(), 1)
+        self.assertEqual(character_glyph.status_with_variations["status"], 0)
@@ -0,0 +1,55 @@
+import json
+import tempfile
+
+import fsutil
+from django.core.management import call_command
+from django.test import TestCase, tag
+
+from robocjk.benchmark import run_benchmarks
+from robocjk.models import Font, Project
+
+
+@tag("benchmark")
+class BenchmarkTestCase(TestCase):
+    def test_run_benchmarks(self):
+        projects_count = Project.objects.count()
+        results = run_benchmarks(size=5, iterations=2)
+        self.assertEqual(results["size"], 5)
+        self.assertEqual(results["iterations"], 2)
+        self.assertEqual(
+            set(results["results"].keys()),
+            {
+                "parse_string",
+                "format_glif",
+                "username_to_filename",
+                "serialize",
+                "export",
+            },
+        )
+        for result in results["results"].values():
+            self.assertEqual(result["iterations"], 2)
+            self.assertGreater(result["duration_min"], 0)
+        # character glyphs, deep components, atomic elements and their layers
+        self.assertEqual(results["results"]["export"]["items"], 13)
+        self.assertEqual(
+            set(results["results"]["export"]["phases"].keys()),
+            {"db_read", "format", "write", "verify", "cleanup", "git"},
+        )
+        # generated font is rolled back
+        self.assertEqual(Project.objects.count(), projects_count)
+
+    def test_run_benchmarks_command(self):
+        project = Project.objects.create(name="My Font Family")
+        font = Font.objects.create(project=project, name="My Font")
+        with tempfile.TemporaryDirectory() as temp_path:
+            output = fsutil.join_path(temp_path, "results.json")
+            call_command(
+                "benchmark_rcjk",
+                size=3,
+                iterations=1,
+                font_uid=str(font.uid),
+                output=output,
+            )
+            results = json.loads(fsutil.read_file(output))
+        self.assertEqual(results["font"], font.full_name)
+        self.assertEqual(results["size"], 0)
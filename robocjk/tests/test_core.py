@@ -1,7 +1,11 @@
+import plistlib
+from xml.etree import ElementTree
+
 import fsutil
+from benedict import benedict
 from django.test import TestCase
 
-from robocjk.core import GlifData
+from robocjk.core import GlifData, plist_from_xml
 
 
 class CoreTestCase(TestCase):
@@ -109,6 +113,28 @@ class CoreTestCase(TestCase):
         self.assertFalse(glif_data.has_variation_axis)
         self.assertFalse(glif_data.is_empty)
 
+    def test_glyph_data_components(self):
+        # transform values stored in the component item (old format)
+        glif_data = self._read_glif_data("test_core_data/characterGlyph/uni346C_.glif")
+        components = glif_data.components
+        self.assertEqual(
+            [component["name"] for component in components],
+            ["DC_5341_00", "DC_53E3_00", "DC_5973_01", "DC_4EBB_00"],
+        )
+        self.assertEqual(components[0]["coord"]["B_S_sh"], 0.492)
+        self.assertEqual(components[0]["x"], 251.0)
+        self.assertEqual(components[0]["y"], -1.0)
+        self.assertEqual(components[0]["scale_x"], 1.0)
+        # transform values stored in the transform dict
+        glif_data = self._read_glif_data("test_core_data/characterGlyph/uni313B.glif")
+        component = glif_data.components[0]
+        self.assertEqual(component["name"], "DC__part.mieum")
+        self.assertEqual(component["coord"]["height"], 570)
+        self.assertEqual(component["x"], 402.0)
+        self.assertEqual(component["y"], -120.0)
+        self.assertEqual(component["rotation"], 0.0)
+        self.assertEqual(glif_data.to_record().components, glif_data.components)
+
     def test_glyph_data_with_character_glyph_empty(self):
         glif_data = self._read_glif_data("test_core_data/characterGlyph/uni3413.glif")
         self.assertTrue(glif_data.ok)
@@ -178,3 +204,161 @@ class CoreTestCase(TestCase):
         self.assertTrue(glif_data.has_unicode)
         self.assertEqual(glif_data.unicode_hex, "313B,11B1")
         self.assertEqual(glif_data.unicodes, ["313B", "11B1"])
+
+    def test_glyph_data_same_as_tree_parser(self):
+        # the single-pass parser must produce the same results
+        # of parsing the whole tree and the lib serialized as plist
+        dirpath = fsutil.join_path(__file__, "test_core_data")
+        filepaths = fsutil.search_files(dirpath, "**/*.glif")
+        self.assertTrue(filepaths)
+        for filepath in filepaths:
+            glif_str = fsutil.read_file(filepath)
+            glif_data = GlifData()
+            glif_data.parse_string(glif_str)
+            self.assertTrue(glif_data.ok, filepath)
+            glif_xml = ElementTree.fromstring(glif_str.strip())
+            self.assertEqual(
+                glif_data.xml_string,
+                "<?xml version='1.0' encoding='UTF-8'?>\n{}".format(
+                    ElementTree.tostring(glif_xml).decode()
+                ),
+            )
+            lib_xml = glif_xml.find("./lib/dict")
+            self.assertEqual(
+                glif_data.lib,
+                benedict.from_plist(
+                    ElementTree.tostring(lib_xml).decode(), keypath_separator="/"
+                ),
+            )
+            outline_xml = glif_xml.find("./outline")
+            self.assertEqual(
+                glif_data.has_outlines,
+                outline_xml is not None and len(outline_xml) > 0,
+            )
+
+    def test_glyph_data_lazy(self):
+        glif_str = fsutil.read_file(
+            fsutil.join_path(
+                __file__, "test_core_data/deepComponent/D_C__98E_0_00.glif"
+            )
+        )
+        glif_data = GlifData()
+        glif_data.parse_string(glif_str)
+        glif_data_lazy = GlifData()
+        glif_data_lazy.parse_string(glif_str, lazy=True)
+        self.assertTrue(glif_data_lazy.ok)
+        self.assertFalse(hasattr(glif_data_lazy, "__dict__"))
+        # lib is decoded only when needed
+        self.assertEqual(glif_data_lazy.name, glif_data.name)
+        self.assertIsNone(glif_data_lazy._lib_dict)
+        self.assertEqual(
+            glif_data_lazy.status_with_variations, glif_data.status_with_variations
+        )
+        self.assertIsNotNone(glif_data_lazy._lib_dict)
+        self.assertIsNone(glif_data_lazy._lib)
+        self.assertEqual(glif_data_lazy.components_str, glif_data.components_str)
+        self.assertEqual(glif_data_lazy.is_empty, glif_data.is_empty)
+        self.assertEqual(glif_data_lazy.lib, glif_data.lib)
+
+    def test_glyph_data_lazy_with_invalid_lib(self):
+        glif_str = """<?xml version='1.0' encoding='UTF-8'?>
+        <glyph name="foo" format="2">
+          <lib>
+            <dict>
+              <key>robocjk.status</key>
+              <foo/>
+            </dict>
+          </lib>
+        </glyph>"""
+        glif_data = GlifData()
+        glif_data.parse_string(glif_str)
+        self.assertFalse(glif_data.ok)
+        self.assertTrue(isinstance(glif_data.error, ValueError))
+        glif_data.parse_string(glif_str, lazy=True)
+        self.assertTrue(glif_data.ok)
+        self.assertEqual(glif_data.name, "foo")
+        with self.assertRaises(ValueError):
+            _ = glif_data.status
+
+    def test_glyph_data_parse_strings(self):
+        dirpath = fsutil.join_path(__file__, "test_core_data")
+        filepaths = sorted(fsutil.search_files(dirpath, "**/*.glif"))
+        glif_strs = [fsutil.read_file(filepath) for filepath in filepaths]
+        glif_strs.insert(1, "Hello World")
+        for processes in [1, 2]:
+            records = GlifData.parse_strings(
+                glif_strs, processes=processes, chunksize=2
+            )
+            self.assertEqual(len(records), len(glif_strs))
+            self.assertFalse(records[1].ok)
+            self.assertTrue(records[1].error)
+            for glif_str, record in zip(glif_strs, records):
+                glif_data = GlifData()
+                glif_data.parse_string(glif_str)
+                self.assertEqual(record.ok, glif_data.ok)
+                if record.ok:
+                    self.assertEqual(record, glif_data.to_record())
+                    self.assertEqual(record.name, glif_data.name)
+                    self.assertEqual(record.xml_string, glif_data.xml_string)
+                    self.assertEqual(
+                        record.status_with_variations,
+                        glif_data.status_with_variations,
+                    )
+
+    def test_glyph_data_parse_strings_with_fields(self):
+        dirpath = fsutil.join_path(__file__, "test_core_data")
+        filepaths = sorted(fsutil.search_files(dirpath, "**/*.glif"))
+        glif_strs = [fsutil.read_file(filepath) for filepath in filepaths]
+        fields = ["unicodes", "status_with_variations"]
+        records = GlifData.parse_strings(glif_strs, fields=fields, processes=1)
+        for glif_str, record in zip(glif_strs, records):
+            glif_data = GlifData()
+            glif_data.parse_string(glif_str)
+            self.assertTrue(record.ok)
+            self.assertEqual(record.unicodes, glif_data.unicodes)
+            self.assertEqual(
+                record.status_with_variations, glif_data.status_with_variations
+            )
+            # values not requested are not returned
+            self.assertIsNone(record.xml_string)
+            self.assertIsNone(record.components)
+        with self.assertRaises(ValueError):
+            GlifData.parse_strings(glif_strs, fields=["lib"], processes=1)
+
+    def test_glyph_data_parse_strings_with_fields_and_invalid_lib(self):
+        glif_str = """<?xml version='1.0' encoding='UTF-8'?>
+        <glyph name="foo" format="2">
+          <unicode hex="4E00"/>
+          <lib>
+            <dict>
+              <key>robocjk.status</key>
+              <foo/>
+            </dict>
+          </lib>
+        </glyph>"""
+        # the lib is decoded only if a requested field needs it
+        (record,) = GlifData.parse_strings([glif_str], fields=["unicodes"], processes=1)
+        self.assertTrue(record.ok)
+        self.assertEqual(record.unicodes, ["4E00"])
+        (record,) = GlifData.parse_strings([glif_str], fields=["status"], processes=1)
+        self.assertFalse(record.ok)
+        self.assertTrue(record.error)
+        self.assertIsNone(record.status)
+
+    def test_plist_from_xml(self):
+        plist_str = (
+            "<dict>"
+            "<key>string</key><string>a &amp; b</string>"
+            "<key>empty</key><string/>"
+            "<key>integer</key><integer>-3</integer>"
+            "<key>real</key><real>0.5</real>"
+            "<key>true</key><true/>"
+            "<key>false</key><false/>"
+            "<key>data</key><data>aGVsbG8=</data>"
+            "<key>array</key><array><dict><key>name</key><string>x</string></dict></array>"
+            "</dict>"
+        )
+        self.assertEqual(
+            plist_from_xml(ElementTree.fromstring(plist_str)),
+            plistlib.loads(plist_str.encode("utf-8"), fmt=plistlib.FMT_XML),
+        )
@@ -0,0 +1,82 @@
+import fsutil
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from robocjk.fields import CompressedTextField
+from robocjk.models import CharacterGlyph, Font, Project
+
+
+class FieldsTestCase(TestCase):
+    def setUp(self):
+        self._project = Project.objects.create(name="My Font Family")
+        self._font = Font.objects.create(project=self._project, name="My Font")
+        self._glif_data = fsutil.read_file(
+            fsutil.join_path(__file__, "test_models_data/characterGlyph/uni4E_25.glif")
+        )
+        self._glif = CharacterGlyph.objects.create(
+            font=self._font, data=self._glif_data
+        )
+
+    def _read_raw_value(self, field_name):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {field_name} FROM robocjk_characterglyph WHERE id = %s",
+                [self._glif.pk],
+            )
+            return cursor.fetchone()[0]
+
+    def _write_raw_value(self, field_name, value):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE robocjk_characterglyph SET {field_name} = %s WHERE id = %s",
+                [value, self._glif.pk],
+            )
+
+    def test_compressed_text_field(self):
+        f = CompressedTextField
+        self.assertEqual(f.compress(""), b"")
+        self.assertEqual(f.decompress(b""), "")
+        self.assertEqual(f.decompress(None), None)
+        value = "<glyph>文</glyph>" * 100
+        compressed_value = f.compress(value)
+        self.assertTrue(f.is_compressed(compressed_value))
+        self.assertTrue(f.is_compressed(memoryview(compressed_value)))
+        self.assertLess(len(compressed_value), len(value.encode("utf-8")))
+        self.assertEqual(f.decompress(compressed_value), value)
+        self.assertEqual(f.decompress(memoryview(compressed_value)), value)
+        # values stored without version byte are plain utf-8 text
+        self.assertFalse(f.is_compressed(value.encode("utf-8")))
+        self.assertEqual(f.decompress(value.encode("utf-8")), value)
+
+    def test_compressed_text_field_model(self):
+        raw_value = bytes(self._read_raw_value("data"))
+        self.assertTrue(CompressedTextField.is_compressed(raw_value))
+        self.assertLess(len(raw_value), len(self._glif.data.encode("utf-8")))
+        glif = CharacterGlyph.objects.get(pk=self._glif.pk)
+        self.assertEqual(glif.data, self._glif.data)
+        self.assertEqual(glif.formatted_data, self._glif.formatted_data)
+        self.assertEqual(
+            CharacterGlyph.objects.filter(pk=glif.pk).values_list("data", flat=True)[0],
+            self._glif.data,
+        )
+        # uncompressed value stays readable
+        self._write_raw_value("data", self._glif.data.encode("utf-8"))
+        glif = CharacterGlyph.objects.get(pk=self._glif.pk)
+        self.assertEqual(glif.data, self._glif.data)
+
+    def test_compress_glifs_data_command(self):
+        self._write_raw_value("data", self._glif.data.encode("utf-8"))
+        self._write_raw_value("formatted_data", self._glif.formatted_data)
+        self.assertFalse(
+            CompressedTextField.is_compressed(self._read_raw_value("data"))
+        )
+        call_command("compress_glifs_data", chunk_size=1)
+        self.assertTrue(CompressedTextField.is_compressed(self._read_raw_value("data")))
+        self.assertTrue(
+            CompressedTextField.is_compressed(self._read_raw_value("formatted_data"))
+        )
+        glif = CharacterGlyph.objects.get(pk=self._glif.pk)
+        self.assertEqual(glif.data, self._glif.data)
+        self.assertEqual(glif.formatted_data, self._glif.formatted_data)
+        self.assertEqual(glif.updated_at, self._glif.updated_at)
@@ -0,0 +1,141 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from robocjk.core import GlifData
+from robocjk.generator import FontGenerator
+from robocjk.models import (
+    AtomicElement,
+    CharacterGlyph,
+    CharacterGlyphLayer,
+    DeepComponent,
+    Font,
+    Project,
+)
+
+
+class GeneratorTestCase(TestCase):
+    def setUp(self):
+        self._project = Project.objects.create(name="My Font Family")
+        self._font = Font.objects.create(project=self._project, name="My Font")
+
+    def _generate(self, **kwargs):
+        generator = FontGenerator(
+            self._font,
+            atomic_elements_count=5,
+            deep_components_count=20,
+            character_glyphs_count=50,
+            sources_count=2,
+            batch_size=7,
+            **kwargs,
+        )
+        return generator.generate()
+
+    def test_generate(self):
+        counts = self._generate()
+        self.assertEqual(
+            counts,
+            {
+                "atomic_elements": 5,
+                "deep_components": 20,
+                "character_glyphs": 50,
+                "layers": 110,
+            },
+        )
+        self.assertEqual(self._font.atomic_elements.count(), 5)
+        self.assertEqual(self._font.deep_components.count(), 20)
+        self.assertEqual(self._font.character_glyphs.count(), 50)
+        self.assertEqual(
+            CharacterGlyphLayer.objects.filter(glif__font=self._font).count(), 100
+        )
+        character_glyph = self._font.character_glyphs.get(name="uni4E01")
+        self.assertEqual(character_glyph.unicode_hex, "4E01")
+        self.assertEqual(
+            sorted(character_glyph.layers.values_list("group_name", flat=True)),
+            ["bold", "wide"],
+        )
+        self.assertEqual(
+            sorted(character_glyph.deep_components.values_list("name", flat=True)),
+            character_glyph.components.split(","),
+        )
+        for deep_component in self._font.deep_components.all():
+            self.assertEqual(
+                sorted(deep_component.atomic_elements.values_list("name", flat=True)),
+                deep_component.components.split(","),
+            )
+
+    def test_generate_fields(self):
+        self._generate()
+        # fields computed by the generator are the same computed on save
+        fields = [
+            "name",
+            "filename",
+            "unicode_hex",
+            "is_empty",
+            "has_variation_axis",
+            "has_outlines",
+            "has_components",
+            "has_unicode",
+            "components",
+            "status",
+            "status_with_variations",
+        ]
+        for glif_cls in [AtomicElement, DeepComponent, CharacterGlyph]:
+            for glif in glif_cls.objects.filter(font=self._font):
+                glif_data = GlifData()
+                glif_data.parse_string(glif.data)
+                self.assertTrue(glif_data.ok)
+                saved_glif = glif_cls(font=self._font)
+                saved_glif._apply_data(glif_data)
+                saved_glif._update_status(glif_data)
+                for field in fields:
+                    self.assertEqual(
+                        getattr(glif, field), getattr(saved_glif, field), field
+                    )
+                if glif_cls is not AtomicElement:
+                    self.assertEqual(
+                        list(
+                            glif.component_instances.values(
+                                *glif_data.components[0].keys()
+                            )
+                        ),
+                        glif_data.components,
+                    )
+        for layer in CharacterGlyphLayer.objects.filter(glif__font=self._font):
+            glif_data = GlifData()
+            glif_data.parse_string(layer.data)
+            self.assertTrue(glif_data.ok)
+            self.assertEqual(layer.name, glif_data.name)
+            self.assertEqual(layer.filename, glif_data.filename)
+            self.assertEqual(layer.has_outlines, glif_data.has_outlines)
+
+    def test_generate_with_seed(self):
+        self._generate(seed=1)
+        data = list(
+            self._font.character_glyphs.order_by("name").values_list("data", flat=True)
+        )
+        self._font = Font.objects.create(project=self._project, name="My Font 2")
+        self._generate(seed=1)
+        self.assertEqual(
+            data,
+            list(
+                self._font.character_glyphs.order_by("name").values_list(
+                    "data", flat=True
+                )
+            ),
+        )
+
+    def test_generate_with_invalid_sources_count(self):
+        with self.assertRaises(ValueError):
+            FontGenerator(self._font, sources_count=10)
+
+    def test_generate_command(self):
+        call_command(
+            "generate_rcjk_font",
+            font_uid=str(self._font.uid),
+            atomic_elements=2,
+            deep_components=3,
+            character_glyphs=4,
+        )
+        self.assertEqual(self._font.atomic_elements.count(), 2)
+        self.assertEqual(self._font.deep_components.count(), 3)
+        self.assertEqual(self._font.character_glyphs.count(), 4)
@@ -1,5 +1,13 @@
+import fsutil
 from django.test import TestCase
 
+from robocjk.io.files import (
+    get_file_digest,
+    get_file_size,
+    get_files_sizes,
+    remove_files,
+)
+
 
 class IOTestCase(TestCase):
     def setUp(self):
@@ -11,3 +19,21 @@ class IOTestCase(TestCase):
     def test_io(self):
         # TODO
         pass
+
+    def test_io_files(self):
+        temp_path = fsutil.join_path(__file__, "test_io_temp")
+        self.addCleanup(fsutil.remove_dir, temp_path)
+        file_a_path = fsutil.join_path(temp_path, "a.glif")
+        file_b_path = fsutil.join_path(temp_path, "1", "b.glif")
+        fsutil.write_file(file_a_path, "a")
+        fsutil.write_file(file_b_path, "bb")
+        files_sizes = get_files_sizes(temp_path, fsutil.join_path(temp_path, "none"))
+        self.assertEqual(files_sizes, {file_a_path: 1, file_b_path: 2})
+        self.assertEqual(get_file_size(file_b_path), 2)
+        self.assertIsNone(get_file_size(fsutil.join_path(temp_path, "none.glif")))
+        self.assertEqual(
+            get_file_digest(file_a_path), "0cc175b9c0f1b6a831c399e269772661"
+        )
+        removed_filepaths = remove_files([file_a_path, file_b_path, file_a_path])
+        self.assertEqual(removed_filepaths, [file_a_path, file_b_path])
+        self.assertEqual(get_files_sizes(temp_path), {})
@@ -0,0 +1,74 @@
+import datetime as dt
+import socket
+
+from django.test import TestCase
+
+from robocjk import locks
+from robocjk.locks import LOCK_NAME_MAX_LENGTH, get_lock_name, lock, refresh_locks
+from robocjk.models import Font, Lock, Project
+
+
+class LocksTestCase(TestCase):
+    def setUp(self):
+        self._project = Project.objects.create(name="My Font Family")
+        self._font = Font.objects.create(project=self._project, name="My Font")
+
+    def tearDown(self):
+        pass
+
+    def test_lock_name(self):
+        project_lock_name = get_lock_name(self._project)
+        font_lock_name = get_lock_name(self._font)
+        self.assertNotEqual(project_lock_name, font_lock_name)
+        self.assertLessEqual(len(project_lock_name), LOCK_NAME_MAX_LENGTH)
+        self.assertLessEqual(len(font_lock_name), LOCK_NAME_MAX_LENGTH)
+
+    def test_lock(self):
+        project_lock_name = get_lock_name(self._project)
+        font_lock_name = get_lock_name(self._font)
+        with lock(project_lock_name) as lock_acquired:
+            self.assertTrue(lock_acquired)
+            with lock(project_lock_name) as other_lock_acquired:
+                self.assertFalse(other_lock_acquired)
+            # all or none
+            with lock(font_lock_name, project_lock_name) as other_lock_acquired:
+                self.assertFalse(other_lock_acquired)
+                self.assertFalse(Lock.objects.filter(name=font_lock_name).exists())
+            with lock(font_lock_name) as other_lock_acquired:
+                self.assertTrue(other_lock_acquired)
+        self.assertFalse(Lock.objects.exists())
+
+    def test_lock_stale(self):
+        lock_name = get_lock_name(self._project)
+        # lock held by a process running on another host
+        Lock.objects.create(name=lock_name, owner="other-host:1:1")
+        with lock(lock_name) as lock_acquired:
+            self.assertFalse(lock_acquired)
+        # lock not refreshed for longer than the export cancel timeout
+        with self.settings(ROBOCJK_EXPORT_CANCEL_TIMEOUT=0):
+            with lock(lock_name) as lock_acquired:
+                self.assertTrue(lock_acquired)
+        # lock left by a process that is not running anymore
+        Lock.objects.create(name=lock_name, owner=f"{socket.gethostname()}:999999999:1")
+        with lock(lock_name) as lock_acquired:
+            self.assertTrue(lock_acquired)
+        self.assertFalse(Lock.objects.exists())
+
+    def test_lock_heartbeat(self):
+        lock_name = get_lock_name(self._project)
+        long_ago = dt.datetime.now() - dt.timedelta(days=1)
+        # forget the heartbeats refreshed by other tests
+        locks._locks_heartbeats.clear()
+        with lock(lock_name) as lock_acquired:
+            self.assertTrue(lock_acquired)
+            # long running export, its lock is refreshed
+            Lock.objects.update(acquired_at=long_ago, heartbeat_at=long_ago)
+            refresh_locks()
+            self.assertGreater(Lock.objects.get().heartbeat_at, long_ago)
+            # refreshes are throttled
+            Lock.objects.update(heartbeat_at=long_ago)
+            refresh_locks()
+            self.assertEqual(Lock.objects.get().heartbeat_at, long_ago)
+            Lock.objects.update(heartbeat_at=dt.datetime.now())
+            with lock(lock_name) as other_lock_acquired:
+                self.assertFalse(other_lock_acquired)
@@ -1,15 +1,32 @@
+import os
+
 import fsutil
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
+from robocjk.core import GlifData
+from robocjk.exceptions import VerificationError
+from robocjk.locks import get_lock_name, lock
 from robocjk.models import (
     AtomicElement,
     AtomicElementLayer,
     CharacterGlyph,
     CharacterGlyphLayer,
+    ComponentInstance,
     DeepComponent,
+    ExportRun,
     Font,
+    GlifChange,
     Project,
     StatusModel,
+    format_and_save_glif_to_file_system,
+    run_git_command,
+)
+from robocjk.utils import (
+    FORMAT_GLIF_VERSION,
+    format_glif,
+    get_data_digest,
+    iter_queryset_pages,
 )
 
 
@@ -134,3 +151,484 @@ class ModelsTestCase(TestCase):
         self.assertEqual(self._atomic_element_layer.unicode_hex, "")
         self.assertEqual(self._atomic_element_layer.filename, "bendingB_oth.glif")
         self.assertTrue(isinstance(self._atomic_element_layer.serialize(), dict))
+
+    def test_iter_queryset_pages(self):
+        projects_qs = Project.objects.all()
+        for index in range(4):
+            Project.objects.create(
+                name=f"My Font Family {index}",
+                repo_url=f"git@github.com:username/repository-{index}.git",
+            )
+        pages = list(iter_queryset_pages(projects_qs, 2))
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        pages_ids = [obj.id for page in pages for obj in page]
+        self.assertEqual(
+            pages_ids, list(projects_qs.order_by("id").values_list("id", flat=True))
+        )
+        pages = list(iter_queryset_pages(projects_qs.values("id", "name"), 5))
+        self.assertEqual([len(page) for page in pages], [5])
+
+    def test_format_and_save_glif_to_file_system(self):
+        glif = self._character_glyph
+        filepath = fsutil.join_path(__file__, "test_models_data", "temp", glif.filename)
+        self.addCleanup(fsutil.remove_dir, fsutil.get_parent_dir(filepath))
+        pk, digest, size, written, _, _ = format_and_save_glif_to_file_system(
+            (glif.pk, filepath, glif.data, None, None)
+        )
+        self.assertEqual(pk, glif.pk)
+        self.assertTrue(written)
+        self.assertEqual(fsutil.read_file(filepath), glif.data_formatted)
+        self.assertEqual(digest, get_data_digest(glif.data_formatted))
+        file_size = fsutil.get_file_size(filepath)
+        self.assertEqual(size, file_size)
+        # unchanged content is not written again
+        _, _, _, written, _, _ = format_and_save_glif_to_file_system(
+            (glif.pk, filepath, glif.data, None, file_size)
+        )
+        self.assertFalse(written)
+        # content of different size is written
+        _, _, _, written, _, _ = format_and_save_glif_to_file_system(
+            (glif.pk, filepath, glif.data, None, file_size + 1)
+        )
+        self.assertTrue(written)
+        # different content of the same size on file-system is written
+        fsutil.write_file(filepath, "x" * file_size)
+        _, _, _, written, _, _ = format_and_save_glif_to_file_system(
+            (glif.pk, filepath, glif.data, None, file_size)
+        )
+        self.assertTrue(written)
+        self.assertEqual(fsutil.read_file(filepath), glif.data_formatted)
+        # invalid xml data is written unformatted
+        _, _, _, written, _, _ = format_and_save_glif_to_file_system(
+            (glif.pk, filepath, "<glyph", None, file_size)
+        )
+        self.assertTrue(written)
+        self.assertEqual(fsutil.read_file(filepath), "<glyph")
+
+    def test_font_save_to_file_system_reconcile(self):
+        temp_path = fsutil.join_path(__file__, "test_models_data", "temp-repos")
+        self.addCleanup(fsutil.remove_dir, temp_path)
+        with self.settings(GIT_REPOSITORIES_PATH=temp_path):
+            self._font1.save_to_file_system(full_export=True)
+            glif = CharacterGlyph.objects.get(pk=self._character_glyph.pk)
+            glif_path = glif.path()
+            self.assertTrue(fsutil.is_file(glif_path))
+            self.assertNotEqual(glif.export_digest, "")
+            glif_mtime = os.stat(glif_path).st_mtime_ns
+            zombie_path = fsutil.join_path(
+                fsutil.get_parent_dir(glif_path), "zombie.glif"
+            )
+            fsutil.write_file(zombie_path, "zombie")
+            self._font1.save_to_file_system(full_export=True)
+            # unchanged glif file is not re-written, zombie file is removed
+            self.assertEqual(os.stat(glif_path).st_mtime_ns, glif_mtime)
+            self.assertFalse(fsutil.exists(zombie_path))
+
+    def test_font_save_to_file_system_deferred_export_state(self):
+        temp_path = fsutil.join_path(__file__, "test_models_data", "temp-repos")
+        self.addCleanup(fsutil.remove_dir, temp_path)
+        with self.settings(GIT_REPOSITORIES_PATH=temp_path):
+            font = Font.objects.get(pk=self._font1.pk)
+            font.export_state_deferred = True
+            font.save_to_file_system(full_export=True)
+            # export state is not stored until the exported files are committed
+            glif = CharacterGlyph.objects.get(pk=self._character_glyph.pk)
+            self.assertTrue(fsutil.is_file(glif.path()))
+            self.assertEqual(glif.export_digest, "")
+            self.assertIsNone(font.load_manifest())
+            self.assertIsNone(Font.objects.get(pk=font.pk).export_changes_cursor)
+            font.save_export_state()
+            glif = CharacterGlyph.objects.get(pk=self._character_glyph.pk)
+            self.assertNotEqual(glif.export_digest, "")
+            self.assertEqual(len(font.load_manifest()), 5)
+            self.assertIsNotNone(Font.objects.get(pk=font.pk).export_changes_cursor)
+
+    def test_glif_formatted_data(self):
+        glif = CharacterGlyph.objects.get(pk=self._character_glyph.pk)
+        self.assertEqual(glif.formatted_data_version, FORMAT_GLIF_VERSION)
+        self.assertEqual(glif.formatted_data, format_glif(glif.data))
+        self.assertEqual(glif.formatted_data_cached, glif.formatted_data)
+        self.assertEqual(glif.data_formatted, glif.formatted_data)
+        # stale formatter version
+        CharacterGlyph.objects.filter(pk=glif.pk).update(formatted_data_version="")
+        glif = CharacterGlyph.objects.get(pk=glif.pk)
+        self.assertIsNone(glif.formatted_data_cached)
+        glif.save()
+        self.assertEqual(glif.formatted_data_version, FORMAT_GLIF_VERSION)
+        # changed data
+        glif.data = glif.data.replace('width="1000"', 'width="900"')
+        self.assertIsNone(glif.formatted_data_cached)
+        glif.save()
+        self.assertEqual(glif.formatted_data, format_glif(glif.data))
+        # data changed without calling save
+        CharacterGlyph.objects.filter(pk=glif.pk).update(
+            data=glif.data.replace('width="900"', 'width="800"')
+        )
+        glif = CharacterGlyph.objects.get(pk=glif.pk)
+        self.assertIsNone(glif.formatted_data_cached)
+        self.assertEqual(glif.data_formatted, format_glif(glif.data))
+        # deferred formatted data is not loaded by save if data is not changed
+        glif.save()
+        glif = CharacterGlyph.objects.defer("formatted_data").get(pk=glif.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(glif.formatted_data_valid)
+        glif.save()
+        self.assertIn("formatted_data", glif.get_deferred_fields())
+
+    def test_glif_changes(self):
+        changes_qs = self._font1.glif_changes.order_by("id")
+        self.assertEqual(
+            list(changes_qs.values_list("action", flat=True)),
+            [GlifChange.ACTION_CREATE] * 5,
+        )
+        last_change_id = changes_qs.last().id
+        # unchanged data
+        glif = CharacterGlyph.objects.get(pk=self._character_glyph.pk)
+        glif.save()
+        self.assertEqual(changes_qs.last().id, last_change_id)
+        # changed data
+        glif.data = glif.data.replace('width="1000"', 'width="900"')
+        glif.save()
+        change = changes_qs.last()
+        self.assertEqual(change.action, GlifChange.ACTION_UPDATE)
+        self.assertEqual(change.glif_type, "character_glyph")
+        self.assertEqual(change.glif_id, glif.id)
+        self.assertEqual(change.filepath, glif.path())
+        # renamed layer
+        layer = CharacterGlyphLayer.objects.get(pk=self._character_glyph_layer.pk)
+        layer_path = layer.path()
+        layer.rename("2")
+        layer.save()
+        change = changes_qs.last()
+        self.assertEqual(change.action, GlifChange.ACTION_RENAME)
+        self.assertEqual(change.glif_id, layer.id)
+        self.assertEqual(change.parent_glif_id, glif.id)
+        self.assertEqual(change.group_name, "2")
+        self.assertEqual(change.filepath, layer_path)
+        # deleted glif (not using the api), its layers are deleted too
+        layer = CharacterGlyphLayer.objects.get(pk=self._character_glyph_layer.pk)
+        layer_path = layer.path()
+        glif_path = glif.path()
+        glif.delete()
+        changes = list(changes_qs.filter(action=GlifChange.ACTION_DELETE))
+        self.assertEqual(
+            sorted((change.glif_type, change.filepath) for change in changes),
+            [("character_glyph", glif_path), ("character_glyph_layer", layer_path)],
+        )
+        # deleted font (queryset delete), its changes journal is deleted too
+        Font.objects.filter(pk=self._font1.pk).delete()
+        self.assertFalse(GlifChange.objects.exists())
+
+    def test_font_glifs_version(self):
+        def get_glifs_version(font):
+            return Font.objects.get(pk=font.pk).glifs_version
+
+        # each layer save updates the version twice (layer save and glif layers_updated_at)
+        self.assertEqual(get_glifs_version(self._font1), 7)
+        self.assertEqual(get_glifs_version(self._font2), 0)
+        # save
+        glif = CharacterGlyph.objects.get(pk=self._character_glyph.pk)
+        glif.save()
+        self.assertEqual(get_glifs_version(self._font1), 8)
+        layer = CharacterGlyphLayer.objects.get(pk=self._character_glyph_layer.pk)
+        layer.save()
+        self.assertEqual(get_glifs_version(self._font1), 10)
+        # the last update happens after the glif layers_updated_at update
+        glif.update_layers_updated_at()
+        self.assertEqual(get_glifs_version(self._font1), 11)
+        # lock / unlock
+        user = get_user_model().objects.create_user(username="designer")
+        glif.lock_by(user, save=True)
+        self.assertEqual(get_glifs_version(self._font1), 12)
+        glif.unlock_by(user, save=True)
+        self.assertEqual(get_glifs_version(self._font1), 13)
+        # delete
+        layer.delete()
+        self.assertEqual(get_glifs_version(self._font1), 14)
+        self.assertEqual(get_glifs_version(self._font2), 0)
+
+    def test_font_save_to_file_system_changes(self):
+        temp_path = fsutil.join_path(__file__, "test_models_data", "temp-repos")
+        self.addCleanup(fsutil.remove_dir, temp_path)
+        with self.settings(GIT_REPOSITORIES_PATH=temp_path):
+            self.assertIsNone(self._font1.export_changes_cursor)
+            self._font1.save_to_file_system(full_export=True)
+            font = Font.objects.get(pk=self._font1.pk)
+            self.assertEqual(
+                font.export_changes_cursor,
+                font.glif_changes.order_by("id").last().id,
+            )
+            layer = CharacterGlyphLayer.objects.get(pk=self._character_glyph_layer.pk)
+            layer_path = layer.path()
+            layer.rename("2")
+            layer.save()
+            self.assertFalse(fsutil.exists(layer_path))
+            # the previous file is restored, the incremental export must remove it
+            fsutil.write_file(layer_path, "zombie")
+            font.save_to_file_system(full_export=False)
+            self.assertFalse(fsutil.exists(layer_path))
+            self.assertTrue(fsutil.is_file(layer.path()))
+            self.assertEqual(
+                font.export_changes_cursor,
+                font.glif_changes.order_by("id").last().id,
+            )
+
+    def test_font_verify_file_system(self):
+        temp_path = fsutil.join_path(__file__, "test_models_data", "temp-repos")
+        self.addCleanup(fsutil.remove_dir, temp_path)
+        with self.settings(GIT_REPOSITORIES_PATH=temp_path):
+            self.assertIsNone(self._font1.load_manifest())
+            self._font1.save_to_file_system(full_export=False)
+            manifest = self._font1.load_manifest()
+            self.assertEqual(len(manifest), 5)
+            self._font1.verify_file_system()
+            # zombie file
+            glif_path = self._character_glyph.path()
+            zombie_path = fsutil.join_path(
+                fsutil.get_parent_dir(glif_path), "zombie.glif"
+            )
+            fsutil.write_file(zombie_path, "zombie")
+            with self.assertRaises(VerificationError):
+                self._font1.verify_file_system()
+            self.assertTrue(self._font1.cleanup_file_system())
+            self._font1.verify_file_system()
+            # mismatching file
+            fsutil.write_file(glif_path, "corrupted")
+            with self.assertRaises(VerificationError):
+                self._font1.verify_file_system()
+            # missing file
+            layer_path = self._character_glyph_layer.path()
+            fsutil.remove_file(layer_path)
+            comparison = self._font1.compare_file_system(
+                manifest=self._font1.load_manifest()
+            )
+            self.assertEqual(comparison["missing"], {layer_path})
+            self.assertEqual(comparison["mismatching"], {glif_path})
+            self.assertEqual(comparison["zombie"], set())
+            # the incremental export verifies only the changed glifs
+            self._font1.save_to_file_system(full_export=False)
+            with self.assertRaises(VerificationError):
+                self._font1.verify_file_system()
+            # the full export repairs the file-system
+            self._font1.save_to_file_system(full_export=True)
+            self._font1.verify_file_system()
+            self.assertEqual(
+                fsutil.read_file(glif_path), self._character_glyph.data_formatted
+            )
+            # corrupted file content of the same size
+            fsutil.write_file(glif_path, "x" * fsutil.get_file_size(glif_path))
+            comparison = self._font1.compare_file_system(
+                manifest=self._font1.load_manifest()
+            )
+            self.assertEqual(comparison["mismatching"], set())
+            with self.assertRaises(VerificationError):
+                self._font1.verify_file_system()
+
+    def test_project_save_to_file_system_git_batched(self):
+        temp_path = fsutil.join_path(__file__, "test_models_data", "temp-git")
+        self.addCleanup(fsutil.remove_dir, temp_path)
+        remote_path = fsutil.join_path(temp_path, "remote.git")
+        repos_path = fsutil.join_path(temp_path, "repos")
+        fsutil.make_dirs(remote_path)
+        with self.settings(GIT_REPOSITORIES_PATH=repos_path):
+            project = self._project
+            project.repo_url = remote_path
+            project.repo_branch = "main"
+            project_path = project.path()
+            fsutil.make_dirs(project_path)
+            run_git_command(remote_path, "init", "--bare", "--quiet")
+            run_git_command(project_path, "init", "--quiet", "-b", "main")
+            run_git_command(project_path, "config", "user.name", "Test")
+            run_git_command(project_path, "config", "user.email", "test@test.com")
+            run_git_command(project_path, "remote", "add", "origin", remote_path)
+            run_git_command(project_path, "commit", "--allow-empty", "-m", "Init")
+            run_git_command(project_path, "push", "--quiet", "origin", "main")
+
+            def get_remote_log():
+                return run_git_command(
+                    remote_path, "log", "--format=%s", "main"
+                ).stdout.decode("UTF-8")
+
+            project.save_to_file_system(full_export=True)
+            remote_log = get_remote_log()
+            self.assertIn("Updated My Font 1.", remote_log)
+            self.assertIn("Updated My Font 2.", remote_log)
+            # incremental export commits only the changed glif
+            glif = CharacterGlyph.objects.get(pk=self._character_glyph.pk)
+            glif.data = glif.data.replace('width="1000"', 'width="900"')
+            glif.save()
+            project.save_to_file_system(full_export=False)
+            changed_files = run_git_command(
+                remote_path, "show", "--name-only", "--format=", "main"
+            ).stdout.decode("UTF-8")
+            self.assertEqual(
+                changed_files.split(),
+                [
+                    os.path.relpath(glif.path(), project_path),
+                ],
+            )
+
+    def test_font_export_run(self):
+        temp_path = fsutil.join_path(__file__, "test_models_data", "temp-runs")
+        self.addCleanup(fsutil.remove_dir, temp_path)
+        with self.settings(GIT_REPOSITORIES_PATH=temp_path):
+            font = Font.objects.get(pk=self._font1.pk)
+            self.assertTrue(font.export(full=True))
+            export_run = font.export_runs.get()
+            self.assertEqual(export_run.project_id, font.project_id)
+            self.assertEqual(export_run.outcome, ExportRun.OUTCOME_SUCCESS)
+            self.assertTrue(export_run.full_export)
+            self.assertIsNotNone(export_run.duration)
+            self.assertEqual(
+                export_run.character_glyphs_count,
+                font.character_glyphs.count(),
+            )
+            self.assertGreater(export_run.glifs_written_count, 0)
+            self.assertGreater(export_run.bytes_written, 0)
+            self.assertGreater(export_run.write_duration, 0)
+            self.assertGreater(export_run.verify_duration, 0)
+            # unchanged glifs are not written again
+            self.assertTrue(font.export(full=True))
+            export_run = font.export_runs.first()
+            self.assertEqual(export_run.glifs_written_count, 0)
+            self.assertEqual(export_run.bytes_written, 0)
+            # failed exports record the error
+            font.save_to_file_system = None
+            self.assertFalse(font.export(full=True))
+            export_run = font.export_runs.first()
+            self.assertEqual(export_run.outcome, ExportRun.OUTCOME_FAILURE)
+            self.assertIn("TypeError", export_run.error)
+
+    def test_project_export_lock(self):
+        project = Project.objects.get(pk=self._project.pk)
+        with lock(get_lock_name(project)) as lock_acquired:
+            self.assertTrue(lock_acquired)
+            # the project is being exported by another process
+            self.assertFalse(project.export(full=True))
+            self.assertIsNone(project.export_started_at)
+        # a stale export running status doesn't prevent new exports
+        Project.objects.filter(pk=project.pk).update(export_running=True)
+        project = Project.objects.get(pk=project.pk)
+        project.save_to_file_system = lambda full_export: None
+        self.assertTrue(project.export(full=True))
+        self.assertFalse(Project.objects.get(pk=project.pk).export_running)
+
+    def test_project_export_pending_changes_count(self):
+        project = self._project
+        changes_count = GlifChange.objects.filter(font__project=project).count()
+        self.assertGreater(changes_count, 0)
+        self.assertEqual(project.get_export_pending_changes_count(), changes_count)
+        Font.objects.filter(pk=self._font1.pk).update(
+            export_changes_cursor=GlifChange.objects.order_by("id").last().id
+        )
+        self.assertEqual(project.get_export_pending_changes_count(), 0)
+        glif = CharacterGlyph.objects.get(pk=self._character_glyph.pk)
+        glif.data = glif.data.replace('width="1000"', 'width="900"')
+        glif.save()
+        self.assertEqual(project.get_export_pending_changes_count(), 1)
+
+    def test_glif_status_with_variations(self):
+        glif = CharacterGlyph.objects.get(pk=self._character_glyph.pk)
+        self.assertEqual(glif.status_with_variations["status"], 0)
+        glif_data_str = glif.data
+
+        def get_glif_data(status):
+            data = glif_data_str.replace(
+                "<dict>",
+                f"<dict><key>robocjk.status</key><integer>{status}</integer>",
+                1,
+            )
+            glif_data = GlifData()
+            glif_data.parse_string(data)
+            return data, glif_data
+
+        # save with already parsed data
+        glif.data, glif_data = get_glif_data(4)
+        glif.save(glif_data=glif_data)
+        glif = CharacterGlyph.objects.get(pk=glif.pk)
+        self.assertEqual(glif.status, "4")
+        self.assertEqual(glif.status_with_variations["status"], 4)
+        self.assertFalse(glif.status_downgraded)
+        # downgrade detected using the stored status
+        glif.data, glif_data = get_glif_data(2)
+        glif.save(glif_data=glif_data)
+        glif = CharacterGlyph.objects.get(pk=glif.pk)
+        self.assertEqual(glif.status, "2")
+        self.assertEqual(glif.status_with_variations["status"], 2)
+        self.assertTrue(glif.status_downgraded)
+        # upgrade detected parsing the previous data if status is not stored
+        CharacterGlyph.objects.filter(pk=glif.pk).update(status_with_variations=None)
+        glif = CharacterGlyph.objects.get(pk=glif.pk)
+        glif.data, glif_data = get_glif_data(4)
+        glif.save()
+        glif = CharacterGlyph.objects.get(pk=glif.pk)
+        self.assertEqual(glif.status_with_variations["status"], 4)
+        self.assertFalse(glif.status_downgraded)
+
+    def test_glif_source_status_filters(self):
+        glif = CharacterGlyph.objects.get(pk=self._character_glyph.pk)
+        glif_qs = CharacterGlyph.objects.filter(pk=glif.pk)
+        filters = StatusModel.get_source_status_filters(done=False)
+        self.assertEqual(filters, {"status_with_variations__status__lt": 4})
+        self.assertTrue(glif_qs.filter(**filters).exists())
+        filters = StatusModel.get_source_status_filters(done=True)
+        self.assertFalse(glif_qs.filter(**filters).exists())
+        filters = StatusModel.get_source_status_filters(status=0)
+        self.assertTrue(glif_qs.filter(**filters).exists())
+        # missing source
+        filters = StatusModel.get_source_status_filters(source_name="bold", done=False)
+        self.assertEqual(filters, {"status_with_variations__status_bold__lt": 4})
+        self.assertFalse(glif_qs.filter(**filters).exists())
+        CharacterGlyph.objects.filter(pk=glif.pk).update(
+            status_with_variations={"status": 4, "status_bold": 2}
+        )
+        self.assertTrue(glif_qs.filter(**filters).exists())
+        filters = StatusModel.get_source_status_filters(source_name="bold", status=2)
+        self.assertTrue(glif_qs.filter(**filters).exists())
+        filters = StatusModel.get_source_status_filters(done=True)
+        self.assertTrue(glif_qs.filter(**filters).exists())
+        # invalid source names (lookups injection)
+        for source_name in ["bold__lt", "bold__isnull", "bold.italic", "bold "]:
+            with self.assertRaises(ValueError):
+                StatusModel.get_source_status_filters(source_name=source_name, status=2)
+        filters = StatusModel.get_source_status_filters(source_name="wght-700_ital")
+        self.assertEqual(filters, {})
+
+    def test_glif_component_instances(self):
+        glif = CharacterGlyph.objects.get(pk=self._character_glyph.pk)
+        self.assertEqual(
+            list(glif.component_instances.values_list("name", flat=True)),
+            ["DC_4E00_00", "DC_4E37_00", "DC_4E28_00", "DC_4E28_00", "DC_5382_00"],
+        )
+        component_instance = glif.component_instances.get(index=3)
+        self.assertEqual(component_instance.font, self._font1)
+        self.assertEqual(component_instance.coord["X_X_fl"], 0.684)
+        self.assertEqual(component_instance.x, 96.0)
+        self.assertEqual(component_instance.y, 226.0)
+        self.assertEqual(
+            self._deep_component.component_instances.filter(name="line").count(), 4
+        )
+        # query glifs by component coord
+        glif_qs = CharacterGlyph.objects.filter(
+            component_instances__name="DC_4E28_00",
+            component_instances__coord__X_X_fl__gt=0.5,
+        ).distinct()
+        self.assertEqual(list(glif_qs), [glif])
+        glif_qs = CharacterGlyph.objects.filter(
+            component_instances__name="DC_4E28_00",
+            component_instances__coord__X_X_fl__gt=0.7,
+        )
+        self.assertFalse(glif_qs.exists())
+        # component instances are rebuilt on save
+        glif.data = glif.data.replace("DC_5382_00", "DC_5382_01")
+        glif.save()
+        self.assertEqual(
+            list(glif.component_instances.values_list("name", flat=True)),
+            ["DC_4E00_00", "DC_4E37_00", "DC_4E28_00", "DC_4E28_00", "DC_5382_01"],
+        )
+        self.assertEqual(
+            ComponentInstance.objects.filter(
+                font=self._font1, name="DC_5382_01"
+            ).count(),
+            1,
+        )
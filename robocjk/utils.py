@@ -1,11 +1,25 @@
+import hashlib
+
+from fontTools import version as fonttools_version
 from fontTools.pens.recordingPen import RecordingPointPen
 from fontTools.ufoLib.glifLib import readGlyphFromString, writeGlyphToString
 
+# the formatted glif output depends on the fontTools version,
+# stored formatted data produced by a different version is stale
+FORMAT_GLIF_VERSION = f"fonttools-{fonttools_version}"
+
 
 class GlyphObject:
     pass
 
 
+def get_data_digest(s):
+    """
+    Get the md5 hex digest of the given string (utf-8 encoded).
+    """
+    return hashlib.md5(s.encode("utf-8")).hexdigest()
+
+
 def format_glif(s):
     glyph = GlyphObject()
     recorder = RecordingPointPen()
@@ -13,6 +27,33 @@ def format_glif(s):
     return writeGlyphToString(glyph.name, glyph, drawPointsFunc=recorder.replay)
 
 
+def iter_queryset_pages(queryset, per_page, pk_field="id"):
+    """
+    Iterate over the queryset yielding pages (lists) of at most per_page items.
+    Pages are fetched using keyset pagination (pk > last pk) instead of LIMIT/OFFSET,
+    so the cost of reading a page doesn't depend on how many rows precede it.
+    Works both with model instances and values() querysets (dicts).
+    """
+    queryset = queryset.order_by(pk_field)
+    last_pk = None
+    while True:
+        page_queryset = queryset
+        if last_pk is not None:
+            page_queryset = page_queryset.filter(**{f"{pk_field}__gt": last_pk})
+        page = list(page_queryset[:per_page])
+        if not page:
+            break
+        yield page
+        if len(page) < per_page:
+            break
+        last_item = page[-1]
+        last_pk = (
+            last_item[pk_field]
+            if isinstance(last_item, dict)
+            else getattr(last_item, pk_field)
+        )
+
+
 def char_to_unicode(s):
     return hex(ord(s))[2:].zfill(4).upper()
 